@@ -2,7 +2,9 @@
 from __future__ import annotations
 
 import asyncio
+import csv
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 import importlib
 import inspect
@@ -42,6 +44,7 @@ class AtDict(dict):
 
 class Flag:
     def __init__(self, value) -> None:
+        self._event = threading.Event()  # Set while value is truthy, lets threads wait for the flag instead of polling
         self.value = value
 
     @property
@@ -51,6 +54,21 @@ class Flag:
     @value.setter
     def value(self, value):
         self._value = value
+        if value:
+            self._event.set()
+        else:
+            self._event.clear()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the value is truthy.
+
+        Args:
+            timeout: Maximum time to wait in seconds, None to wait forever. Defaults to None.
+
+        Returns:
+            True if the value is truthy
+        """
+        return self._event.wait(timeout)
 
 
 def get_os_name() -> str:
@@ -291,9 +309,44 @@ _fix_aiohttp()
 _AT = TypeVar("_AT")
 
 
+_thread_loops = threading.local()
+
+
+def get_thread_loop() -> asyncio.AbstractEventLoop:
+    """Get the persistent event loop of the current thread, creating it on first use.
+
+    Returns:
+        Event loop
+    """
+    loop = getattr(_thread_loops, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        _thread_loops.loop = loop
+    return loop
+
+
+_nested_executor: Optional[ThreadPoolExecutor] = None
+_nested_executor_lock = threading.Lock()
+
+
+def _run_in_thread(future: Awaitable[_AT]) -> _AT:
+    """Run the future to completion on the persistent loop of a worker thread, blocking the current thread."""
+    global _nested_executor  # noqa: PLW0603  # pylint: disable=global-statement
+    with _nested_executor_lock:
+        if _nested_executor is None:
+            _nested_executor = ThreadPoolExecutor(thread_name_prefix="run_async")
+    return _nested_executor.submit(lambda: get_thread_loop().run_until_complete(future)).result()
+
+
 def run_async(future: Awaitable[_AT]) -> _AT:
     """Run the given future (result of an async function call) on an event loop until completion.
 
+    Uses the persistent loop of the current thread (see `get_thread_loop()`), so repeated calls don't pay for loop setup / teardown.
+    If an event loop is already running in the current thread (e.g. sync code called from `TestScript.exec_plan_async()`), it
+    cannot be re-entered, so the future is run on a worker thread loop instead, blocking the running loop until it completes.
+    Async code should `await` the future instead.
+
     Args:
         future: Future to run on an event loop (a result of an async function call)
 
@@ -301,11 +354,10 @@ def run_async(future: Awaitable[_AT]) -> _AT:
         Result of the future
     """
     try:
-        loop = asyncio.get_running_loop()
+        asyncio.get_running_loop()
     except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    return loop.run_until_complete(future)
+        return get_thread_loop().run_until_complete(future)
+    return _run_in_thread(future)
 
 
 def run_maybe_async(maybe_future: _AT | Awaitable[_AT]) -> _AT:
@@ -727,6 +779,55 @@ def translate_config_paths(config_paths: list[str], translations: Optional[list[
     return [translate_one(p, translations) for p in config_paths]
 
 
+def normalize_column_name(name: str) -> str:
+    """Normalize column name for matching - lower case, no leading "#", spaces replaced by "_" (e.g. "# Device Id" -> "device_id")."""
+    return name.lower().lstrip("#").strip().replace(" ", "_")
+
+
+def load_records(file_path: str) -> list[dict[str, Any]]:
+    """Load records from a .csv or .jsonl file, e.g. for bulk import into a database.
+
+    CSV file must have a header row (leading "#" in the first column is allowed, same as database files), empty cells are omitted.
+    JSONL file has one JSON object per line, blank lines are skipped.
+    Column names (CSV header, JSON object keys) are normalized by `normalize_column_name()`.
+
+    Args:
+        file_path: Path to the file
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file content is malformed
+        TypeError: If a JSONL line is not an object
+        NotImplementedError: If the file type is not supported
+
+    Returns:
+        List of records (dicts), in the file order
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    records: list[dict[str, Any]] = []
+    with open(file_path, newline="", encoding="utf-8") as file:
+        if ext in [".jsonl", ".ndjson"]:
+            for line_num, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise TypeError(f'Expected JSON object in line {line_num} of "{file_path}", got {type(record).__name__}')
+                records.append({normalize_column_name(k): v for k, v in record.items()})
+        elif ext in [".csv"]:
+            columns: Optional[list[str]] = None
+            for row in csv.reader(file, delimiter=",", quotechar='"'):
+                if not row or not any(c.strip() for c in row):
+                    continue
+                if columns is None:
+                    columns = [normalize_column_name(c) for c in row]
+                    continue
+                records.append({k: v.strip() for k, v in zip(columns, row) if v.strip()})
+        else:
+            raise NotImplementedError(f"Unsupported file type: {ext}")
+    return records
+
+
 def maybe_create_file_dir(file_path: str, loggr: logging.Logger) -> str:
     """Ensure directory for the file exists, create if needed.
 
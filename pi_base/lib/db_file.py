@@ -9,9 +9,11 @@ from __future__ import annotations
 import argparse
 import copy
 import csv
+import hashlib
 
 # import importlib
 import io
+import json
 import logging
 import os
 import sys
@@ -41,8 +43,9 @@ __package__ = ".".join([os.path.basename(os.path.dirname(SCRIPT_DIR)), os.path.b
 # pylint: disable=wrong-import-position,relative-beyond-top-level
 # ruff: noqa: E402, TID252
 
-from ..lib.app_utils import AtDict, GetConf, find_path, translate_config_paths
-from ..lib.gd_service import gd_connect, GoogleDriveFile, FileNotUploadedError  # pyright: ignore[reportAttributeAccessIssue]
+from ..lib.app_utils import AtDict, GetConf, find_path, load_records, normalize_column_name, translate_config_paths
+from ..lib.gd_service import gd_connect, GoogleDriveFile, GoogleDriveFileCache, FileNotUploadedError  # pyright: ignore[reportAttributeAccessIssue]
+from ..lib.loggr import LazyFormat
 
 
 logging.basicConfig(level=logging.INFO)
@@ -87,6 +90,11 @@ class DbFileSchema:
         if self.col_id not in self.cols:
             raise ValueError(f'col_id "{self.col_id}" must be present in cols')
         self.cols_secret = self.ensure_type("cols_secret", list, schema_conf.get("cols_secret", []))
+        # Columns to keep secondary (non-unique) indexes for, see DbFile.find_items_by()
+        self.indexes = [c.strip().replace(" ", "_") for c in self.ensure_type("indexes", list, schema_conf.get("indexes", []))]
+        for c in self.indexes:
+            if c not in self.cols and c not in self.cols_optional:
+                raise ValueError(f'Index column "{c}" must be present in cols or cols_optional')
         self.id_template = self.ensure_type("id_template", dict, schema_conf.get("id_template", {}))
         if id_template_values_add:
             if "values" not in self.id_template:
@@ -107,6 +115,8 @@ _T = TypeVar("_T", bound=BaseModel)
 
 class DbFile(Generic[_T]):
     MAX_SN = 1000
+    JOURNAL_EXT = ".journal"
+    JOURNAL_COMPACT_EVERY = 100
 
     def __init__(self, config: GetConf, schema: DbFileSchema, model_type: type[_T], loggr: Optional[logging.Logger] = logger, debug: bool = False) -> None:
         if not loggr:
@@ -121,7 +131,12 @@ class DbFile(Generic[_T]):
         self._model_type = model_type
         self.debug = debug
         self.loggr = loggr
-        self.items: list[_T] = []
+        # Indexes, kept in sync with self.items:
+        self._index: dict[Any, _T] = {}  # By schema.col_id
+        self._secondary: dict[str, dict[Any, list[_T]]] = {c: {} for c in self.schema.indexes}  # By schema.indexes
+        # unique_item_id() allocation state: (iterator settings key, next serial to check, {item_id: serial})
+        self._sn_state: Optional[tuple[tuple, int, dict[Any, int]]] = None
+        self._items: list[_T] = []
 
         # Compiled columns from database file:
         self.db_file_cols: Optional[list[str]] = None
@@ -129,6 +144,14 @@ class DbFile(Generic[_T]):
         # Backend files:
         self.db_file: Optional[str] = None
         self.gd_file: Optional[GoogleDriveFile] = None
+        # Local file journal mode - changes are appended to the journal file, and compacted into db_file periodically:
+        self.journal = bool(self.conf.get_sub("Local", "journal", default=False, t=bool))
+        self.journal_compact_every = int(self.conf.get_sub("Local", "journal_compact_every", default=DbFile.JOURNAL_COMPACT_EVERY, t=int) or DbFile.JOURNAL_COMPACT_EVERY)
+        self._journal_count = 0
+        # GoogleDrive file delta mode - upload only when content changed:
+        self._gd_content_hash: Optional[str] = None
+        # GoogleDrive file local cache:
+        self.gd_cache = GoogleDriveFileCache.from_conf(self.conf, self.loggr, self.schema.cols_secret)
         # Look for database file in GoogleDrive first
         gd_secrets_file = self.conf.get_sub("GoogleDrive", "secrets", default=None)
         local_db_filename = self.conf.get_sub("Local", "db_file", default=None)
@@ -147,6 +170,45 @@ class DbFile(Generic[_T]):
         if not self.gd_file and not self.db_file:
             raise FileNotFoundError(f"Cannot load {self.schema.items_name} database")
 
+    @property
+    def items(self) -> list[_T]:
+        return self._items
+
+    @items.setter
+    def items(self, items: list[_T]) -> None:
+        self._items = items
+        self._reindex()
+
+    def _reindex(self) -> None:
+        """Rebuild all indexes from self.items (needed only if self.items list is modified in place)."""
+        self._index = {}
+        self._secondary = {c: {} for c in self.schema.indexes}
+        self._sn_state = None
+        for item in self._items:
+            self._index_add(item)
+
+    def _index_add(self, item: _T) -> None:
+        self._index[getattr(item, self.schema.col_id)] = item
+        for c, index in self._secondary.items():
+            index.setdefault(getattr(item, c, None), []).append(item)
+
+    def _index_remove(self, item: _T) -> None:
+        item_id = getattr(item, self.schema.col_id)
+        self._index.pop(item_id, None)
+        for c, index in self._secondary.items():
+            key = getattr(item, c, None)
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket[:] = [i for i in bucket if i is not item]
+                if not bucket:
+                    del index[key]
+        if self._sn_state:
+            # Make the freed serial available again to unique_item_id()
+            key, next_sn, sn_by_id = self._sn_state
+            sn = sn_by_id.pop(item_id, None)
+            if sn is not None and sn < next_sn:
+                self._sn_state = (key, sn, sn_by_id)
+
     @property
     def model_type(self) -> type[_T]:
         """Returns the Pydantic model type used by the DbFile instance."""
@@ -181,7 +243,9 @@ class DbFile(Generic[_T]):
         # gd_file_id = 'TBD'
         # in_file_fd = self.gds.open_file_by_id(gd_file_id)
         self.loggr.info(f'Reading {self.schema.items_name} database from GoogleDrive "{gd_file_title}" file.')
-        if create_if_missing:
+        if self.gd_cache:
+            in_file_fd, created = self.gd_cache.find_file_by_title(self.gds, gd_file_title, gd_folder_id, create_if_missing)
+        elif create_if_missing:
             in_file_fd, created = self.gds.maybe_create_file_by_title(gd_file_title, gd_folder_id)
         else:
             in_file_fd, created = self.gds.get_file_by_title(gd_file_title, gd_folder_id), False
@@ -190,7 +254,8 @@ class DbFile(Generic[_T]):
             items = []
             self.db_file_cols_init()
         elif in_file_fd:
-            content = in_file_fd.GetContentString()
+            content = self.gd_cache.get_content(in_file_fd) if self.gd_cache else in_file_fd.GetContentString()
+            self._gd_content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
             # FileNotUploadedError would be thrown if we ignored `created`.
             # Any other exception is due to real trouble.
             buffered = io.StringIO(content)
@@ -215,13 +280,72 @@ class DbFile(Generic[_T]):
                     break
             self.db_file = db_filename_found
             self.db_file_cols_init()
-            return []
+            return self.db_journal_replay([])
 
         with open(db_filename_found, newline="", encoding="utf-8") as in_file_fd:
             self.loggr.info(f'Reading {self.schema.items_name} database from "{db_filename_found}" file.')
             items = self.db_file_load_fd(in_file_fd)
             self.db_file = db_filename_found
+            return self.db_journal_replay(items)
+
+    def journal_file(self) -> Optional[str]:
+        return self.db_file + DbFile.JOURNAL_EXT if self.db_file else None
+
+    def db_journal_replay(self, items: list[_T]) -> list[_T]:
+        """Apply changes from the journal file (if any) to the items loaded from db_file."""
+        journal_file = self.journal_file()
+        self._journal_count = 0
+        if not journal_file or not os.path.isfile(journal_file):
             return items
+        col_id = self.schema.col_id
+        by_id = {getattr(item, col_id): item for item in items}
+        with open(journal_file, encoding="utf-8") as in_file_fd:
+            for line_num, line in enumerate(in_file_fd, 1):
+                line = line.strip()  # noqa: PLW2901
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Last record may be incomplete if the app was interrupted while writing it
+                    self.loggr.warning(f'Skipping malformed record in line {line_num} of {self.schema.items_name} journal file "{journal_file}".')
+                    continue
+                if record.get("op") == "add":
+                    item = self.model_type(**record["item"])
+                    by_id[getattr(item, col_id)] = item
+                elif record.get("op") == "del":
+                    by_id.pop(record["id"], None)
+                self._journal_count += 1
+        self.loggr.info(f'Applied {self._journal_count} change(s) from {self.schema.items_name} journal file "{journal_file}".')
+        return list(by_id.values())
+
+    def db_journal_append(self, records: list[dict[str, Any]]) -> int:
+        """Append change records to the journal file, and compact the journal into db_file when it gets long."""
+        journal_file = self.journal_file()
+        if not journal_file:
+            raise ValueError("Expected non-empty self.db_file.")
+        try:
+            with open(journal_file, "a", encoding="utf-8") as out_file_fd:
+                for record in records:
+                    out_file_fd.write(json.dumps(record, default=str) + "\n")
+                out_file_fd.flush()
+                os.fsync(out_file_fd.fileno())
+            self._journal_count += len(records)
+        except Exception as e:  # pylint: disable:broad-exception-caught
+            self.loggr.error(f'Error {type(e)} "{e}" saving {self.schema.items_name} database journal file')
+            return -1
+        if self._journal_count >= self.journal_compact_every:
+            return self.db_compact()
+        return 0
+
+    def db_compact(self) -> int:
+        """Write all items to db_file and remove the journal file."""
+        journal_file = self.journal_file()
+        res = self.db_file_save_back(use_journal=False)
+        if not res and journal_file and os.path.isfile(journal_file):
+            os.remove(journal_file)
+            self._journal_count = 0
+        return res
 
     def db_file_load_fd(self, in_file_fd: Iterable[str]) -> list[_T]:
         csvreader = csv.reader(in_file_fd, delimiter=",", quotechar='"')
@@ -323,6 +447,7 @@ class DbFile(Generic[_T]):
                         val = t()
                     item_data[key] = val
                 self.items[i] = self.model_type(**item_data)
+            self._reindex()
             self.loggr.info(f'Upgraded file "{self.db_file or self.gd_file}" to Schema v{version}.')
 
     def db_file_save(self, items, out_file: str) -> None:
@@ -349,21 +474,41 @@ class DbFile(Generic[_T]):
                 row += [str(val)]
             csvwriter.writerow(row)
 
-    def db_file_save_back(self) -> int:
+    def db_file_save_back(self, records: Optional[list[dict[str, Any]]] = None, use_journal: bool = True) -> int:
+        """Save items to the backend file.
+
+        Args:
+            records: Change records (see db_journal_append()) for journal mode. Defaults to None.
+            use_journal: Allow appending records to the journal file instead of writing all items, if journal mode is enabled. Defaults to True.
+
+        Returns:
+            0 if successful
+        """
+        if use_journal and records and self.journal and self.db_file and not self.gd_file:
+            return self.db_journal_append(records)
         try:
             if self.gd_file and self.gds:
                 self.db_file_upgrade_maybe()
-                self.loggr.info(f'Writing {self.schema.items_name} database to GoogleDrive "{self.gd_file["title"]}" file.')
 
                 # buffered = io.BytesIO()
                 # buffered.seek(0)
                 buffered = io.StringIO()
 
                 self.db_file_save_fd(self.items, buffered)
-                buffered.seek(0)
+                content = buffered.getvalue()
+                content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+                if content_hash == self._gd_content_hash:
+                    self.loggr.debug(LazyFormat('No changes to %s database, skipped writing to GoogleDrive "%s" file.', self.schema.items_name, self.gd_file["title"]))
+                    return 0
+                self.loggr.info(f'Writing {self.schema.items_name} database to GoogleDrive "{self.gd_file["title"]}" file.')
                 # self.gd_file.content = buffered
-                self.gd_file.SetContentString(buffered.getvalue())
+                if self.gd_cache:
+                    self.gd_cache.check_unchanged(self.gd_file)
+                self.gd_file.SetContentString(content)
                 self.gd_file.Upload()
+                self._gd_content_hash = content_hash
+                if self.gd_cache:
+                    self.gd_cache.put(self.gd_file, content)
             elif self.db_file:
                 self.db_file_save(self.items, self.db_file)
         except Exception as e:  # pylint: disable:broad-exception-caught
@@ -375,21 +520,84 @@ class DbFile(Generic[_T]):
         item_id = getattr(item, self.schema.col_id)
         if self.find_item_by_id(item_id):
             raise ValueError(f'Site "{item_id}" already exists in the database')
-        self.items += [item]
-        return self.db_file_save_back()
+        self.items.append(item)
+        self._index_add(item)
+        return self.db_file_save_back([{"op": "add", "item": item.model_dump(exclude_none=True)}])
 
     def db_delete_item(self, item_id: str) -> int:
         item = self.find_item_by_id(item_id)
         if not item:
             raise ValueError(f'Device "{item_id}" is not found in the database')
         self.items.remove(item)
-        return self.db_file_save_back()
+        self._index_remove(item)
+        return self.db_file_save_back([{"op": "del", "id": item_id}])
+
+    def items_from_records(self, records: list[dict[str, Any]]) -> list[_T]:
+        """Validate records (e.g. from `load_records()`) through the model, all errors are collected and reported together.
+
+        Raises:
+            ValueError: If any of the records is invalid
+        """
+        items: list[_T] = []
+        errors: list[str] = []
+        # Record keys are matched to schema columns by normalized name
+        cols = {normalize_column_name(c): c for c in [*self.schema.cols, *self.schema.cols_optional]}
+        for i, record in enumerate(records, 1):
+            try:
+                items.append(self.model_type(**{cols.get(normalize_column_name(k), k): v for k, v in record.items()}))
+            except Exception as e:  # noqa: PERF203  # pylint: disable:broad-exception-caught
+                errors.append(f"record {i}: {e}")
+        if errors:
+            raise ValueError(f"Invalid {self.schema.items_name}: " + "; ".join(errors))
+        return items
+
+    def db_add_items(self, items: list[_T]) -> int:
+        """Add many items in one transaction - all items are checked first, and the database is saved once.
+
+        Raises:
+            ValueError: If any item id already exists in the database or is repeated, nothing is added
+        """
+        errors = []
+        seen = set()
+        for item in items:
+            item_id = getattr(item, self.schema.col_id)
+            if item_id in seen or self.find_item_by_id(item_id):
+                errors.append(f'"{item_id}"')
+            seen.add(item_id)
+        if errors:
+            raise ValueError(f"{self.schema.item_name.capitalize()}(s) {', '.join(errors)} already exist in the database")
+        for item in items:
+            self.items.append(item)
+            self._index_add(item)
+        return self.db_file_save_back([{"op": "add", "item": item.model_dump(exclude_none=True)} for item in items])
+
+    def db_delete_items(self, item_ids: list) -> int:
+        """Delete many items in one transaction - all items are checked first, and the database is saved once.
+
+        Raises:
+            ValueError: If any item id is not found in the database, nothing is deleted
+        """
+        missing = [f'"{item_id}"' for item_id in item_ids if not self.find_item_by_id(item_id)]
+        if missing:
+            raise ValueError(f"{self.schema.item_name.capitalize()}(s) {', '.join(missing)} not found in the database")
+        item_ids = list(dict.fromkeys(item_ids))
+        for item_id in item_ids:
+            item = self.find_item_by_id(item_id)
+            self.items.remove(item)
+            self._index_remove(item)
+        return self.db_file_save_back([{"op": "del", "id": item_id} for item_id in item_ids])
 
     def find_item_by_id(self, item_id) -> _T | None:
-        for item in self.items:
-            if item_id == getattr(item, self.schema.col_id):
-                return item
-        return None
+        return self._index.get(item_id)
+
+    def find_items_by(self, col: str, value) -> list[_T]:
+        """Find all items with the given value in the column. Uses index if column is listed in Schema "indexes", otherwise scans all items."""
+        if col == self.schema.col_id:
+            item = self._index.get(value)
+            return [item] if item else []
+        if col in self._secondary:
+            return list(self._secondary[col].get(value, []))
+        return [item for item in self.items if getattr(item, col, None) == value]
 
     def unique_item_id(self) -> tuple:
         if self.schema.col_id not in self.schema.id_template:
@@ -411,6 +619,14 @@ class DbFile(Generic[_T]):
             values = {}
         values[_iter.key] = _iter.fr
 
+        # Serials below next_sn are known to be taken (their ids are remembered, so deleting an item frees its serial),
+        # so each serial is checked only once over the lifetime of the loaded database.
+        state_key = (_iter.key, _iter.fr, _iter.to, _iter.step, tuple(sorted((k, str(v)) for k, v in values.items())))
+        if not self._sn_state or self._sn_state[0] != state_key:
+            self._sn_state = (state_key, int(_iter.fr), {})
+        _, next_sn, sn_by_id = self._sn_state
+        values[_iter.key] = next_sn
+
         while int(values["sn"]) < _iter.to:
             templates: dict[str, str] = {}
             for k, v in self.schema.id_template.items():
@@ -418,8 +634,11 @@ class DbFile(Generic[_T]):
                     continue
                 if isinstance(v, str):
                     templates[k] = v.format(**values)
-            if not self.find_item_by_id(templates[self.schema.col_id]):
+            item_id = templates[self.schema.col_id]
+            if not self.find_item_by_id(item_id):
+                self._sn_state = (state_key, int(values[_iter.key]), sn_by_id)
                 return tuple(templates.values())
+            sn_by_id[item_id] = int(values[_iter.key])
             values[_iter.key] = int(values[_iter.key]) + _iter.step
         return tuple(None for _ in range(len(templates)))
 
@@ -538,6 +757,31 @@ def cmd_add(db: DbFile, args: argparse.Namespace) -> int:
     return res
 
 
+def cmd_add_bulk(db: DbFile, args: argparse.Namespace) -> int:
+    try:
+        items = db.items_from_records(load_records(args.file))
+        res = db.db_add_items(items)
+    except (OSError, ValueError, TypeError, NotImplementedError) as err:
+        eprint(f"{err}")
+        return 1
+    if not res:
+        print(f'Added {len(items)} new {db.schema.items_name} to {db.schema.items_name} Database from "{args.file}"')
+    return res
+
+
+def cmd_delete_bulk(db: DbFile, args: argparse.Namespace) -> int:
+    try:
+        col_id = normalize_column_name(db.schema.col_id)
+        item_ids = [record.get(col_id) for record in load_records(args.file)]
+        res = db.db_delete_items(item_ids)
+    except (OSError, ValueError, TypeError, NotImplementedError) as err:
+        eprint(f"{err}")
+        return 1
+    if not res:
+        print(f'Deleted {len(item_ids)} {db.schema.items_name} from {db.schema.items_name} Database listed in "{args.file}"')
+    return res
+
+
 def _parse_args(progname: str) -> tuple[argparse.Namespace, argparse.ArgumentParser]:
     parser = argparse.ArgumentParser(description="Manage Database (list,add)")
 
@@ -557,6 +801,14 @@ def _parse_args(progname: str) -> tuple[argparse.Namespace, argparse.ArgumentPar
     add_parser = subparsers.add_parser("add", help="Add item to Database")
     add_parser.add_argument(dest="fields", nargs=argparse.REMAINDER, help="fields")
 
+    # "add_bulk" command
+    add_bulk_parser = subparsers.add_parser("add_bulk", help="Add all items from a .csv or .jsonl file to Database (all or nothing)")
+    add_bulk_parser.add_argument("file", type=str, help="File with items (.csv with header row, or .jsonl)")
+
+    # "delete_bulk" command
+    delete_bulk_parser = subparsers.add_parser("delete_bulk", help="Delete all items listed in a .csv or .jsonl file from Database (all or nothing)")
+    delete_bulk_parser.add_argument("file", type=str, help="File with item ids (.csv with header row, or .jsonl)")
+
     # "get" command
     _get_parser = subparsers.add_parser("get", help="Get Database item")
 
@@ -574,7 +826,7 @@ def main(loggr: logging.Logger = logger) -> int:
     if loggr:
         if args.debug:
             loggr.setLevel(logging.DEBUG)
-        loggr.debug(f"DEBUG {vars(args)}")
+        loggr.debug(LazyFormat("DEBUG %s", vars(args)))
 
     try:
         if args.command == "list":
@@ -583,6 +835,10 @@ def main(loggr: logging.Logger = logger) -> int:
             return cmd_unique(get_db(loggr, args), args)
         if args.command == "add":
             return cmd_add(get_db(loggr, args), args)
+        if args.command == "add_bulk":
+            return cmd_add_bulk(get_db(loggr, args), args)
+        if args.command == "delete_bulk":
+            return cmd_delete_bulk(get_db(loggr, args), args)
 
     except Exception as e:  # pylint: disable:broad-exception-caught
         if loggr:
@@ -22,8 +22,8 @@ from collections.abc import Iterable, Mapping
 from pi_base.modpath import get_app_workspace_dir, get_script_dir  # pylint: disable=wrong-import-position
 
 # pylint: disable=wrong-import-order
-from .app_utils import GetConf, find_path
-from .gd_service import gd_connect, FileNotUploadedError  # pyright: ignore[reportAttributeAccessIssue]
+from .app_utils import GetConf, find_path, load_records
+from .gd_service import gd_connect, GoogleDriveFileCache, FileNotUploadedError  # pyright: ignore[reportAttributeAccessIssue]
 
 
 logging.basicConfig(level=logging.INFO)
@@ -98,6 +98,7 @@ class DeploySiteDB:
 
         # Look for sites DB in GoogleDrive first
         self.gd_file = None
+        self.gd_cache = GoogleDriveFileCache.from_conf(self.conf, self.loggr, self.cols_secret)
         gd_secrets = self.conf.get_sub("GoogleDrive", "secrets")
         if gd_secrets:
             gd_secrets_actual, _paths = find_path(gd_secrets, self.secrets_paths, self.loggr)
@@ -122,7 +123,9 @@ class DeploySiteDB:
             raise ValueError("Expected non-empty self.gds.")
         sites = None
         self.loggr.info(f'Reading sites database from GoogleDrive "{gd_file_title}" file.')
-        if create_if_missing:
+        if self.gd_cache:
+            in_file_fd, created = self.gd_cache.find_file_by_title(self.gds, gd_file_title, gd_folder_id, create_if_missing)
+        elif create_if_missing:
             in_file_fd, created = self.gds.maybe_create_file_by_title(gd_file_title, gd_folder_id)
         else:
             in_file_fd, created = self.gds.get_file_by_title(gd_file_title, gd_folder_id), False
@@ -132,7 +135,7 @@ class DeploySiteDB:
             self.db_file_cols_init()
         elif in_file_fd:
             try:
-                content = in_file_fd.GetContentString()
+                content = self.gd_cache.get_content(in_file_fd) if self.gd_cache else in_file_fd.GetContentString()
             except FileNotUploadedError as err:
                 self.db_file_cols_init()
                 return [], in_file_fd
@@ -223,6 +226,35 @@ class DeploySiteDB:
         if self.find_site_by_id(site.site_id):
             raise ValueError(f'Site "{site.site_id}" already exists in the database')
         self.sites += [site]
+        return self.db_file_save_back()
+
+    def db_add_sites(self, sites: list[DeploySite]) -> int:
+        """Add many sites in one transaction - all sites are checked first, and the database is saved once."""
+        errors = []
+        seen = set()
+        for i, site in enumerate(sites, 1):
+            for c in self.cols:
+                key = c.replace(" ", "_")
+                if not getattr(site, key, None):
+                    errors.append(f'record {i}: missing "{key}"')
+            if site.site_id in seen or self.find_site_by_id(site.site_id):
+                errors.append(f'record {i}: site "{site.site_id}" already exists')
+            seen.add(site.site_id)
+        if errors:
+            raise ValueError("Cannot add sites: " + "; ".join(errors))
+        self.sites += sites
+        return self.db_file_save_back()
+
+    def db_delete_sites(self, site_ids: list[str]) -> int:
+        """Delete many sites in one transaction - all sites are checked first, and the database is saved once."""
+        missing = [f'"{site_id}"' for site_id in site_ids if not self.find_site_by_id(site_id)]
+        if missing:
+            raise ValueError(f"Site(s) {', '.join(missing)} not found in the database")
+        to_delete = set(site_ids)
+        self.sites = [site for site in self.sites if site.site_id not in to_delete]
+        return self.db_file_save_back()
+
+    def db_file_save_back(self) -> int:
         try:
             if self.gd_file and self.gds:
                 self.loggr.info(f'Writing site database to GoogleDrive "{self.gd_file["title"]}" file.')
@@ -234,8 +266,12 @@ class DeploySiteDB:
                 self.db_file_save_fd(self.sites, buffered)
                 buffered.seek(0)
                 # self.gd_file.content = buffered
+                if self.gd_cache:
+                    self.gd_cache.check_unchanged(self.gd_file)
                 self.gd_file.SetContentString(buffered.getvalue())
                 self.gd_file.Upload()
+                if self.gd_cache:
+                    self.gd_cache.put(self.gd_file, buffered.getvalue())
             elif self.db_file:
                 self.db_file_save(self.sites, self.db_file)
         except Exception as e:  # pylint: disable:broad-exception-caught
@@ -320,6 +356,30 @@ def cmd_add(db: DeploySiteDB, args) -> int:
     return res
 
 
+def cmd_add_bulk(db: DeploySiteDB, args) -> int:
+    try:
+        sites = [DeploySite(**{k: v for k, v in record.items() if k in ["site_id", "site_name", "sa_client_secrets", "description"]}) for record in load_records(args.file)]
+        res = db.db_add_sites(sites)
+    except (OSError, ValueError, TypeError, NotImplementedError) as err:
+        eprint(f"{err}")
+        return 1
+    if not res:
+        print(f'Added {len(sites)} new sites to Sites DB from "{args.file}"')
+    return res
+
+
+def cmd_delete_bulk(db: DeploySiteDB, args) -> int:
+    try:
+        site_ids = [record.get("site_id") for record in load_records(args.file)]
+        res = db.db_delete_sites(site_ids)
+    except (OSError, ValueError, TypeError, NotImplementedError) as err:
+        eprint(f"{err}")
+        return 1
+    if not res:
+        print(f'Deleted {len(site_ids)} sites from Sites DB listed in "{args.file}"')
+    return res
+
+
 def _parse_args(progname: str) -> tuple[argparse.Namespace, argparse.ArgumentParser]:
     parser = argparse.ArgumentParser(description="Manage Deployment Sites (list,add)")
 
@@ -344,6 +404,14 @@ def _parse_args(progname: str) -> tuple[argparse.Namespace, argparse.ArgumentPar
     add_parser.add_argument("sa_client_secrets", type=str, help="Site GoogleDrive ServiceAccount secrets file")
     add_parser.add_argument("-D", "--description", dest="description", help="Site description")
 
+    # "add_bulk" command
+    add_bulk_parser = subparsers.add_parser("add_bulk", help="Add all Deployment Sites from a .csv or .jsonl file (all or nothing)")
+    add_bulk_parser.add_argument("file", type=str, help="File with sites (.csv with header row, or .jsonl)")
+
+    # "delete_bulk" command
+    delete_bulk_parser = subparsers.add_parser("delete_bulk", help="Delete all Deployment Sites listed in a .csv or .jsonl file (all or nothing)")
+    delete_bulk_parser.add_argument("file", type=str, help="File with site ids (.csv with header row, or .jsonl)")
+
     # "get" command
     _get_parser = subparsers.add_parser("get", help="Get Deployment Site")
 
@@ -372,6 +440,10 @@ def main(loggr=logger) -> int:
             return cmd_unique(db, args)
         if args.command == "add":
             return cmd_add(db, args)
+        if args.command == "add_bulk":
+            return cmd_add_bulk(db, args)
+        if args.command == "delete_bulk":
+            return cmd_delete_bulk(db, args)
 
     except Exception as e:  # pylint: disable:broad-exception-caught
         if loggr:
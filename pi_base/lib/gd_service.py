@@ -17,24 +17,32 @@
 
 from __future__ import annotations
 
+from bisect import bisect_right
+from concurrent.futures import Future
+import hashlib
 import inspect
+import io
+import json
 import logging
 import mimetypes
 import os
+from pathlib import Path
 import sys
-from typing import Optional
+import threading
+import time
+from typing import IO, Any, ClassVar, Optional, Union
 
 from apiclient import errors
 from googleapiclient.discovery import build, Resource
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
 from httplib2 import Http
 from oauth2client.service_account import ServiceAccountCredentials, client
 from pydrive2.auth import GoogleAuth
 from pydrive2.drive import GoogleDrive
 from pydrive2.files import GoogleDriveFile, MediaIoReadable, ApiRequestError, FileNotUploadedError
 
-from .app_utils import GetConf  # pylint: disable=relative-beyond-top-level
+from .app_utils import GetConf, path_sanitize  # pylint: disable=relative-beyond-top-level
 
 __all__ = [
     # Unused imports for export
@@ -43,6 +51,10 @@ __all__ = [
     # API:
     "gd_connect",
     "GoogleDriveService",
+    "GoogleDriveFileCache",
+    "GoogleDriveSessionPool",
+    "GoogleDriveUploadBatcher",
+    "LinesReader",
     "GoogleDrive",
     "GoogleDriveFile",
     # Examples:
@@ -54,7 +66,71 @@ __all__ = [
 ]
 
 
+class LinesReader(io.RawIOBase):
+    """Seekable binary stream over a list of text lines (without joining them into one buffer), e.g. for uploading `ResultsWriter.results_buffer`.
+
+    Each line is terminated with `line_end` and encoded on demand when read (only the encoded sizes are computed upfront).
+    The lines list should not be modified while the stream is in use.
+    """
+
+    def __init__(self, lines: list[str], line_end: str = "\n", encoding: str = "utf-8") -> None:
+        super().__init__()
+        self._lines = lines
+        self._line_end = line_end
+        self._encoding = encoding
+        self._offsets: list[int] = []  # Start offset of each encoded line
+        size = 0
+        for line in lines:
+            self._offsets.append(size)
+            size += len((line + line_end).encode(encoding))
+        self._size = size
+        self._pos = 0
+        self._chunk_index = -1  # Index of the line in `_chunk`
+        self._chunk = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._size
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+        self._pos = offset
+        return self._pos
+
+    def _get_chunk(self, i: int) -> bytes:
+        if i != self._chunk_index:
+            self._chunk = (self._lines[i] + self._line_end).encode(self._encoding)
+            self._chunk_index = i
+        return self._chunk
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        n = 0
+        i = bisect_right(self._offsets, self._pos) - 1
+        while n < len(view) and 0 <= i < len(self._lines) and self._pos < self._size:
+            chunk = self._get_chunk(i)
+            start = self._pos - self._offsets[i]
+            count = min(len(chunk) - start, len(view) - n)
+            view[n : n + count] = chunk[start : start + count]
+            n += count
+            self._pos += count
+            i += 1
+        return n
+
+
 class GoogleDriveService:
+    BATCH_MAX = 100  # Google Drive API limit of requests in one batch
+
     def __init__(self, loggr: Optional[logging.Logger] = None) -> None:
         self.loggr = loggr
         self._secrets_file: Optional[str] = None
@@ -148,6 +224,12 @@ class GoogleDriveService:
             self.service = build(api, api_version, http=http_auth, cache_discovery=False)
         return self.service
 
+    def close(self) -> None:
+        """Close the HTTP connections of the service, it is re-created by the next `get_service()`."""
+        if self.service:
+            self.service.close()
+            self.service = None
+
     def open_file_by_id(self, file_id: str) -> Optional[MediaIoReadable]:
         drive = self.get_drive()
         if not drive:
@@ -170,17 +252,25 @@ class GoogleDriveService:
         return gfile, content
 
     def upload_file(
-        self, dir_id: Optional[str], file_path: str, mimetype: str, dst_filename: Optional[str] = None, dst_mimetype: Optional[str] = None, resumable: bool = True
+        self,
+        dir_id: Optional[str],
+        file_path: str,
+        mimetype: str,
+        dst_filename: Optional[str] = None,
+        dst_mimetype: Optional[str] = None,
+        resumable: bool = True,
+        source: Optional[Union[bytes, list[str], IO[bytes]]] = None,
     ) -> Optional[GoogleDriveFile]:
         """Upload a file (optionally resumable, and optionally with conversion if dst_mimetype provided and is different than mimetype).
 
         Args:
             dir_id: ID of the parent directory to upload to
-            file_path: Path to the source file to upload
+            file_path: Path to the source file to upload (if source is given, only used for the default dst_filename and mimetype)
             mimetype: MIME type of the source file
             dst_filename: Name of the destination file
             dst_mimetype: MIME type of the destination file (provide different value for automatic conversion)
             resumable: Use resumable upload
+            source: In-memory source to upload instead of reading file_path - bytes, list of text lines, or seekable binary stream
 
         Returns:
             Uploaded file object
@@ -206,7 +296,7 @@ class GoogleDriveService:
             }
             if dir_id:
                 file_metadata["parents"] = [dir_id]
-            media = MediaFileUpload(file_path, mimetype=mimetype, resumable=resumable)
+            media = self.make_media(file_path, mimetype, resumable, source)
             # pylint: disable=maybe-no-member
             files_service = service.files()  # pyright: ignore[reportAttributeAccessIssue]
             if files_service:
@@ -221,6 +311,84 @@ class GoogleDriveService:
 
         return file
 
+    @classmethod
+    def make_media(cls, file_path: str, mimetype: str, resumable: bool = True, source: Optional[Union[bytes, list[str], IO[bytes]]] = None) -> Union[MediaFileUpload, MediaIoBaseUpload]:
+        """Create media object for uploading from a file, or from in-memory source (see `upload_file()`)."""
+        if source is None:
+            return MediaFileUpload(file_path, mimetype=mimetype, resumable=resumable)
+        if isinstance(source, (bytes, bytearray)):
+            fd: IO[bytes] = io.BytesIO(source)
+        elif isinstance(source, list):
+            fd = LinesReader(source)  # pyright: ignore[reportAssignmentType]
+        else:
+            fd = source
+        return MediaIoBaseUpload(fd, mimetype=mimetype, resumable=resumable)
+
+    def upload_files_batch(self, uploads: list[dict[str, Any]]) -> list[tuple[Optional[GoogleDriveFile], Optional[Exception]]]:
+        """Upload multiple files, creating them in batched API calls (up to `BATCH_MAX` files per call).
+
+        Drive API does not accept media uploads in batch requests, so the batch only creates the files (metadata),
+        and the content of each created file is then uploaded by a separate request over the same session.
+        If the content upload fails, the created (empty) file is deleted.
+
+        Args:
+            uploads: List of dicts with `upload_file()` args: "dir_id", "file_path", "mimetype", and optional "dst_filename", "dst_mimetype", "source"
+
+        Returns:
+            List of (uploaded file object or None, error or None) for each upload, in the same order
+        """
+        service = self.get_service()
+        if not service:
+            raise ConnectionError("Could not get service from GoogleDrive")
+        if not hasattr(service, "files"):
+            raise ValueError('Expected GoogleDrive "drive" service to have "files" attribute')
+        files_service = service.files()  # pyright: ignore[reportAttributeAccessIssue]
+        results: list[tuple[Optional[GoogleDriveFile], Optional[Exception]]] = [(None, None)] * len(uploads)
+        medias: list[Optional[Union[MediaFileUpload, MediaIoBaseUpload]]] = [None] * len(uploads)
+
+        def on_response(request_id: str, response: Optional[GoogleDriveFile], exception: Optional[Exception]) -> None:
+            results[int(request_id)] = (response, exception)
+
+        for start in range(0, len(uploads), self.BATCH_MAX):
+            batch = service.new_batch_http_request(callback=on_response)  # pyright: ignore[reportAttributeAccessIssue]
+            for i in range(start, min(start + self.BATCH_MAX, len(uploads))):
+                upload = uploads[i]
+                try:
+                    file_path = upload["file_path"]
+                    mimetype = upload.get("mimetype") or mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+                    file_metadata: dict[str, str | list[str]] = {
+                        "name": upload.get("dst_filename") or os.path.basename(file_path),
+                        "mimeType": upload.get("dst_mimetype") or mimetype,
+                    }
+                    dir_id = upload.get("dir_id")
+                    if dir_id:
+                        file_metadata["parents"] = [dir_id]
+                    medias[i] = self.make_media(file_path, mimetype, resumable=False, source=upload.get("source"))
+                    batch.add(files_service.create(body=file_metadata, fields="id", supportsAllDrives=dir_id is not None), request_id=str(i))
+                except Exception as err:
+                    results[i] = (None, err)
+            try:
+                batch.execute()
+            except Exception as err:
+                # Whole batch failed - report to all files in it that have no result yet
+                for i in range(start, min(start + self.BATCH_MAX, len(uploads))):
+                    if results[i] == (None, None):
+                        results[i] = (None, err)
+
+        for i, ((file, err), media) in enumerate(zip(results, medias)):
+            if err or not file or not media:
+                continue
+            try:
+                results[i] = (files_service.update(fileId=file["id"], media_body=media, fields="id", supportsAllDrives=True).execute(), None)
+            except Exception as upload_err:
+                results[i] = (None, upload_err)
+                try:
+                    files_service.delete(fileId=file["id"], supportsAllDrives=True).execute()
+                except Exception as delete_err:
+                    if self.loggr:
+                        self.loggr.warning(f'Error "{delete_err}" deleting GoogleDrive file id "{file["id"]}" after failed content upload.')
+        return results
+
     # https://developers.google.com/drive/api/v2/reference/files/list
     @classmethod
     def retrieve_all_files(cls, service: Resource) -> list[GoogleDriveFile]:
@@ -360,6 +528,379 @@ class GoogleDriveService:
         return None
 
 
+class GoogleDriveSessionPool:
+    """Process-wide pool of authenticated GoogleDriveService sessions, keyed by the secrets file.
+
+    Secrets file contents and credentials are loaded once and re-used until the secrets file changes. The HTTP client
+    (and its connections) is re-used by all callers, and the access token is refreshed by the credentials only when it expires.
+    httplib2 connections are not thread-safe, so each thread gets its own session (sharing the loaded secrets). Sessions
+    are kept in thread-local storage, so the session of a finished thread is released with the thread.
+    """
+
+    _lock = threading.Lock()
+    # { secrets_file_realpath: (mtime_ns, size, conf) }
+    _entries: ClassVar[dict[str, tuple[int, int, GetConf]]] = {}
+    # .sessions: { secrets_file_realpath: (entry the session was created for, GoogleDriveService) }
+    _local = threading.local()
+
+    @classmethod
+    def _get_entry(cls, secrets_file: str) -> tuple[str, tuple[int, int, GetConf]]:
+        path = os.path.realpath(secrets_file)
+        st = Path(path).stat()
+        with cls._lock:
+            entry = cls._entries.get(path)
+            if not entry or entry[0] != st.st_mtime_ns or entry[1] != st.st_size:
+                conf = GetConf(filepath=path)
+                entry = (st.st_mtime_ns, st.st_size, conf)
+                cls._entries[path] = entry
+            return path, entry
+
+    @classmethod
+    def _sessions(cls) -> dict[str, tuple[tuple[int, int, GetConf], GoogleDriveService]]:
+        """Sessions of the calling thread."""
+        sessions = getattr(cls._local, "sessions", None)
+        if sessions is None:
+            sessions = cls._local.sessions = {}
+        return sessions
+
+    @classmethod
+    def get_conf(cls, secrets_file: str) -> GetConf:
+        """Get (cached) contents of the secrets file.
+
+        Args:
+            secrets_file: Path to secrets json file
+
+        Returns:
+            GetConf object with the secrets file contents
+        """
+        _, entry = cls._get_entry(secrets_file)
+        return entry[2]
+
+    @classmethod
+    def get(cls, secrets_file: str, loggr: Optional[logging.Logger] = None) -> GoogleDriveService:
+        """Get (cached) service account session for the secrets file, authenticating if needed.
+
+        The session is shared, so it logs to the `loggr` of the latest `get()` call in the same thread.
+
+        Args:
+            secrets_file: Path to service account secrets json file
+            loggr: Logger object. Defaults to None.
+
+        Returns:
+            Authenticated GoogleDriveService object
+        """
+        path, entry = cls._get_entry(secrets_file)
+        sessions = cls._sessions()
+        cached = sessions.get(path)
+        # Session created for an older (changed or invalidated) entry is not re-used
+        gds = cached[1] if cached and cached[0] is entry else None
+        if not gds or not gds.credentials or getattr(gds.credentials, "invalid", False):
+            gds = GoogleDriveService(loggr)
+            gds.authenticate_sa(secrets_file)
+            sessions[path] = (entry, gds)
+        else:
+            gds.loggr = loggr
+        return gds
+
+    @classmethod
+    def invalidate(cls, secrets_file: Optional[str] = None) -> None:
+        """Drop cached sessions (e.g. after an authentication error), in all threads.
+
+        Args:
+            secrets_file: Path to secrets json file, None for all. Defaults to None.
+        """
+        with cls._lock:
+            if secrets_file is None:
+                cls._entries.clear()
+            else:
+                cls._entries.pop(os.path.realpath(secrets_file), None)
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drop all cached secrets and sessions, closing HTTP connections of the calling thread's sessions.
+
+        Sessions of other threads are dropped on their next `get()`, or when the threads finish.
+        """
+        cls.invalidate()
+        sessions = cls._sessions()
+        for _, gds in sessions.values():
+            gds.close()
+        sessions.clear()
+
+
+class GoogleDriveUploadBatcher:
+    """Coalesces uploads from many callers into batched Google Drive API calls (see `GoogleDriveService.upload_files_batch()`).
+
+    A batch is sent when `max_batch` uploads are pending, or `window_s` seconds after the first pending upload,
+    whichever comes first. Each caller gets a Future with its own upload result.
+    """
+
+    _shared_lock = threading.Lock()
+    _shared: ClassVar[dict[tuple[str, int, float], GoogleDriveUploadBatcher]] = {}
+
+    def __init__(self, secrets_file: str, max_batch: int = 10, window_s: float = 5.0, loggr: Optional[logging.Logger] = None) -> None:
+        """Constructor.
+
+        Args:
+            secrets_file: Path to service account secrets json file (session is taken from GoogleDriveSessionPool)
+            max_batch: Number of pending uploads that triggers a batch. Defaults to 10.
+            window_s: Maximum time in seconds an upload waits for the batch to fill up. Defaults to 5.0.
+            loggr: Logger object. Defaults to None.
+        """
+        self.secrets_file = secrets_file
+        self.max_batch = max(1, min(max_batch, GoogleDriveService.BATCH_MAX))
+        self.window_s = window_s
+        self.loggr = loggr
+        self._cond = threading.Condition()
+        self._pending: list[tuple[dict[str, Any], Future]] = []
+        self._first_time: Optional[float] = None
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="GoogleDriveUploadBatcher", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def shared(cls, secrets_file: str, max_batch: int = 10, window_s: float = 5.0, loggr: Optional[logging.Logger] = None) -> GoogleDriveUploadBatcher:
+        """Get process-wide batcher for the given settings, so uploads from all callers are coalesced together."""
+        key = (os.path.realpath(secrets_file), max_batch, window_s)
+        with cls._shared_lock:
+            batcher = cls._shared.get(key)
+            if not batcher:
+                batcher = cls(secrets_file, max_batch, window_s, loggr)
+                cls._shared[key] = batcher
+            return batcher
+
+    def submit(
+        self,
+        dir_id: Optional[str],
+        file_path: str,
+        mimetype: str,
+        dst_filename: Optional[str] = None,
+        dst_mimetype: Optional[str] = None,
+        source: Optional[Union[bytes, list[str], IO[bytes]]] = None,
+    ) -> Future:
+        """Queue an upload (args same as `GoogleDriveService.upload_file()`).
+
+        Returns:
+            Future that delivers the uploaded file object, or raises the upload error.
+        """
+        future: Future = Future()
+        upload = {"dir_id": dir_id, "file_path": file_path, "mimetype": mimetype, "dst_filename": dst_filename, "dst_mimetype": dst_mimetype, "source": source}
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("GoogleDriveUploadBatcher is stopped.")
+            if not self._pending:
+                self._first_time = time.monotonic()
+            self._pending.append((upload, future))
+            self._cond.notify()
+        return future
+
+    def flush(self) -> None:
+        """Send pending uploads now, without waiting for the batch window."""
+        with self._cond:
+            self._first_time = time.monotonic() - self.window_s
+            self._cond.notify()
+
+    def stop(self) -> None:
+        """Send pending uploads and stop the batcher thread."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._pending and (self._stopping or len(self._pending) >= self.max_batch):
+                        break
+                    if not self._pending and self._stopping:
+                        return
+                    timeout = None
+                    if self._pending and self._first_time is not None:
+                        timeout = self._first_time + self.window_s - time.monotonic()
+                        if timeout <= 0:
+                            break
+                    self._cond.wait(timeout)
+                batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch :]
+                self._first_time = time.monotonic() if self._pending else None
+            self._send(batch)
+
+    def _send(self, batch: list[tuple[dict[str, Any], Future]]) -> None:
+        try:
+            gds = GoogleDriveSessionPool.get(self.secrets_file, self.loggr)
+            results = gds.upload_files_batch([upload for upload, _ in batch])
+        except Exception as err:
+            if self.loggr:
+                self.loggr.error(f'Failed batch upload of {len(batch)} file(s) to GoogleDrive, error "{err}".')
+            GoogleDriveSessionPool.invalidate(self.secrets_file)
+            results = [(None, err)] * len(batch)
+        if self.loggr:
+            self.loggr.debug(f"Batch upload of {len(batch)} file(s) to GoogleDrive done, {sum(1 for _, e in results if e)} failed.")
+        for (_, future), (file, err) in zip(batch, results):
+            if err:
+                future.set_exception(err)
+            else:
+                future.set_result(file)
+
+
+class GoogleDriveFileCache:
+    """Local on-disk read-through cache of Google Drive files, keyed by file ID.
+
+    Content is re-downloaded only when Drive "md5Checksum" / "modifiedDate" of the file changed. With a non-zero TTL,
+    the Drive lookup itself is skipped while the cached entry is fresh. If Drive cannot be reached, the cached copy is used (offline fallback).
+    Cache files are readable by the owner only. Call `check_unchanged()` before uploading a file loaded through the cache.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl_s: float = 0.0, loggr: Optional[logging.Logger] = None) -> None:
+        """Constructor.
+
+        Args:
+            cache_dir: Cache directory. Defaults to None ("~/.cache/pi_base/gd").
+            ttl_s: Time in seconds to trust cached file without checking Drive. Defaults to 0.0 (always check).
+            loggr: Logger object. Defaults to None.
+        """
+        self.cache_dir = os.path.realpath(os.path.expanduser(cache_dir or os.path.join("~", ".cache", "pi_base", "gd")))
+        self.ttl_s = ttl_s
+        self.loggr = loggr
+
+    @classmethod
+    def from_conf(cls, conf: GetConf, loggr: Optional[logging.Logger] = None, cols_secret: Optional[list[str]] = None) -> Optional[GoogleDriveFileCache]:
+        """Create cache from "GoogleDrive" section of the config ("cache", "cache_dir", "cache_ttl" keys), None if not enabled.
+
+        Cache is off unless enabled by "cache: true", and is never used for files with secret columns.
+
+        Args:
+            conf: Config
+            loggr: Logger object. Defaults to None.
+            cols_secret: Secret columns of the database file. Defaults to None.
+
+        Returns:
+            Cache object, or None
+        """
+        if not conf.get_sub("GoogleDrive", "cache", default=False, t=bool):
+            return None
+        if cols_secret:
+            if loggr:
+                loggr.warning(f"GoogleDrive file cache is not used for database with secret columns ({', '.join(cols_secret)}).")
+            return None
+        cache_dir = conf.get_sub("GoogleDrive", "cache_dir", default=None)
+        ttl_s = conf.get_sub("GoogleDrive", "cache_ttl", default=0, t=(int, float))  # pyright: ignore[reportArgumentType]
+        return cls(cache_dir, float(ttl_s or 0), loggr)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, path_sanitize(name, "_"))
+
+    def _read_json(self, name: str) -> dict[str, Any]:
+        try:
+            with open(self._path(name), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, name: str, data: str) -> None:
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        path = self._path(name)
+        # Owner-only file permissions (cached files may contain private data)
+        fd = os.open(path + ".tmp", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(data)
+        Path(path + ".tmp").replace(path)
+
+    @staticmethod
+    def _same_version(file: GoogleDriveFile, meta: dict[str, Any]) -> bool:
+        if file.get("md5Checksum"):
+            return file.get("md5Checksum") == meta.get("md5Checksum")
+        return bool(file.get("modifiedDate")) and file.get("modifiedDate") == meta.get("modifiedDate")
+
+    def _lookup(self, title: str, parent_directory_id: str) -> Optional[dict[str, Any]]:
+        """Cached metadata of the file by title, only if its content is in the cache too."""
+        file_id = self._read_json("index.json").get(f"{parent_directory_id}/{title}")
+        meta = self._read_json(f"{file_id}.json") if file_id else {}
+        return meta if meta and os.path.isfile(self._path(f"{file_id}.data")) else None
+
+    def _cached_file(self, gds: GoogleDriveService, meta: dict[str, Any]) -> Optional[GoogleDriveFile]:
+        drive = gds.get_drive()
+        if not drive:
+            return None
+        # Create a file object without fetching from Drive, metadata from cache will make get_content() use cached content.
+        return drive.CreateFile({k: meta[k] for k in ["id", "title", "md5Checksum", "modifiedDate"] if meta.get(k)})
+
+    def find_file_by_title(self, gds: GoogleDriveService, title: str, parent_directory_id: str, create_if_missing: bool = True) -> tuple[Optional[GoogleDriveFile], bool]:
+        """Same as `GoogleDriveService.maybe_create_file_by_title()`, using cache when fresh (TTL) or Drive is not reachable."""
+        meta = self._lookup(title, parent_directory_id)
+        if meta and self.ttl_s > 0 and time.time() - meta.get("fetched_at", 0) < self.ttl_s:
+            if self.loggr:
+                self.loggr.debug(f'Using cached GoogleDrive "{title}" file (TTL {self.ttl_s}s).')
+            return self._cached_file(gds, meta), False
+        try:
+            if create_if_missing:
+                file, created = gds.maybe_create_file_by_title(title, parent_directory_id)
+            else:
+                file, created = gds.get_file_by_title(title, parent_directory_id), False
+        except Exception as err:
+            if not meta:
+                raise
+            if self.loggr:
+                self.loggr.warning(f'Cannot reach GoogleDrive (error "{err}"), using cached "{title}" file from {time.ctime(meta.get("fetched_at", 0))}.')
+            return self._cached_file(gds, meta), False
+        if file and not created and file.get("id"):
+            index = self._read_json("index.json")
+            key = f"{parent_directory_id}/{title}"
+            if index.get(key) != file["id"]:
+                index[key] = file["id"]
+                self._write("index.json", json.dumps(index))
+        return file, created
+
+    def get_content(self, file: GoogleDriveFile) -> str:
+        """Get file content string, downloading it only if it changed on Drive since cached."""
+        file_id = file.get("id")
+        meta = self._read_json(f"{file_id}.json") if file_id else {}
+        if meta and os.path.isfile(self._path(f"{file_id}.data")) and self._same_version(file, meta):
+            with open(self._path(f"{file_id}.data"), encoding="utf-8", newline="") as f:
+                if self.loggr:
+                    self.loggr.debug(f'GoogleDrive "{file.get("title")}" file is not changed, using cached content.')
+                return f.read()
+        content = file.GetContentString()
+        self.put(file, content)
+        return content
+
+    def check_unchanged(self, file: GoogleDriveFile) -> None:
+        """Check that the file was not changed on Drive since it was cached, so uploading it will not overwrite other changes.
+
+        Args:
+            file: File loaded through the cache (metadata is refreshed from Drive)
+
+        Raises:
+            ValueError: If the file was changed on Drive
+        """
+        file_id = file.get("id")
+        meta = self._read_json(f"{file_id}.json") if file_id else {}
+        if not meta:
+            return
+        file.FetchMetadata(fields="md5Checksum,modifiedDate")
+        if not self._same_version(file, meta):
+            raise ValueError(f'GoogleDrive "{file.get("title")}" file was changed since it was loaded at {time.ctime(meta.get("fetched_at", 0))}, please reload and retry.')
+
+    def put(self, file: GoogleDriveFile, content: str) -> None:
+        """Store file content (after download or upload)."""
+        file_id = file.get("id")
+        if not file_id:
+            return
+        try:
+            self._write(f"{file_id}.data", content)
+            meta = {
+                "id": file_id,
+                "title": file.get("title"),
+                "md5Checksum": file.get("md5Checksum") or hashlib.md5(content.encode("utf-8")).hexdigest(),  # noqa: S324
+                "modifiedDate": file.get("modifiedDate"),
+                "fetched_at": time.time(),
+            }
+            self._write(f"{file_id}.json", json.dumps(meta))
+        except OSError as err:
+            if self.loggr:
+                self.loggr.warning(f'Cannot write GoogleDrive file cache in "{self.cache_dir}", error "{err}".')
+
+
 def gd_connect(
     loggr: Optional[logging.Logger],
     gd_secrets: str,
@@ -367,6 +908,7 @@ def gd_connect(
     extra_mode: str = "override",
     skip_msg: str = "Will skip uploading results files.",
     prefix: str = "pibase_",
+    use_pool: bool = True,
 ) -> tuple[Optional[GoogleDriveService], dict[str, Optional[str]]]:
     """Helper function: Open secrets file and Authenticate with Google Drive, and additionally load extra fields from the secrets file.
 
@@ -378,6 +920,7 @@ def gd_connect(
                             'override' mode is intended for command line args that should override secrets file values. Defaults to 'override'.
         skip_msg: Text to add to loggr messages when cannot load gd_secrets or connect. Defaults to 'Will skip uploading results files.'.
         prefix: Prefix for all field names in gd_secrets file. Defaults to 'pibase_'.
+        use_pool: Re-use cached secrets and authenticated session from GoogleDriveSessionPool. Defaults to True.
 
     Returns:
         Tuple of Google Drive service object, dict with extra fields from the secrets file.
@@ -388,7 +931,7 @@ def gd_connect(
     if gd_secrets:
         if os.path.isfile(gd_secrets):
             try:
-                secrets = GetConf(filepath=gd_secrets)
+                secrets = GoogleDriveSessionPool.get_conf(gd_secrets) if use_pool else GetConf(filepath=gd_secrets)
                 for k, v_in in extra_fields_with_values.items():
                     if extra_mode == "override" and v_in is None:
                         v = secrets.get(prefix + k)
@@ -411,8 +954,11 @@ def gd_connect(
                 return None, {}
 
         try:
-            gds = GoogleDriveService()
-            gds.authenticate_sa(gd_secrets)
+            if use_pool:
+                gds = GoogleDriveSessionPool.get(gd_secrets, loggr)
+            else:
+                gds = GoogleDriveService()
+                gds.authenticate_sa(gd_secrets)
             if loggr:
                 loggr.info("Authenticated with GoogleDrive.")
         except Exception as err:
@@ -1,20 +1,34 @@
 #!/usr/bin/env python3
 
+from __future__ import annotations
+
+import hashlib
 import inspect
+import json
 import sys
 import os
+from pathlib import Path
 
 from . import tput
 
 
 class Large:
-    """Print large message(s) on terminal."""
+    """Print large message(s) on terminal.
+
+    Parsed messages and pre-rendered output (per terminal type) are cached on disk in the user cache directory
+    (see `CACHE_DIR`), and the cache is invalidated when the messages file changes (mtime or size).
+    """
 
-    def __init__(self, filepath=None) -> None:
+    CACHE_DIR = os.path.join("~", ".cache", "pi_base", "large")
+    CACHE_VERSION = 1
+
+    def __init__(self, filepath=None, use_cache=True, cache_dir=None) -> None:
         """Constructor.
 
         Args:
             filepath: chooses which text file to load with strings composing large message(s).
+            use_cache: True to use the on-disk cache of parsed and pre-rendered messages. Defaults to True.
+            cache_dir: Cache directory. Defaults to None (`CACHE_DIR`).
 
         Messages are blocks of text, each message followed by a single line with `# <key> <color_fg> <color_bg> <name>` format, where:
          * <key> is used to select the message
@@ -28,22 +42,39 @@ class Large:
         if filepath is None:
             # Default file to open:
             filepath = os.path.join(os.path.abspath(os.path.dirname(__file__)), "large.txt")
+        self.filepath = filepath
+        self.cache_path = Large.cache_file_path(filepath, cache_dir) if use_cache else None
         self.term = None  # TODO: (when needed) Set to the actual TERM for tput.
-        conversions = [
-            ("M", "█"),
-            ("\n", ""),
-            ("\r", ""),
-        ]
         self.color_reset = tput.tput("sgr0", (), self.term)
         # self.color_reset_fg = tput.tput('setaf', (9,), self.term)
         # self.color_reset_bg = tput.tput('setab', (0,), self.term)
         # TODO: (soon) Remove hard-coded color_reset_fg/color_reset_bg (use init args?)
         self.tput_clear = tput.tput("clear", (), self.term)
+
+        stat = Path(filepath).stat()
+        self.source_sig = [stat.st_mtime_ns, stat.st_size]
+        self.cache = self.cache_load()
+        if self.cache is None:
+            self.cache = {"version": Large.CACHE_VERSION, "source": self.source_sig, "pf": self.parse(filepath), "frames": {}}
+        self.pf = self.cache["pf"]
+        self.count = len(self.pf)
+        self.frames: dict[str, str] = self.cache["frames"].setdefault(self.term_key(), {})
+        if not self.frames:
+            self.frames.update(self.render_all())
+            self.cache_save()
+
+    @staticmethod
+    def parse(filepath) -> dict:
+        """Parse messages file."""
+        conversions = [
+            ("M", "█"),
+            ("\n", ""),
+            ("\r", ""),
+        ]
         # print('DEBUG: block=%d' % (ord(block[0])) )
         with open(filepath, encoding="utf-8") as f:
             x = f.readlines()
         pf = {}
-        index = 0
         lines = []
         max_cols = 0
         rows = 0
@@ -59,7 +90,6 @@ class Large:
                     "cols": max_cols,
                     "rows": rows,
                 }
-                index += 1
                 lines = []
                 max_cols = 0
                 rows = 0
@@ -71,8 +101,66 @@ class Large:
                         max_cols = len(line)
                 lines += [line]
                 rows += 1
-        self.pf = pf
-        self.count = index
+        return pf
+
+    @staticmethod
+    def cache_file_path(filepath, cache_dir=None) -> str:
+        """Cache file path for the messages file, unique per messages file location."""
+        real_path = os.path.realpath(filepath)
+        digest = hashlib.sha256(real_path.encode("utf-8")).hexdigest()[:16]
+        name = os.path.splitext(os.path.basename(real_path))[0]
+        return os.path.join(os.path.realpath(os.path.expanduser(cache_dir or Large.CACHE_DIR)), f"{name}-{digest}.json")
+
+    def term_key(self) -> str:
+        """Terminal type the frames are rendered for (same as used by `tput.tput()`)."""
+        return self.term or tput.tput_term
+
+    @staticmethod
+    def frame_key(key, do_clear: bool, do_color: bool) -> str:
+        return f"{key}:{int(do_clear)}{int(do_color)}"
+
+    def render(self, key, do_clear=True, do_color=True) -> str:
+        """Render complete output of the message, including the escape sequences."""
+        data = self.result(key)
+        large = data["large"]
+        out = ""
+        if do_clear:
+            out += self.tput_clear + "\n"
+        if do_color:
+            color_fg_code = tput.tput("setaf", (data["color_fg"],), self.term)
+            color_bg_code = tput.tput("setab", (data["color_bg"],), self.term)
+            # out += color_fg_code + color_bg_code + '\n'.join(large) + self.color_reset_fg + self.color_reset_bg + "\n"
+            out += color_fg_code + color_bg_code + "\n".join(large) + self.color_reset + "\n"
+        else:
+            out += "\n".join(large) + "\n"
+        return out
+
+    def render_all(self) -> dict[str, str]:
+        return {Large.frame_key(key, do_clear, do_color): self.render(key, do_clear, do_color) for key in self.pf for do_clear in (False, True) for do_color in (False, True)}
+
+    def cache_load(self) -> dict | None:
+        if not self.cache_path:
+            return None
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cache, dict) or cache.get("version") != Large.CACHE_VERSION or cache.get("source") != self.source_sig:
+            return None  # Stale
+        return cache
+
+    def cache_save(self) -> None:
+        if not self.cache_path:
+            return
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), mode=0o700, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.cache, f)
+            Path(tmp_path).replace(self.cache_path)
+        except OSError:
+            pass  # Cache is optional (e.g. read-only home directory)
 
     def result(self, key):
         return self.pf.get(key, {"name": "", "large": "", "color_fg": "", "color_bg": "", "rows": 0, "cols": 0})
@@ -80,18 +168,18 @@ class Large:
     def print(self, key, do_clear=True, do_color=True):
         data = self.result(key)
         pf = data["name"]
-        large = data["large"]
-        if do_clear:
-            print(self.tput_clear)
-        if do_color:
-            color_fg = data["color_fg"]
-            color_bg = data["color_bg"]
-            color_fg_code = tput.tput("setaf", (color_fg,), self.term)
-            color_bg_code = tput.tput("setab", (color_bg,), self.term)
-            # print(color_fg_code + color_bg_code + '\n'.join(large) + self.color_reset_fg + self.color_reset_bg)
-            print(color_fg_code + color_bg_code + "\n".join(large) + self.color_reset)
+        frame_key = Large.frame_key(key, do_clear, do_color)
+        frame = self.frames.get(frame_key)
+        if frame is None:
+            frame = self.frames[frame_key] = self.render(key, do_clear, do_color)
+        out = getattr(sys.stdout, "buffer", None)
+        sys.stdout.flush()
+        if out:
+            out.write(frame.encode("utf-8"))
+            out.flush()
         else:
-            print("\n".join(large))
+            sys.stdout.write(frame)
+            sys.stdout.flush()
         return pf
 
 
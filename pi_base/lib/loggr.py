@@ -2,15 +2,18 @@
 
 from __future__ import annotations
 
+import atexit
 import copy
 import os
+import queue
+import threading
 import time
 import logging
 import platform
 
 from enum import Enum
 from subprocess import Popen, PIPE, DEVNULL
-from typing import Any
+from typing import Any, Callable, ClassVar, Optional
 from collections.abc import Mapping
 
 from . import tput
@@ -53,6 +56,22 @@ if platform.system() not in ("Darwin", "Windows"):
 #     log.debug("loggr debug")
 
 
+class LazyFormat:
+    """%-style log message, formatted only when it is output.
+
+    Use it to opt in to deferred %-formatting, e.g. `loggr.debug(LazyFormat("x=%s", x))`. Works with both `Loggr` and std `logging.Logger`.
+    """
+
+    __slots__ = ("args", "fmt")
+
+    def __init__(self, fmt: str, *args: object) -> None:
+        self.fmt = fmt
+        self.args = args
+
+    def __str__(self) -> str:
+        return self.fmt % self.args
+
+
 class Vt:
     """Helper logger class for VT."""
 
@@ -62,6 +81,7 @@ class Vt:
         self.vt_number = vt_number
         self.use_sudo = use_sudo
         self.loggr = loggr
+        self.proc = None  # Persistent `sudo tee` writer process, when use_sudo
         if vt_number is None or vt_number == 0:
             return
         self.term = None
@@ -75,7 +95,7 @@ class Vt:
             else:
                 try:
                     if self.loggr:
-                        self.loggr.debug(f"VT({self.vt_number}) vt.opening {self.term}")
+                        self.loggr.debug(LazyFormat("VT(%s) vt.opening %s", self.vt_number, self.term))
                     self.vt = open(self.term, "w", encoding="utf-8")
                 except Exception as err:
                     if self.loggr:
@@ -93,7 +113,31 @@ class Vt:
             self.flush()
             self.vt.close()
             if self.loggr:
-                self.loggr.debug(f"VT({self.vt_number}) vt.closed")
+                self.loggr.debug(LazyFormat("VT(%s) vt.closed", self.vt_number))
+        self.close_sudo_writer()
+
+    def open_sudo_writer(self):
+        """Get stdin of the persistent `sudo tee` process writing to the VT, (re)starting the process if needed."""
+        if self.proc and self.proc.poll() is None:
+            return self.proc.stdin
+        # cmd = ['sudo', 'tee', self.term, '>', '/dev/null']
+        cmd = ["sudo", "tee", self.term]
+        if self.loggr:
+            self.loggr.debug(LazyFormat("VT(%s) Popen(%s)", self.vt_number, " ".join(cmd)))
+        self.proc = Popen(cmd, stdin=PIPE, stdout=DEVNULL, stderr=DEVNULL, text=True)
+        return self.proc.stdin
+
+    def close_sudo_writer(self):
+        proc, self.proc = getattr(self, "proc", None), None
+        if proc:
+            if self.loggr:
+                self.loggr.debug(LazyFormat("VT(%s) Close Popen(sudo tee %s)", self.vt_number, self.term))
+            try:
+                if proc.stdin:
+                    proc.stdin.close()
+                proc.wait(timeout=2)
+            except Exception:  # pylint: disable=broad-exception-caught
+                proc.kill()
 
     # def clear(self):
     #     if self.vt:
@@ -102,26 +146,20 @@ class Vt:
     #         self.flush()
 
     def print(self, *tstr: object, sep=" ", end="\n"):
-        proc = None
         file = None
         if self.use_sudo and self.term:
             try:
-                # cmd = ['sudo', 'tee', self.term, '>', '/dev/null']
-                cmd = ["sudo", "tee", self.term]
-                if self.loggr:
-                    self.loggr.debug(f'VT({self.vt_number}) Popen({" ".join(cmd)})')
-                proc = Popen(cmd, stdin=PIPE, stdout=DEVNULL, stderr=DEVNULL, text=True)
-                file = proc.stdin
+                file = self.open_sudo_writer()
             except Exception as err:
                 if self.loggr:
                     self.loggr.error(f"VT({self.vt_number}) Popen() failed, error {type(err)} {err}, VT output disabled.")
-                proc = None
+                self.proc = None
                 file = None
                 self.use_sudo = False  # Disable future tries
         elif self.vt:
             file = self.vt
             if self.loggr:
-                self.loggr.debug(f"VT({self.vt_number}) vt.print()")
+                self.loggr.debug(LazyFormat("VT(%s) vt.print()", self.vt_number))
 
         if file:
             try:
@@ -137,21 +175,179 @@ class Vt:
             except Exception as err:
                 if self.loggr:
                     self.loggr.error(f"VT({self.vt_number}) file.write() failed, error {type(err)} {err}")
-
-        if self.use_sudo and proc:
-            if self.loggr:
-                self.loggr.debug(f'VT({self.vt_number}) Close Popen({" ".join(cmd)})')
-            if file:
-                file.close()
-            proc.wait()
+                if self.use_sudo:
+                    self.close_sudo_writer()  # Will restart the writer process on next print
 
     def flush(self):
         if self.vt:
             if self.loggr:
-                self.loggr.debug(f"VT({self.vt_number}) vt.flush()")
+                self.loggr.debug(LazyFormat("VT(%s) vt.flush()", self.vt_number))
             self.vt.flush()
 
 
+class LogDispatcher:
+    """Asynchronous fan-out of log output, with one background worker thread and a bounded queue per sink.
+
+    Output to each sink keeps its order. When a sink queue is full, policy "block" makes the caller wait,
+    and policy "drop" discards the new output (counted in `dropped`).
+    """
+
+    POLICIES: ClassVar[list[str]] = ["block", "drop"]
+
+    def __init__(self, sinks: list[str], queue_size: int = 1000, policy: str = "block") -> None:
+        if policy not in LogDispatcher.POLICIES:
+            raise ValueError(f'Unknown policy "{policy}", expected one of {LogDispatcher.POLICIES}')
+        self.policy = policy
+        self.dropped: dict[str, int] = {sink: 0 for sink in sinks}
+        self._queues: dict[str, queue.Queue] = {sink: queue.Queue(maxsize=queue_size) for sink in sinks}
+        self._closed = False
+        self._threads = [threading.Thread(target=self._run, args=(q,), name=f"LogDispatcher-{sink}", daemon=True) for sink, q in self._queues.items()]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, sink: str, fn: Callable[..., object], *args: object, **kwargs: object) -> None:
+        """Queue a call of `fn` for the sink, args should be already formatted (not objects that may change before the call)."""
+        if self._closed:
+            raise RuntimeError("LogDispatcher is closed.")
+        q = self._queues[sink]
+        if self.policy == "drop":
+            try:
+                q.put_nowait((fn, args, kwargs))
+            except queue.Full:
+                self.dropped[sink] += 1
+        else:
+            q.put((fn, args, kwargs))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all queued output is written.
+
+        Args:
+            timeout: Maximum time to wait in seconds, None to wait forever. Defaults to None.
+
+        Returns:
+            True if all output was written.
+        """
+        end_time = None if timeout is None else time.monotonic() + timeout
+        for q in self._queues.values():
+            with q.all_tasks_done:
+                while q.unfinished_tasks:
+                    remaining = None if end_time is None else end_time - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    q.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Write out queued output and stop the worker threads, further `submit()` calls raise RuntimeError.
+
+        Args:
+            timeout: Maximum time to wait for the output in seconds, None to wait forever. Defaults to None.
+
+        Returns:
+            True if all output was written.
+        """
+        self._closed = True
+        flushed = self.flush(timeout)
+        for q in self._queues.values():
+            q.put(None)  # Stop the worker
+        end_time = None if timeout is None else time.monotonic() + timeout
+        for t in self._threads:
+            t.join(None if end_time is None else max(0.0, end_time - time.monotonic()))
+        return flushed
+
+    def _run(self, q: queue.Queue) -> None:
+        while True:
+            item = q.get()
+            if item is None:
+                q.task_done()
+                return
+            fn, args, kwargs = item
+            try:
+                fn(*args, **kwargs)
+            except Exception:  # noqa: S110  # pylint: disable=broad-exception-caught
+                pass  # Nowhere to report, and must not stop the worker
+            finally:
+                q.task_done()
+
+
+class ScreenBuffer:
+    """Virtual screen model for status screens, redraws only the changed cells.
+
+    Text is drawn into the "back" buffer, and `render()` compares it with the "front" buffer (what is
+    believed to be on the terminal), producing one string with cursor moves and the changed runs of cells.
+    Only cells that were drawn into are owned by the buffer, the rest of the terminal is left alone.
+    Frames are rate-limited to `max_fps`, see `due()`.
+    """
+
+    MERGE_GAP = 4  # Max unchanged cells between changed cells to write in one run
+
+    def __init__(self, max_fps: float = 10.0) -> None:
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.back: dict[int, list[Optional[str]]] = {}
+        self.front: dict[int, list[Optional[str]]] = {}
+        self.dirty: set[int] = set()
+        self.last_frame: float = 0.0
+
+    def write(self, x: int, y: int, text: str) -> None:
+        """Draw text at position, newline continues at the start of the next line (like print)."""
+        for line in text.split("\n"):
+            row = self.back.setdefault(y, [])
+            if len(row) < x + len(line):
+                row.extend([None] * (x + len(line) - len(row)))
+            for i, char in enumerate(line):
+                if row[x + i] != char:
+                    row[x + i] = char
+                    self.dirty.add(y)
+            x, y = 0, y + 1
+
+    def invalidate(self, cleared: bool = False) -> None:
+        """Forget what is on the terminal, so next frame redraws all owned cells.
+
+        Args:
+            cleared: True if the terminal was cleared, so blank owned cells need no redraw. Defaults to False.
+        """
+        self.front = {y: [" " if cleared else None] * len(row) for y, row in self.back.items()}
+        self.dirty = set(self.back)
+
+    def due(self) -> bool:
+        """Check if there are changes and enough time passed since last frame."""
+        return bool(self.dirty) and time.monotonic() - self.last_frame >= self.min_interval
+
+    def diff(self) -> list[tuple[int, int, str]]:
+        """Collect changed runs of cells as (x, y, text), and mark them as drawn."""
+        runs: list[tuple[int, int, str]] = []
+        for y in sorted(self.dirty):
+            row = self.back[y]
+            front = self.front.setdefault(y, [])
+            if len(front) < len(row):
+                front.extend([None] * (len(row) - len(front)))
+            changed = [x for x, char in enumerate(row) if char is not None and char != front[x]]
+            start = end = -1
+            for x in changed:
+                # Unchanged owned cells in short gaps are rewritten, it is cheaper than a cursor move
+                if start < 0 or x - end > self.MERGE_GAP or None in row[end:x]:
+                    if start >= 0:
+                        runs.append((start, y, "".join(row[start:end])))  # type: ignore[arg-type]
+                    start = x
+                end = x + 1
+                front[x] = row[x]
+            if start >= 0:
+                runs.append((start, y, "".join(row[start:end])))  # type: ignore[arg-type]
+        self.dirty.clear()
+        self.last_frame = time.monotonic()
+        return runs
+
+    @staticmethod
+    def render(runs: list[tuple[int, int, str]], cup: Callable[[int, int], str]) -> str:
+        """Compose the frame string from runs.
+
+        Args:
+            runs: Changed runs from `diff()`
+            cup : Function returning cursor move escape sequence for (row, col)
+        """
+        return "".join(cup(y, x) + text for x, y, text in runs)
+
+
 class Loggr(logging.Logger):
     """Multi-logger, helps organize output and logs.
 
@@ -161,7 +357,31 @@ class Loggr(logging.Logger):
     3. journal
     """
 
-    def __init__(self, use_vt_number=None, use_stdout=True, use_journal_name=None, use_sudo=False, level: int = logging.DEBUG, primary_loggr=None):
+    def __init__(
+        self,
+        use_vt_number=None,
+        use_stdout=True,
+        use_journal_name=None,
+        use_sudo=False,
+        level: int = logging.DEBUG,
+        primary_loggr=None,
+        use_async: bool = False,
+        async_queue_size: int = 1000,
+        async_policy: str = "block",
+    ):
+        """Constructor.
+
+        Args:
+            use_vt_number   : VT number to output to, None to disable. Defaults to None.
+            use_stdout      : True to output to stdout. Defaults to True.
+            use_journal_name: Name for logging to systemd journal, None to disable. Defaults to None.
+            use_sudo        : True to use sudo for writing to VT. Defaults to False.
+            level           : Log level. Defaults to logging.DEBUG.
+            primary_loggr   : Logger for own messages (e.g. VT errors). Defaults to None.
+            use_async       : True to write to each output in a background thread (see `LogDispatcher`), use `flush()` to wait for the output. Defaults to False.
+            async_queue_size: Maximum number of pending writes per output in async mode. Defaults to 1000.
+            async_policy    : What to do when queue is full in async mode, "block" or "drop". Defaults to "block".
+        """
         super().__init__(name="Loggr", level=level)
         self.level = level
         self.primary_loggr = primary_loggr
@@ -186,6 +406,48 @@ class Loggr(logging.Logger):
                 log_ch.setFormatter(log_fmt)
                 self.journal.addHandler(log_ch)
             self.setLevel(level)
+        self.screen_buffer: Optional[ScreenBuffer] = None
+        self.dispatcher: Optional[LogDispatcher] = None
+        if use_async:
+            self.dispatcher = LogDispatcher(["vt", "stdout", "journal"], async_queue_size, async_policy)
+            atexit.register(self.flush)
+
+    def _emit(self, sink: str, fn: Callable[..., object], *args: object, **kwargs: object) -> None:
+        """Write to the sink - directly, or via the dispatcher in async mode."""
+        dispatcher = self.dispatcher
+        if dispatcher:
+            try:
+                dispatcher.submit(sink, fn, *args, **kwargs)
+                return
+            except RuntimeError:
+                pass  # Closed meanwhile by `close()`
+        fn(*args, **kwargs)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all output is written (in async mode), e.g. at test boundaries or before user input.
+
+        Args:
+            timeout: Maximum time to wait in seconds, None to wait forever. Defaults to None.
+
+        Returns:
+            True if all output was written.
+        """
+        return self.dispatcher.flush(timeout) if self.dispatcher else True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Write out pending output and stop the background threads (in async mode), further output is written directly.
+
+        Args:
+            timeout: Maximum time to wait for the output in seconds, None to wait forever. Defaults to None.
+
+        Returns:
+            True if all output was written.
+        """
+        dispatcher, self.dispatcher = self.dispatcher, None
+        if not dispatcher:
+            return True
+        atexit.unregister(self.flush)
+        return dispatcher.close(timeout)
 
     def setLevel(self, level: int):
         self.level = level
@@ -196,41 +458,73 @@ class Loggr(logging.Logger):
     def cls(self, *tstr: object):
         """Clear screen, and optionally print."""
         self.tput_print("clear", ())
+        if self.screen_buffer:
+            self.screen_buffer.invalidate(cleared=True)
         if len(tstr) > 0:
             self.print(*tstr)
 
+    def isEnabledFor(self, level: int) -> bool:
+        """Cheap check if messages of the given level will be output, use it to skip building costly messages."""
+        return level >= self.level
+
+    @staticmethod
+    def _format(msg: object) -> object:
+        """Resolve deferred message (only called when the message passed the level check).
+
+        Args:
+            msg: Message, or a callable returning the message
+
+        Returns:
+            Message
+        """
+        if callable(msg) and not isinstance(msg, (str, type)):
+            return msg()
+        return msg
+
     # @overload
-    # def log(self, level: int, msg: object, *args: object, **kwargs: Mapping[str, Any]): ...
-    def log(self, level: int, msg: object, *tstr: object, color_code: ColorCodes | str = ColorCodes.DEFAULT, **kwargs: Mapping[str, Any]):
-        """Print message(s), with log level that can be masked."""
+    # def log(self, level: int, msg: object, *args: object, **kwargs: object): ...
+    def log(self, level: int, msg: object, *tstr: object, color_code: ColorCodes | str = ColorCodes.DEFAULT, **kwargs: object):
+        """Print message(s), with log level that can be masked.
+
+        Additional items are printed after the message as is (no %-formatting). Formatting is deferred until the level check passes,
+        so hot paths should use `loggr.debug(LazyFormat("x=%s", x))` or `loggr.debug(lambda: f"x={costly(x)}")` instead of f-strings.
+        """
         if not level:
             level = logging.NOTSET
-        kwargs1 = {"sep": " ", "end": "\n", **kwargs}
         if level >= self.level:
+            msg = self._format(msg)
+            # Format to str here - output may be queued (async mode), and objects may change before it is written
+            items = [str(item) for item in (msg, *tstr)]
+            kwargs1 = {"sep": " ", "end": "\n", **kwargs}
             level_str = f"{logging.getLevelName(level):8s}"
             if self.vt:
-                self.vt.print(level_str, msg, *tstr, **kwargs1)
+                self._emit("vt", self.vt.print, level_str, *items, **kwargs1)
             if self.use_stdout:
-                self.color_print(f"{level_str}: {' '.join([str(item) for item in ([msg] + list(tstr))])}", color_code=color_code)
+                self.color_print(f"{level_str}: {' '.join(items)}", color_code=color_code)
             if self.journal:
-                self.journal.log(level, msg, *tstr)
+                self._emit("journal", self.journal.log, level, " ".join(items))
 
-    def critical(self, msg: object, *tstr: object, **kwargs: Mapping[str, Any]):
-        self.log(logging.CRITICAL, msg, *tstr, color_code=ColorCodes.RED, **kwargs)
+    def critical(self, msg: object, *tstr: object, **kwargs: object):
+        if self.isEnabledFor(logging.CRITICAL):
+            self.log(logging.CRITICAL, msg, *tstr, color_code=ColorCodes.RED, **kwargs)
 
-    def error(self, msg: object, *tstr: object, **kwargs: Mapping[str, Any]):
-        self.log(logging.ERROR, msg, *tstr, color_code=ColorCodes.YELLOW, **kwargs)
+    def error(self, msg: object, *tstr: object, **kwargs: object):
+        if self.isEnabledFor(logging.ERROR):
+            self.log(logging.ERROR, msg, *tstr, color_code=ColorCodes.YELLOW, **kwargs)
 
-    def warning(self, msg: object, *tstr: object, **kwargs: Mapping[str, Any]):
-        self.log(logging.WARNING, msg, *tstr, color_code=ColorCodes.BLUE, **kwargs)
+    def warning(self, msg: object, *tstr: object, **kwargs: object):
+        if self.isEnabledFor(logging.WARNING):
+            self.log(logging.WARNING, msg, *tstr, color_code=ColorCodes.BLUE, **kwargs)
 
-    def info(self, msg: object, *tstr: object, **kwargs: Mapping[str, Any]):
-        self.log(logging.INFO, msg, *tstr, color_code=ColorCodes.CYAN, **kwargs)
+    def info(self, msg: object, *tstr: object, **kwargs: object):
+        if self.isEnabledFor(logging.INFO):
+            self.log(logging.INFO, msg, *tstr, color_code=ColorCodes.CYAN, **kwargs)
 
-    def debug(self, msg: object, *tstr: object, **kwargs: Mapping[str, Any]):
-        self.log(logging.DEBUG, msg, *tstr, color_code=ColorCodes.DEFAULT, **kwargs)
+    def debug(self, msg: object, *tstr: object, **kwargs: object):
+        if self.isEnabledFor(logging.DEBUG):
+            self.log(logging.DEBUG, msg, *tstr, color_code=ColorCodes.DEFAULT, **kwargs)
 
-    def print(self, *tstr: object, **kwargs: Mapping[str, Any]):
+    def print(self, *tstr: object, **kwargs: object):
         """Print message(s), unmasked."""
         kwargs1 = {"sep": " ", "end": "\n", **kwargs}
         kwargs2 = copy.copy(kwargs)
@@ -238,12 +532,14 @@ class Loggr(logging.Logger):
             del kwargs2["sep"]
         if "end" in kwargs2:
             del kwargs2["end"]
+        # Format to str here - output may be queued (async mode), and objects may change before it is written
+        items = [str(item) for item in tstr]
         if self.vt:
-            self.vt.print(*tstr, **kwargs1)
+            self._emit("vt", self.vt.print, *items, **kwargs1)
         if self.use_stdout:
-            print(*tstr, **kwargs1)
+            self._emit("stdout", print, *items, **kwargs1)
         if self.journal:
-            self.journal.info(*tstr, **kwargs2)
+            self._emit("journal", self.journal.info, str(kwargs1["sep"]).join(items), **kwargs2)
 
     def log_box(self, text: str, width: int = 50, color_code: ColorCodes | str = ColorCodes.DEFAULT) -> None:
         """Log provided text in a box of given width (centered).
@@ -276,6 +572,7 @@ class Loggr(logging.Logger):
             User input
         """
         self.color_print(text, color_code=color_code, end=" ")
+        self.flush()
         return input()
 
     def get_user_yes_no_input(self, text: str, color_code: ColorCodes | str = ColorCodes.YELLOW) -> bool:
@@ -330,6 +627,44 @@ class Loggr(logging.Logger):
         if len(tstr) > 0:
             self.print(*tstr)
 
+    def screen(self, x: int, y: int, text: str, force: bool = False, max_fps: float = 10.0) -> None:
+        """Draw text at position via the frame buffer (see `ScreenBuffer`), for status screens that are redrawn repeatedly.
+
+        Only changed cells are written, in one write per output, at most `max_fps` frames per second.
+        Call with force=True (or `screen_flush()`) to output the last frame without waiting.
+
+        Args:
+            x      : Column, 0 is left
+            y      : Row, 0 is top
+            text   : Text to draw, newline continues at the start of the next line
+            force  : True to output the frame now, ignoring the frame rate cap. Defaults to False.
+            max_fps: Frame rate cap, used when the frame buffer is created. Defaults to 10.0.
+        """
+        if not self.screen_buffer:
+            self.screen_buffer = ScreenBuffer(max_fps)
+        self.screen_buffer.write(x, y, text)
+        if force or self.screen_buffer.due():
+            self.screen_flush()
+
+    def screen_flush(self) -> None:
+        """Output pending changes of the frame buffer."""
+        if not self.screen_buffer or not self.screen_buffer.dirty:
+            return
+        runs = self.screen_buffer.diff()
+        if not runs:
+            return
+        if self.vt:
+            frame = ScreenBuffer.render(runs, lambda y, x: self.tput("cup", (y, x), self.vt_term))
+            self._emit("vt", self.vt.print, frame, end="")
+        if self.use_stdout:
+            frame = ScreenBuffer.render(runs, lambda y, x: self.tput("cup", (y, x), self.stdout_term))
+            self._emit("stdout", print, frame, end="", flush=True)
+
+    def screen_invalidate(self) -> None:
+        """Make next frame redraw all cells of the frame buffer, e.g. after other output scrolled the screen."""
+        if self.screen_buffer:
+            self.screen_buffer.invalidate()
+
     def el(self, *tstr) -> None:
         """Clear to end of line, and optionally print."""
         self.tput_print("el", ())
@@ -390,10 +725,10 @@ class Loggr(logging.Logger):
     def tput_print(self, code, args=()):
         str_val = self.tput(code, args, self.vt_term)
         if self.vt:
-            self.vt.print(str_val, end="")
+            self._emit("vt", self.vt.print, str_val, end="")
         if self.use_stdout:
             str_val = self.tput(code, args, self.stdout_term)
-            print(str_val, end="")
+            self._emit("stdout", print, str_val, end="")
 
     # TODO: (when needed) Implement color text codes
     # TODO: (when needed) Implement bold text codes
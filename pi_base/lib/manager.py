@@ -12,6 +12,7 @@ from .loggr import Loggr
 
 
 SIMULATE_NETWORK_DELAY = 3
+SCREEN_REPAIR_FRAMES = 10  # Redraw whole status block every N frames, in case other output (e.g. kernel messages) scrolled the screen
 
 
 def get_seed():
@@ -114,6 +115,7 @@ class Manager:
         count: int = 0
         while True:
             if count > timeout:
+                self.loggr.screen_flush()
                 self.loggr.cnorm()  # Cursor normal
                 self.loggr.position(0, row + 6, "Network does not appear to be connected.")
                 self.loggr.print("Please connect Ethernet network, or configure Wi-Fi (sudo raspi-config > 1 System Options > S1 Wireless LAN).")
@@ -159,7 +161,9 @@ class Manager:
                 "conn": ("Yes" + " " * 20) if self.internet_connected else f"Waiting for network {count}...  ",
             }
             message = "\n".join([(line % values).ljust(line_width) for line in start_lines])
-            self.loggr.position(0, row, message)
+            if count and count % SCREEN_REPAIR_FRAMES == 0:
+                self.loggr.screen_invalidate()
+            self.loggr.screen(0, row, message)  # One write per frame
             if self.internet_connected:
                 break
             count += 1
@@ -172,7 +176,7 @@ class Manager:
             "conn": f"Yes (took {count} seconds to acquire IP Address)" if self.internet_connected else f"No  (Timeout waiting {count} seconds)",
         }
         message = "\n".join([(line % values).ljust(line_width) for line in start_lines])
-        self.loggr.position(0, row, message)
+        self.loggr.screen(0, row, message, force=True)
         row += 5
         # self.loggr.position(0, row)
         return row
@@ -21,8 +21,8 @@ from collections.abc import Iterable
 # from pi_base.modpath import app_conf_dir  # pylint: disable=wrong-import-position
 
 # pylint: disable=wrong-import-order
-from .app_utils import GetConf, find_path, translate_config_paths
-from .gd_service import gd_connect, GoogleDriveFile  # pyright: ignore[reportAttributeAccessIssue]
+from .app_utils import GetConf, find_path, load_records, translate_config_paths
+from .gd_service import gd_connect, GoogleDriveFile, GoogleDriveFileCache  # pyright: ignore[reportAttributeAccessIssue]
 
 
 logging.basicConfig(level=logging.INFO)
@@ -129,6 +129,7 @@ class Remoteiot:
         # Backend files:
         self.db_file: Optional[str] = None
         self.gd_file: Optional[GoogleDriveFile] = None
+        self.gd_cache = GoogleDriveFileCache.from_conf(self.conf, self.loggr, self.cols_secret)
         # Look for devices DB in Google Drive first
         gd_secrets_file = self.conf.get_sub("GoogleDrive", "secrets")
         local_db_filename = self.conf.get_sub("LocalDBFile", "db_file")
@@ -166,7 +167,9 @@ class Remoteiot:
         # gd_file_id = 'TBD'
         # in_file_fd = self.gds.open_file_by_id(gd_file_id)
         self.loggr.info(f'Reading device database from Google Drive "{gd_file_title}" file.')
-        if create_if_missing:
+        if self.gd_cache:
+            in_file_fd, created = self.gd_cache.find_file_by_title(self.gds, gd_file_title, gd_folder_id, create_if_missing)
+        elif create_if_missing:
             in_file_fd, created = self.gds.maybe_create_file_by_title(gd_file_title, gd_folder_id)
         else:
             in_file_fd, created = self.gds.get_file_by_title(gd_file_title, gd_folder_id), False
@@ -175,7 +178,7 @@ class Remoteiot:
             devices = []
             self.db_file_cols_init()
         elif in_file_fd:
-            content = in_file_fd.GetContentString()
+            content = self.gd_cache.get_content(in_file_fd) if self.gd_cache else in_file_fd.GetContentString()
             buffered = io.StringIO(content)
             devices = self.db_file_load_fd(buffered)
         return devices, in_file_fd
@@ -278,8 +281,12 @@ class Remoteiot:
                 self.db_file_save_fd(self.devices, buffered)
                 buffered.seek(0)
                 # self.gd_file.content = buffered
+                if self.gd_cache:
+                    self.gd_cache.check_unchanged(self.gd_file)
                 self.gd_file.SetContentString(buffered.getvalue())
                 self.gd_file.Upload()
+                if self.gd_cache:
+                    self.gd_cache.put(self.gd_file, buffered.getvalue())
             elif self.db_file:
                 self.db_file_save(self.devices, self.db_file)
         except Exception as e:  # pylint: disable:broad-exception-caught
@@ -299,6 +306,48 @@ class Remoteiot:
         self.devices += [device]
         return self.db_file_save_back()
 
+    def db_add_devices(self, records: list[dict[str, Optional[str]]]) -> int:
+        """Add many devices in one transaction - all devices are checked first, and the database is saved once.
+
+        Args:
+            records: List of dicts with "device_id", "device_name" and optional "device_group" (e.g. from `load_records()`)
+
+        Returns:
+            0 if successful
+        """
+        errors = []
+        seen = set()
+        devices = []
+        for i, record in enumerate(records, 1):
+            device_id, device_name = record.get("device_id"), record.get("device_name")
+            if not device_id or not device_name:
+                errors.append(f'record {i}: missing "device_id" or "device_name"')
+                continue
+            if device_id in seen or self.find_device_by_id(device_id):
+                errors.append(f'record {i}: device "{device_id}" already exists')
+            seen.add(device_id)
+            devices += [
+                {
+                    "key": self.conf.get("service_key"),
+                    "device_id": device_id,
+                    "device_name": device_name,
+                    "device_group": record.get("device_group"),
+                }
+            ]
+        if errors:
+            raise ValueError("Cannot add devices: " + "; ".join(errors))
+        self.devices += devices
+        return self.db_file_save_back()
+
+    def db_delete_devices(self, device_ids: list[str]) -> int:
+        """Delete many devices in one transaction - all devices are checked first, and the database is saved once."""
+        missing = [f'"{device_id}"' for device_id in device_ids if not self.find_device_by_id(device_id)]
+        if missing:
+            raise ValueError(f"Device(s) {', '.join(missing)} not found in the database")
+        to_delete = set(device_ids)
+        self.devices = [device for device in self.devices if device["device_id"] not in to_delete]
+        return self.db_file_save_back()
+
     def db_delete_device(self, device_id: str) -> int:
         device = self.find_device_by_id(device_id)
         if not device:
@@ -558,6 +607,30 @@ def cmd_delete_named(remote: Remoteiot, args: argparse.Namespace) -> int:
     return res
 
 
+def cmd_add_bulk(remote: Remoteiot, args: argparse.Namespace) -> int:
+    try:
+        records = load_records(args.file)
+        res = remote.db_add_devices(records)
+    except (OSError, ValueError, TypeError, NotImplementedError) as err:
+        print(f"{err}", file=sys.stderr)
+        return 1
+    if not res:
+        print(f'Added {len(records)} devices to device database from "{args.file}"')
+    return res
+
+
+def cmd_delete_bulk(remote: Remoteiot, args: argparse.Namespace) -> int:
+    try:
+        device_ids = [record.get("device_id") for record in load_records(args.file)]
+        res = remote.db_delete_devices(device_ids)
+    except (OSError, ValueError, TypeError, NotImplementedError) as err:
+        print(f"{err}", file=sys.stderr)
+        return 1
+    if not res:
+        print(f'Deleted {len(device_ids)} devices from device database listed in "{args.file}"')
+    return res
+
+
 def _parse_args(progname: str) -> tuple[argparse.Namespace, argparse.ArgumentParser]:
     parser = argparse.ArgumentParser(description="Manage remote access (list,add)")
 
@@ -594,6 +667,14 @@ def _parse_args(progname: str) -> tuple[argparse.Namespace, argparse.ArgumentPar
     # "add_at_install" command
     add_yaml_parser = subparsers.add_parser("add_at_install", help="Add remote control to this device, using app_conf.yaml file during install")
 
+    # "add_bulk" command
+    add_bulk_parser = subparsers.add_parser("add_bulk", help="Add all devices from a .csv or .jsonl file to device database (all or nothing, does not connect this device)")
+    add_bulk_parser.add_argument("file", type=str, help="File with device_id, device_name, device_group (.csv with header row, or .jsonl)")
+
+    # "delete_bulk" command
+    delete_bulk_parser = subparsers.add_parser("delete_bulk", help="Delete all devices listed in a .csv or .jsonl file from device database (all or nothing)")
+    delete_bulk_parser.add_argument("file", type=str, help="File with device ids (.csv with header row, or .jsonl)")
+
     # "query" command
     query_parser = subparsers.add_parser("query", help="Add remote control to this device")
 
@@ -658,6 +739,10 @@ def main(loggr=logger) -> int:
             return cmd_add_at_install(get_remote_at_install(args), args)
         if args.command == "delete_named":
             return cmd_delete_named(get_remote(args), args)
+        if args.command == "add_bulk":
+            return cmd_add_bulk(get_remote(args), args)
+        if args.command == "delete_bulk":
+            return cmd_delete_bulk(get_remote(args), args)
         if args.command == "query":
             return cmd_query(get_remote(args), args)
 
@@ -1,10 +1,11 @@
 from __future__ import annotations
 import abc
+from concurrent.futures import Future
 import logging
-import os
+from collections.abc import Iterable
 from typing import Optional, Union
 
-from pi_base.lib.gd_service import gd_connect  # pylint: disable=wrong-import-position
+from pi_base.lib.gd_service import gd_connect, GoogleDriveSessionPool, GoogleDriveUploadBatcher  # pylint: disable=wrong-import-position
 
 from .tester_common import TestError
 
@@ -12,20 +13,44 @@ from .tester_common import TestError
 class ResultCommitCallback(abc.ABC):
     """Abstract class all commit callbacks should inherit from."""
 
+    @property
+    def name(self) -> str:
+        """Name of the callback, used to track pending commits. Override if registering more than one callback of the same class."""
+        return self.__class__.__name__
+
     @abc.abstractmethod
-    def commit(self, results_buffer: list[str], file_path: str) -> tuple[TestError, str | None]:
+    def commit(self, results_buffer: Iterable[str], file_path: str) -> tuple[TestError, str | None]:
         """Abstract method for commit the results buffer.
 
         This can be saving to a file, uploading to Drive, etc..
 
         Args:
-            results_buffer : Lines to commit
+            results_buffer : Lines to commit - a list, or `ResultLines` for streaming `ResultsWriter` (iterate it, or use `.open()` for a binary stream)
             file_path      : Full path of the file
 
         Returns:
             Tuple of error code and reason why the commit failed if error, None if successful
         """
 
+    def commit_async(self, results_buffer: Iterable[str], file_path: str) -> Future:
+        """Start committing the results buffer, so many results can be committed together (used by `ResultCommitQueue`).
+
+        Default implementation commits synchronously. Override in callbacks that can coalesce commits (e.g. batched uploads).
+
+        Args:
+            results_buffer : Lines to commit (same as for `commit()`)
+            file_path      : Full path of the file
+
+        Returns:
+            Future that delivers the same tuple as `commit()`
+        """
+        future: Future = Future()
+        try:
+            future.set_result(self.commit(results_buffer, file_path))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
 
 class ResultCommitToFileCallback(ResultCommitCallback):
     """Commits the results to a locally stored file."""
@@ -33,7 +58,7 @@ class ResultCommitToFileCallback(ResultCommitCallback):
     def __init__(self) -> None:
         pass
 
-    def commit(self, results_buffer: list[str], file_path: str) -> tuple[TestError, str | None]:
+    def commit(self, results_buffer: Iterable[str], file_path: str) -> tuple[TestError, str | None]:
         returncode = TestError.ERR_OK
         reason = None
         try:
@@ -50,17 +75,37 @@ class ResultCommitToFileCallback(ResultCommitCallback):
 class ResultCommitToGoogleDriveCallback(ResultCommitCallback):
     """Commits (uploads) the results to Google Drive."""
 
-    def __init__(self, loggr: logging.Logger, gd_secrets_file: str, gd_folder_id: Optional[str] = None) -> None:
+    def __init__(self, loggr: logging.Logger, gd_secrets_file: str, gd_folder_id: Optional[str] = None, batch_size: int = 0, batch_window_s: float = 5.0) -> None:
+        """Constructor.
+
+        Batching coalesces uploads from concurrent commits (e.g. `ResultsWriter.commit_results_async()` with multiple workers,
+        or multiple ResultsWriter objects) into one Google Drive API call that creates the files, the content of each file
+        is still uploaded by its own request (Drive API does not accept media uploads in batch requests). Each `commit()` waits for its own upload result,
+        while `commit_async()` (used by `ResultCommitQueue` for all queued commits at once) does not block.
+
+        Args:
+            loggr         : Logger object
+            gd_secrets_file: File with GD secrets
+            gd_folder_id  : GD folder ID to upload to, None to use "pibase_gd_results_folder_id" from the secrets file. Defaults to None.
+            batch_size    : Number of uploads to coalesce into one batch, 0 or 1 to upload each file separately. Defaults to 0.
+            batch_window_s: Maximum time in seconds an upload waits for the batch to fill up. Defaults to 5.0.
+        """
         self.loggr = loggr
         self.gd_secrets_file = gd_secrets_file
         self.gd_folder_id = gd_folder_id
+        self.batch_size = batch_size
+        self.batch_window_s = batch_window_s
         self.file_name = None
 
-    def commit(self, results_buffer: list[str], file_path: str) -> tuple[TestError, str | None]:
+    def commit(self, results_buffer: Iterable[str], file_path: str) -> tuple[TestError, str | None]:
+        return self.commit_async(results_buffer, file_path).result()
+
+    def commit_async(self, results_buffer: Iterable[str], file_path: str) -> Future:
+        """Start the upload, with batching (`batch_size` > 1) the returned Future completes when the batch is sent."""
+        future: Future = Future()
         returncode = TestError.ERR_OK
         reason = None
 
-        path = file_path
         for _ in range(1):  # Emulate goto by `break`
             # Authenticate with Google Drive (for results upload)
             drive_service, extras = gd_connect(self.loggr, self.gd_secrets_file, {"gd_results_folder_id": self.gd_folder_id})
@@ -75,30 +120,45 @@ class ResultCommitToGoogleDriveCallback(ResultCommitCallback):
                 reason = f'No "gd_results_folder_id" setting in "{self.gd_secrets_file}".'
                 break
 
-            if not os.path.isfile(file_path):  # A hack - Piggy back on the physical file written by other ResultCommitCallback.
-                path = os.path.join(os.path.dirname(__file__), os.path.basename(file_path))  # TODO: (when needed) Better tmp file placement method?
-                try:
-                    # TODO: (soon) Can we upload file to GD from a buffer without a tmp file??
-                    # Write a temporary file to upload
-                    with open(path, "w", encoding="utf-8") as f:
-                        for line in results_buffer:
-                            f.write(line + "\n")
-                except Exception as err:
-                    reason = f'Error "{err}" when saving results to a temporary file "{path}".'
-                    break
-
             try:
-                drive_service.upload_file(gd_folder_id, path, "text/csv")
+                # Upload straight from the results buffer (no temporary file, and no dependency on other ResultCommitCallback writing the file)
+                # Streamed results (`ResultLines`) are uploaded from their spool file, other iterables are collected into a list
+                open_stream = getattr(results_buffer, "open", None)
+                if callable(open_stream):
+                    source = open_stream()
+                else:
+                    source = results_buffer if isinstance(results_buffer, list) else list(results_buffer)
+                if self.batch_size > 1:
+                    batcher = GoogleDriveUploadBatcher.shared(self.gd_secrets_file, self.batch_size, self.batch_window_s, self.loggr)
+                    upload = batcher.submit(gd_folder_id, file_path, "text/csv", source=source)
+                    upload.add_done_callback(lambda upload: self._on_upload_done(upload, future, file_path))
+                    return future
+                drive_service.upload_file(gd_folder_id, file_path, "text/csv", source=source)
             except Exception as err:
-                reason = f'Error "{err}" when saving results file "{path}" to GD.'
-                returncode = TestError.ERR_FILE_SAVE
+                returncode, reason = self._upload_result(err, file_path)
                 break
 
-        if path and path != file_path:
-            os.remove(path)
-
         self.file_name = None
-        return returncode, reason
+        future.set_result((returncode, reason))
+        return future
+
+    def _on_upload_done(self, upload: Future, future: Future, file_path: str) -> None:
+        """Resolve the commit Future when the batched upload is done (always, so `commit()` does not wait forever)."""
+        try:
+            if upload.cancelled():
+                future.set_result((TestError.ERR_FILE_SAVE, f'Upload of results file "{file_path}" to GD was cancelled.'))
+            else:
+                future.set_result(self._upload_result(upload.exception(), file_path))
+        except Exception as err:
+            if not future.done():
+                future.set_exception(err)
+
+    def _upload_result(self, err: Optional[BaseException], file_path: str) -> tuple[TestError, str | None]:
+        if not err:
+            return TestError.ERR_OK, None
+        # Drop the pooled session, so the next attempt re-connects
+        GoogleDriveSessionPool.invalidate(self.gd_secrets_file)
+        return TestError.ERR_FILE_SAVE, f'Error "{err}" when saving results file "{file_path}" to GD.'
 
 
 class ResultCommitToDataBase(ResultCommitCallback):
@@ -106,5 +166,5 @@ class ResultCommitToDataBase(ResultCommitCallback):
     def __init__(self) -> None:
         pass
 
-    def commit(self, results_buffer: list[str], file_path: str) -> Union[None, str]:
+    def commit(self, results_buffer: Iterable[str], file_path: str) -> Union[None, str]:
         return None
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import csv
+import importlib
+import math
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, ClassVar, Optional, Union
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+_numpy: Any = None  # numpy module, False if not installed, None if not tried yet
+
+SAMPLES_NDIM = 2  # Samples array dimensions: (points, channels)
+
+
+def _get_numpy() -> Optional[ModuleType]:
+    global _numpy  # noqa: PLW0603  # pylint: disable=global-statement
+    if _numpy is None:
+        try:
+            _numpy = importlib.import_module("numpy")
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+def _opt_float(value: Union[str, float, None]) -> Optional[float]:
+    """Convert limits table cell to float, None for an empty cell."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    return float(value)
+
+
+class ChannelLimit:
+    """Test limits of one measurement channel.
+
+    Limits are given either as `val_min` / `val_max`, or as `nominal` +/- `tolerance` (explicit min / max take precedence).
+    Missing limit means no limit on that side.
+    """
+
+    def __init__(self, channel: str, val_min: Optional[float] = None, val_max: Optional[float] = None, nominal: Optional[float] = None, tolerance: Optional[float] = None) -> None:
+        """Constructor.
+
+        Args:
+            channel  : Channel name
+            val_min  : Minimum value. Defaults to None.
+            val_max  : Maximum value. Defaults to None.
+            nominal  : Nominal value. Defaults to None.
+            tolerance: Allowed deviation from nominal value (absolute). Defaults to None.
+        """
+        self.channel = channel
+        self.val_min = val_min
+        self.val_max = val_max
+        self.nominal = nominal
+        self.tolerance = tolerance
+        with_tolerance = nominal is not None and tolerance is not None
+        self.lo = val_min if val_min is not None else (nominal - tolerance if with_tolerance else -math.inf)
+        self.hi = val_max if val_max is not None else (nominal + tolerance if with_tolerance else math.inf)
+        if self.lo > self.hi:
+            raise ValueError(f'Channel "{channel}" has min limit {self.lo} above max limit {self.hi}')
+
+
+class LimitCheckResult:
+    """Per-channel outcome of `LimitsTable.check()`."""
+
+    HEADER: ClassVar[list[str]] = ["channel", "value", "min", "max", "samples", "fails", "result"]
+
+    def __init__(self, limits: list[ChannelLimit], worst: list[float], fails: list[int], samples: int) -> None:
+        """Constructor.
+
+        Args:
+            limits : Channel limits
+            worst  : Worst (closest to or farthest out of the limits) sample value for each channel
+            fails  : Number of failed samples for each channel
+            samples: Number of samples for each channel
+        """
+        self.limits = limits
+        self.worst = worst
+        self.fails = fails
+        self.samples = samples
+
+    def __len__(self) -> int:
+        return len(self.limits)
+
+    @property
+    def passed(self) -> list[bool]:
+        return [fails == 0 for fails in self.fails]
+
+    @property
+    def all_passed(self) -> bool:
+        return not any(self.fails)
+
+    @property
+    def failed_channels(self) -> list[str]:
+        return [limit.channel for limit, fails in zip(self.limits, self.fails) if fails]
+
+    def describe(self, i: int) -> str:
+        """Test info for channel `i`."""
+        limit = self.limits[i]
+        lo = "" if math.isinf(limit.lo) else limit.lo
+        hi = "" if math.isinf(limit.hi) else limit.hi
+        where = "in" if self.fails[i] == 0 else "out of"
+        count = f", {self.fails[i]} of {self.samples} samples failed" if self.fails[i] and self.samples > 1 else ""
+        return f"Channel {limit.channel} value {self.worst[i]} {where} range [{lo}:{hi}]{count}"
+
+    def rows(self, header: bool = True) -> list[list[Any]]:
+        """Per-channel rows (see `HEADER`), e.g. for `CommandResult` block data."""
+        rows = [list(self.HEADER)] if header else []
+        for limit, worst, fails in zip(self.limits, self.worst, self.fails):
+            lo = "N/A" if math.isinf(limit.lo) else limit.lo
+            hi = "N/A" if math.isinf(limit.hi) else limit.hi
+            rows.append([limit.channel, worst, lo, hi, self.samples, fails, "FAIL" if fails else "PASS"])
+        return rows
+
+
+class LimitsTable:
+    """Test limits of a multi-channel measurement (e.g. a sweep), for checking all samples in one call.
+
+    Uses NumPy if it is installed, plain Python loops otherwise (same results).
+    """
+
+    COLUMNS: ClassVar[list[str]] = ["channel", "min", "max", "nominal", "tolerance"]
+
+    def __init__(self, limits: list[ChannelLimit]) -> None:
+        if not limits:
+            raise ValueError("Please provide at least one channel limit")
+        self.limits = limits
+        self.channels = [limit.channel for limit in limits]
+        self.lo = [limit.lo for limit in limits]
+        self.hi = [limit.hi for limit in limits]
+        self._arrays: Optional[tuple[Any, Any]] = None  # Cached numpy (lo, hi) arrays
+
+    def __len__(self) -> int:
+        return len(self.limits)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Union[dict[str, Any], list[Any], tuple[Any, ...]]]) -> LimitsTable:
+        """Create limits table from rows of dicts (keys from `COLUMNS`) or lists (in `COLUMNS` order), empty cells mean no value."""
+        limits = []
+        for row in rows:
+            cells = row if isinstance(row, dict) else dict(zip(cls.COLUMNS, row))
+            limits.append(
+                ChannelLimit(
+                    str(cells["channel"]).strip(),
+                    val_min=_opt_float(cells.get("min")),
+                    val_max=_opt_float(cells.get("max")),
+                    nominal=_opt_float(cells.get("nominal")),
+                    tolerance=_opt_float(cells.get("tolerance")),
+                )
+            )
+        return cls(limits)
+
+    @classmethod
+    def from_csv(cls, file_path: str) -> LimitsTable:
+        """Load limits table from a CSV file with a header row (column names from `COLUMNS`)."""
+        with open(file_path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f, skipinitialspace=True)
+            return cls.from_rows([row for row in reader if row.get("channel") and not row["channel"].startswith("#")])
+
+    def check(self, samples: Iterable[Any]) -> LimitCheckResult:
+        """Check samples against the limits.
+
+        Args:
+            samples: One value per channel, or a sequence (rows) of such - e.g. list of lists or NumPy array of shape (points, channels).
+                     NaN / None samples fail.
+
+        Returns:
+            Per-channel result
+        """
+        np = _get_numpy()
+        if np:
+            return self._check_numpy(np, samples)
+        return self._check_python(samples)
+
+    def _check_numpy(self, np: ModuleType, samples: Iterable[Any]) -> LimitCheckResult:
+        values = np.asarray(samples, dtype=float)
+        if values.ndim == 1:
+            values = values[np.newaxis, :]
+        if values.ndim != SAMPLES_NDIM or values.shape[1] != len(self.limits) or not values.shape[0]:
+            raise ValueError(f"Expected samples with {len(self.limits)} channels, got shape {values.shape}")
+        if self._arrays is None:
+            self._arrays = (np.asarray(self.lo, dtype=float), np.asarray(self.hi, dtype=float))
+        lo, hi = self._arrays
+        with np.errstate(invalid="ignore"):
+            margin = np.minimum(values - lo, hi - values)  # Negative when out of limits
+        margin = np.where(np.isnan(margin), -np.inf, margin)
+        fails = (margin < 0).sum(axis=0)
+        worst = values[margin.argmin(axis=0), np.arange(values.shape[1])]
+        return LimitCheckResult(self.limits, [float(v) for v in worst], [int(n) for n in fails], values.shape[0])
+
+    def _check_python(self, samples: Iterable[Any]) -> LimitCheckResult:
+        rows = list(samples)
+        if not rows:
+            raise ValueError(f"Expected samples with {len(self.limits)} channels, got none")
+        if not isinstance(rows[0], (list, tuple)):
+            rows = [rows]
+        worst, fails = [], []
+        for i, (lo, hi) in enumerate(zip(self.lo, self.hi)):
+            worst_value, worst_margin, fail_cnt = math.nan, math.inf, 0
+            for j, row in enumerate(rows):
+                if len(row) != len(self.limits):
+                    raise ValueError(f"Expected samples with {len(self.limits)} channels, got {len(row)}")
+                value = math.nan if row[i] is None else float(row[i])
+                margin = -math.inf if math.isnan(value) else min(value - lo, hi - value)
+                fail_cnt += margin < 0
+                if margin < worst_margin or j == 0:
+                    worst_value, worst_margin = value, margin
+            worst.append(worst_value)
+            fails.append(fail_cnt)
+        return LimitCheckResult(self.limits, worst, fails, len(rows))
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from pi_base.lib.loggr import LazyFormat
+
+logger = logging.getLogger(__name__ if __name__ != "__main__" else None)
+
+MIN_CPK_SAMPLES = 2  # Cpk needs sample standard deviation
+
+
+class RunningStats:
+    """Running mean / variance (Welford's algorithm) with min / max, O(1) memory per measurement."""
+
+    __slots__ = ("n", "mean", "m2", "min", "max")
+
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0, min_val: float = math.inf, max_val: float = -math.inf) -> None:
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+        self.min = min_val
+        self.max = max_val
+
+    def add(self, value: float) -> None:
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance, 0 for less than 2 values."""
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def cpk(self, lo: Optional[float], hi: Optional[float]) -> Optional[float]:
+        """Process capability index against the limits (one-sided if only one limit is given).
+
+        Returns:
+            Cpk, None if there are no limits, less than 2 values or no variation
+        """
+        sd = self.stdev
+        if self.n < MIN_CPK_SAMPLES or sd <= 0:
+            return None
+        sides = []
+        if lo is not None:
+            sides.append((self.mean - lo) / (3 * sd))
+        if hi is not None:
+            sides.append((hi - self.mean) / (3 * sd))
+        return min(sides) if sides else None
+
+    def to_list(self) -> list[float]:
+        return [self.n, self.mean, self.m2, self.min, self.max]
+
+    @classmethod
+    def from_list(cls, values: list[float]) -> RunningStats:
+        return cls(*values)
+
+
+class LotStats:
+    """Statistics of one lot: run outcomes, per-step run / fail counters and running stats per measurement."""
+
+    def __init__(self, lot: str) -> None:
+        self.lot = lot
+        self.runs = {"pass": 0, "fail": 0, "error": 0}
+        self.first_time: Optional[float] = None
+        self.last_time: Optional[float] = None
+        self.steps: dict[str, list[int]] = {}  # Step key -> [runs, fails]
+        self.measurements: dict[str, RunningStats] = {}  # Measurement key -> stats
+        self.limits: dict[str, list[Optional[float]]] = {}  # Measurement key -> [lo, hi] (last seen)
+
+    @property
+    def run_cnt(self) -> int:
+        return sum(self.runs.values())
+
+    @property
+    def yield_pct(self) -> Optional[float]:
+        """First pass yield in percent, None if there were no runs."""
+        return 100.0 * self.runs["pass"] / self.run_cnt if self.run_cnt else None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "first_time": self.first_time,
+            "last_time": self.last_time,
+            "steps": self.steps,
+            "measurements": {key: stats.to_list() for key, stats in self.measurements.items()},
+            "limits": self.limits,
+        }
+
+    @classmethod
+    def from_dict(cls, lot: str, data: dict[str, Any]) -> LotStats:
+        lot_stats = cls(lot)
+        lot_stats.runs.update(data.get("runs", {}))
+        lot_stats.first_time = data.get("first_time")
+        lot_stats.last_time = data.get("last_time")
+        lot_stats.steps = data.get("steps", {})
+        lot_stats.measurements = {key: RunningStats.from_list(values) for key, values in data.get("measurements", {}).items()}
+        lot_stats.limits = data.get("limits", {})
+        return lot_stats
+
+
+class LotStatsEngine:
+    """Incremental lot statistics - yield, Cpk and per-step fail Pareto, updated as each DUT run completes.
+
+    Fed with the typed step records (see `ResultsSink.make_record()`) by `TestScript` (`lot_stats` arg), and kept
+    in a small local JSON store, so statistics are available instantly without re-reading results files
+    (see `summary()`, `cpk()`, `pareto()` and the CLI of this module).
+
+    Step limits (numeric command args with limit names, e.g. "val_min" / "val_max") are applied to each numeric result of the step.
+    One engine can be shared by several `TestScript` instances (e.g. slots of `MultiDutRunner`).
+    """
+
+    VERSION = 1
+    LO_NAMES = ("min", "lo", "low", "lsl")
+    HI_NAMES = ("max", "hi", "high", "usl")
+
+    def __init__(self, file_path: Optional[str] = None, autosave: bool = True) -> None:
+        """Constructor.
+
+        Args:
+            file_path: Store file path, None to keep statistics only in memory. Defaults to None.
+            autosave : True to save the store after each run. Defaults to True.
+        """
+        self.file_path = file_path
+        self.autosave = autosave
+        self.lots: dict[str, LotStats] = {}
+        self._pending: dict[str, list[dict[str, Any]]] = {}  # Step records of runs in progress, keyed by run id
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        """Load the store file (if it exists and has the current version)."""
+        if not self.file_path or not os.path.isfile(self.file_path):
+            return
+        try:
+            with open(self.file_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as err:
+            logger.warning(f'Error "{err}" reading lot statistics file "{self.file_path}", starting empty.')
+            return
+        if data.get("version") == LotStatsEngine.VERSION:
+            with self._lock:
+                self.lots = {lot: LotStats.from_dict(lot, lot_data) for lot, lot_data in data.get("lots", {}).items()}
+
+    def save(self) -> None:
+        """Save the store file (atomic replace)."""
+        if not self.file_path:
+            return
+        with self._lock:
+            data = {"version": LotStatsEngine.VERSION, "lots": {lot: lot_stats.to_dict() for lot, lot_stats in self.lots.items()}}
+            tmp_path = self.file_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            Path(tmp_path).replace(self.file_path)
+
+    @staticmethod
+    def step_key(record: dict[str, Any]) -> str:
+        return f'L{record["lineno"]:03d} {record["command"]}'
+
+    @classmethod
+    def _limits(cls, limits: dict[str, float]) -> list[Optional[float]]:
+        lo, hi = None, None
+        for name, value in limits.items():
+            parts = name.lower().split("_")
+            if any(p in cls.LO_NAMES for p in parts):
+                lo = value
+            elif any(p in cls.HI_NAMES for p in parts):
+                hi = value
+        return [lo, hi]
+
+    def add_step(self, record: dict[str, Any]) -> None:
+        """Add step record of a run in progress (counted by `end_run()`)."""
+        with self._lock:
+            self._pending.setdefault(record["run_id"], []).append(record)
+
+    def end_run(self, run_id: str, lot: Optional[str], run_result: str) -> None:
+        """Count the completed run and its step records into the lot statistics.
+
+        Args:
+            run_id    : Run identifier (same as in the step records)
+            lot       : Lot number
+            run_result: Run result - "pass", "fail" or "error" (see `RunResult`)
+        """
+        now = time.time()
+        with self._lock:
+            records = self._pending.pop(run_id, [])
+            lot = "" if lot is None else str(lot)
+            lot_stats = self.lots.get(lot)
+            if not lot_stats:
+                lot_stats = self.lots[lot] = LotStats(lot)
+            lot_stats.runs[run_result if run_result in lot_stats.runs else "error"] += 1
+            lot_stats.first_time = lot_stats.first_time or now
+            lot_stats.last_time = now
+            for record in records:
+                key = self.step_key(record)
+                counters = lot_stats.steps.setdefault(key, [0, 0])
+                counters[0] += 1
+                counters[1] += record["returncode"] != "ERR_OK"
+                limits = self._limits(record["limits"]) if record["limits"] else None
+                for name, value in record["values"].items():
+                    if not math.isfinite(value):
+                        continue
+                    measurement = f"{key}.{name}"
+                    stats = lot_stats.measurements.get(measurement)
+                    if not stats:
+                        stats = lot_stats.measurements[measurement] = RunningStats()
+                    stats.add(value)
+                    if limits:
+                        lot_stats.limits[measurement] = limits
+        if self.autosave:
+            self.save()
+
+    def summary(self, lot: str) -> Optional[dict[str, Any]]:
+        """Lot yield summary, None if the lot is not known."""
+        with self._lock:
+            lot_stats = self.lots.get(lot)
+            if not lot_stats:
+                return None
+            return {"lot": lot, "runs": lot_stats.run_cnt, **lot_stats.runs, "yield_pct": lot_stats.yield_pct, "first_time": lot_stats.first_time, "last_time": lot_stats.last_time}
+
+    def cpk(self, lot: str) -> list[dict[str, Any]]:
+        """Statistics and Cpk for each measurement of the lot, in script order."""
+        with self._lock:
+            lot_stats = self.lots.get(lot)
+            if not lot_stats:
+                return []
+            rows = []
+            for measurement, stats in sorted(lot_stats.measurements.items()):
+                lo, hi = lot_stats.limits.get(measurement, [None, None])
+                rows.append({"measurement": measurement, "n": stats.n, "mean": stats.mean, "stdev": stats.stdev, "min": stats.min, "max": stats.max, "lo": lo, "hi": hi, "cpk": stats.cpk(lo, hi)})
+            return rows
+
+    def pareto(self, lot: str, top: Optional[int] = None) -> list[dict[str, Any]]:
+        """Failing steps of the lot, most failures first, with cumulative share of all step failures."""
+        with self._lock:
+            lot_stats = self.lots.get(lot)
+            if not lot_stats:
+                return []
+            steps = sorted(((key, runs, fails) for key, (runs, fails) in lot_stats.steps.items() if fails), key=lambda s: (-s[2], s[0]))
+        total = sum(fails for _, _, fails in steps)
+        rows, cumulative = [], 0
+        for key, runs, fails in steps[:top]:
+            cumulative += fails
+            rows.append({"step": key, "runs": runs, "fails": fails, "fail_pct": 100.0 * fails / runs, "cumulative_pct": 100.0 * cumulative / total})
+        return rows
+
+
+def _fmt(field: str, value: object) -> str:
+    if value is None:
+        return "-"
+    if field.endswith("_time"):
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(value))
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return str(value)
+
+
+def _print_rows(rows: list[dict[str, Any]]) -> None:
+    if not rows:
+        print("No data.")
+        return
+    fields = list(rows[0])
+    table = [fields] + [[_fmt(field, row[field]) for field in fields] for row in rows]
+    widths = [max(len(line[i]) for line in table) for i in range(len(fields))]
+    for line in table:
+        print("  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip())
+
+
+def _parse_args() -> tuple[argparse.Namespace, argparse.ArgumentParser]:
+    parser = argparse.ArgumentParser(description="Query lot statistics (yield, Cpk, fail Pareto)")
+    parser.add_argument("-D", "--debug", help="Debug", action="store_true")
+    parser.add_argument("-s", "--store", dest="store", type=str, help="Lot statistics store file", default="lot_stats.json")
+
+    subparsers = parser.add_subparsers(title="Commands", dest="command")
+
+    # "lots" command
+    _lots_parser = subparsers.add_parser("lots", help="List lots with yield")
+
+    # "yield" command
+    yield_parser = subparsers.add_parser("yield", help="Show lot yield")
+    yield_parser.add_argument("lot", type=str, help="Lot number")
+
+    # "cpk" command
+    cpk_parser = subparsers.add_parser("cpk", help="Show measurement statistics and Cpk of the lot")
+    cpk_parser.add_argument("lot", type=str, help="Lot number")
+
+    # "pareto" command
+    pareto_parser = subparsers.add_parser("pareto", help="Show failing steps of the lot, most failures first")
+    pareto_parser.add_argument("lot", type=str, help="Lot number")
+    pareto_parser.add_argument("-n", "--top", dest="top", type=int, help="Number of steps to show")
+
+    args = parser.parse_args()
+    return args, parser
+
+
+def main(loggr: logging.Logger = logger) -> int:
+    args, parser = _parse_args()
+    if loggr and args.debug:
+        loggr.setLevel(logging.DEBUG)
+        loggr.debug(LazyFormat("DEBUG %s", vars(args)))
+
+    if not os.path.isfile(args.store):
+        print(f'Lot statistics file "{args.store}" not found.')
+        return 1
+    engine = LotStatsEngine(args.store, autosave=False)
+
+    if args.command == "lots":
+        _print_rows([summary for lot in sorted(engine.lots) if (summary := engine.summary(lot))])
+        return 0
+    if args.command == "yield":
+        summary = engine.summary(args.lot)
+        if not summary:
+            print(f'Lot "{args.lot}" not found.')
+            return 1
+        _print_rows([summary])
+        return 0
+    if args.command == "cpk":
+        _print_rows(engine.cpk(args.lot))
+        return 0
+    if args.command == "pareto":
+        _print_rows(engine.pareto(args.lot, args.top))
+        return 0
+
+    parser.print_help()
+    return 1
+
+
+if __name__ == "__main__":
+    rc = main()
+    if rc:
+        sys.exit(rc)
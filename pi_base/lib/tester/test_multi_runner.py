@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TYPE_CHECKING
+
+# "modpath" must be first of our modules
+# pylint: disable=wrong-import-position
+# ruff: noqa: E402
+from .tester_common import TestError
+from .test_result_writer import ResultsWriter
+from .test_script import RunResult, TestScript
+
+if TYPE_CHECKING:
+    from pi_base.lib.loggr import Loggr
+
+    from .dut_api import DutControlInterface
+    from .tester_api import TesterControlInterface
+
+
+class TestSlot:
+    """One DUT position in a multi-DUT fixture.
+
+    Each slot has its own `TestScript` instance, so its own transcript, results writer and stop flag.
+    """
+
+    def __init__(self, index: int, test: TestScript) -> None:
+        """Constructor.
+
+        Args:
+            index: Slot index in the fixture (0-based)
+            test : Test script instance for this slot
+        """
+        self.index = index
+        self.test = test
+        self.returncode: Optional[TestError] = None
+        self.tester_info: Optional[str] = None
+        self.dut_info: Optional[str] = None
+
+    @property
+    def results_writer(self) -> ResultsWriter:
+        return self.test.results_writer
+
+    @property
+    def run_result(self) -> RunResult:
+        return self.test.run_result
+
+    def abort(self) -> None:
+        self.test.abort()
+
+
+class MultiDutRunner:
+    """Runs the same compiled test script on several DUTs at once (one thread per slot).
+
+    The script is compiled once and bound to each slot commands (see `TestScript.bind_plan()`), and all
+    slots share the plugin registry, so plugins are discovered and imported only once.
+    Each slot should have its own DUT control (and tester control, if used), as they are used from the slot thread.
+    """
+
+    def __init__(self, tests: list[TestScript], loggr: Loggr) -> None:
+        """Constructor.
+
+        Args:
+            tests: Test script instance for each slot
+            loggr: Logger
+        """
+        if not tests:
+            raise ValueError("Please provide at least one test script instance")
+        self.slots = [TestSlot(i, test) for i, test in enumerate(tests)]
+        self.loggr = loggr
+
+    @classmethod
+    def create(
+        cls,
+        num_slots: int,
+        loggr: Loggr,
+        dut_controls: Optional[list[Optional[DutControlInterface]]] = None,
+        tester_controls: Optional[list[Optional[TesterControlInterface]]] = None,
+        results_writer_factory: Callable[[int], ResultsWriter] = lambda _index: ResultsWriter(),
+        test_class: type[TestScript] = TestScript,
+        **kwargs: object,
+    ) -> MultiDutRunner:
+        """Create runner with test script instances sharing one plugin registry.
+
+        Args:
+            num_slots             : Number of slots (DUTs in the fixture)
+            loggr                 : Logger (shared by all slots)
+            dut_controls          : DUT control for each slot. Defaults to None.
+            tester_controls       : Tester control for each slot. Defaults to None.
+            results_writer_factory: Function to create results writer for the slot index (e.g. to register commit callbacks). Defaults to plain `ResultsWriter`.
+            test_class            : `TestScript` or its subclass. Defaults to TestScript.
+            **kwargs              : Additional args for `test_class` constructor
+
+        Returns:
+            Runner
+        """
+        plugin_registry: dict = {}
+        tests = [
+            test_class(
+                results_writer=results_writer_factory(i),
+                loggr=loggr,
+                dut_control=dut_controls[i] if dut_controls else None,
+                tester_control=tester_controls[i] if tester_controls else None,
+                plugin_registry=plugin_registry,
+                **kwargs,
+            )
+            for i in range(num_slots)
+        ]
+        return cls(tests, loggr)
+
+    def _map(self, fnc: Callable[[TestSlot], Any], slots: Optional[list[TestSlot]] = None) -> list[Any]:
+        """Call the function for each slot in parallel, return results in slot order."""
+        slots = self.slots if slots is None else slots
+        if len(slots) == 1:
+            return [fnc(slots[0])]
+        with ThreadPoolExecutor(max_workers=len(slots), thread_name_prefix="TestSlot") as executor:
+            return list(executor.map(fnc, slots))
+
+    def pre(self) -> list[TestError]:
+        """Call pre on all slots (see `TestScript.pre`)."""
+        return self._map(lambda slot: slot.test.pre())
+
+    def post(self) -> list[TestError]:
+        """Call post on all slots (see `TestScript.post`)."""
+        return self._map(lambda slot: slot.test.post())
+
+    def abort(self, index: Optional[int] = None) -> None:
+        """Abort the running script on the given slot, or on all slots if index is None."""
+        for slot in self.slots:
+            if index is None or slot.index == index:
+                slot.abort()
+
+    def _run_slot(self, slot: TestSlot, lot_num: str, plan) -> tuple[TestError, Optional[str], Optional[str]]:
+        slot.returncode, slot.tester_info, slot.dut_info = TestError.ERR_FAIL, None, None
+        try:
+            slot.returncode, slot.tester_info, slot.dut_info = slot.test.exec_plan(lot_num, slot.test.bind_plan(plan))
+        except Exception as err:
+            self.loggr.error(f'Slot {slot.index}: Error "{err}" when executing test script file "{plan.file_name}"')
+        return slot.returncode, slot.tester_info, slot.dut_info
+
+    def exec_csv(self, lot_num: str, in_file_name: str, slots: Optional[list[int]] = None) -> list[tuple[TestError, Optional[str], Optional[str]]]:
+        """Run the script file on all (or given) slots at once.
+
+        Args:
+            lot_num     : Lot number
+            in_file_name: Script file name
+            slots       : Indexes of the slots to run (e.g. to skip empty positions in the fixture), None for all. Defaults to None.
+
+        Returns:
+            Tuple of (returncode, tester_info, dut_info) for each slot that was run, in slot order.
+            If `slots` has unknown indexes or selects no slot, nothing is run and each (or the only) tuple has `TestError.ERR_INVALID_COMMAND_ARGUMENT`.
+        """
+        if slots is not None:
+            unknown = [index for index in slots if not 0 <= index < len(self.slots)]
+            if unknown or not slots:
+                self.loggr.error(f'Invalid slots {slots} for running test script file "{in_file_name}", fixture has {len(self.slots)} slots')
+                return [(TestError.ERR_INVALID_COMMAND_ARGUMENT, None, None)] * max(len(slots), 1)
+        run_slots = [slot for slot in self.slots if slots is None or slot.index in slots]
+        try:
+            plan = run_slots[0].test.get_plan(in_file_name)  # Compile once
+        except OSError as err:
+            self.loggr.error(f'Error "{err}" when opening file "{in_file_name}"')
+            return [(TestError.ERR_FILE_OPEN, None, None) for _ in run_slots]
+        except Exception as err:
+            self.loggr.error(f'Error "{err}" when reading test script file "{in_file_name}"')
+            return [(TestError.ERR_FAIL, None, None) for _ in run_slots]
+        return self._map(lambda slot: self._run_slot(slot, lot_num, plan), run_slots)
+
+    def commit_results(self, file_names: list[str]) -> list[list]:
+        """Commit results of each slot to the given file names (one per slot, in slot order)."""
+        return self._map(lambda slot: slot.results_writer.commit_results(file_names[slot.index]))
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import threading
+from typing import Any, Optional
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Percentile (with linear interpolation) of sorted values.
+
+    Args:
+        sorted_values: Values, sorted ascending, not empty
+        p            : Percentile, 0..100
+
+    Returns:
+        Percentile value
+    """
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    k = (len(sorted_values) - 1) * p / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class StepProfiler:
+    """Collects per-step timings of test scripts across runs (DUTs), for finding the steps that dominate the test time.
+
+    Each script step is timed in phases (see `PHASES`):
+     * tokenize - parsing and binding the script line (only when the script is compiled, compiled plans are cached)
+     * dispatch - TestScript / command wrapper overhead around the plugin method
+     * execute  - plugin method
+     * write    - adding results to the `ResultsWriter`
+     * log      - adding result to the transcript and logging it
+
+    One profiler can be shared by several `TestScript` instances (e.g. slots of `MultiDutRunner`).
+    """
+
+    PHASES = ("tokenize", "dispatch", "execute", "write", "log")
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self) -> None:
+        self.samples: dict[tuple[str, int, str], dict[str, list[float]]] = {}
+        self.runs: list[float] = []
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.samples = {}
+            self.runs = []
+
+    def add(self, file_name: str, lineno: int, command: str, phase: str, seconds: float) -> None:
+        """Add timing of one phase of one script step.
+
+        Args:
+            file_name: Script file name
+            lineno   : Line number in the script
+            command  : Command name
+            phase    : One of `PHASES`
+            seconds  : Duration
+        """
+        with self._lock:
+            self.samples.setdefault((file_name, lineno, command), {}).setdefault(phase, []).append(seconds)
+
+    def add_run(self, seconds: float) -> None:
+        """Add total time of one script run (one DUT)."""
+        with self._lock:
+            self.runs.append(seconds)
+
+    @staticmethod
+    def _stats(values: list[float]) -> dict[str, Any]:
+        values = sorted(values)
+        stats: dict[str, Any] = {"count": len(values), "total_s": sum(values), "mean_s": sum(values) / len(values)}
+        for p in StepProfiler.PERCENTILES:
+            stats[f"p{p}_s"] = percentile(values, p)
+        stats["max_s"] = values[-1]
+        return stats
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Aggregate timings into a row per step and phase, in script order.
+
+        Returns:
+            List of dicts with file, lineno, command, phase, count, total_s, mean_s, p50_s, p90_s, p99_s, max_s
+        """
+        with self._lock:
+            samples = {key: {phase: list(values) for phase, values in phases.items()} for key, phases in self.samples.items()}
+        return [
+            {"file": file_name, "lineno": lineno, "command": command, "phase": phase, **self._stats(phases[phase])}
+            for (file_name, lineno, command), phases in sorted(samples.items())
+            for phase in StepProfiler.PHASES
+            if phases.get(phase)
+        ]
+
+    def runs_summary(self) -> Optional[dict[str, Any]]:
+        """Aggregate total run times, None if no runs were recorded."""
+        with self._lock:
+            runs = list(self.runs)
+        return self._stats(runs) if runs else None
+
+    def export_csv(self, file_path: str) -> None:
+        rows = self.summary()
+        fields = ["file", "lineno", "command", "phase", "count", "total_s", "mean_s"] + [f"p{p}_s" for p in StepProfiler.PERCENTILES] + ["max_s"]
+        with open(file_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def export_json(self, file_path: str) -> None:
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump({"runs": self.runs_summary(), "steps": self.summary()}, f, indent=2)
+
+    def export_collapsed(self, file_path: str) -> None:
+        """Export total times in "collapsed stack" format (`frame;frame;frame <count>`, with count in microseconds) for flamegraph tools."""
+        with open(file_path, "w", encoding="utf-8") as f:
+            for row in self.summary():
+                script = os.path.basename(row["file"]).replace(";", "_")
+                f.write(f'{script};L{row["lineno"]:03d} {row["command"]};{row["phase"]} {round(row["total_s"] * 1e6)}\n')
+
+    def export(self, file_prefix: str) -> list[str]:
+        """Export all reports, to files named with the given prefix.
+
+        Returns:
+            List of written file paths
+        """
+        paths = [file_prefix + "_steps.csv", file_prefix + "_steps.json", file_prefix + "_steps.collapsed"]
+        self.export_csv(paths[0])
+        self.export_json(paths[1])
+        self.export_collapsed(paths[2])
+        return paths
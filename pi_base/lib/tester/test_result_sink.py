@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+import abc
+import importlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ClassVar, Optional
+
+if TYPE_CHECKING:
+    from .tester_common import TestError
+
+
+def _to_float(value: object) -> Optional[float]:
+    """Convert number or numeric string to float, None if it is not a number."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip())
+    except ValueError:
+        return None
+
+
+def _finite_or_none(value: object) -> object:
+    """Replace NaN / Infinity floats (not valid in JSON) with None, also in dict values."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _finite_or_none(item) for key, item in value.items()}
+    return value
+
+
+class ResultsSink(abc.ABC):
+    """Structured per-step results output, written alongside the CSV results file (see `ResultsWriter`).
+
+    Each executed script step becomes one typed record (see `FIELDS`), so yield analysis can load the
+    records directly (e.g. with pandas / pyarrow) instead of parsing the CSV results text.
+    Records are buffered and written by `flush()` (`TestScript` flushes at the end of each run), `close()` must be
+    called when done. One sink can be shared by several `TestScript` instances (e.g. slots of `MultiDutRunner`).
+
+    See `JsonlResultsSink` and `ParquetResultsSink` for the output formats, and `open_results_sink()` for choosing one by file name.
+    """
+
+    # Record fields and types
+    FIELDS: ClassVar[dict[str, str]] = {
+        "run_id": "str",  # Unique per run (one DUT)
+        "lot": "str",
+        "dut_id": "str",
+        "file": "str",  # Script file name
+        "lineno": "int",
+        "command": "str",
+        "returncode": "str",  # TestError name
+        "error_code": "int",  # TestError id
+        "checks": "int",
+        "elapsed_s": "float",
+        "timestamp": "float",  # Step completion time (seconds since epoch)
+        "args": "map<str,str>",  # Command args by name, as given in the script
+        "limits": "map<str,float>",  # Numeric args with limit names (see `LIMIT_ARG_RE`)
+        "values": "map<str,float>",  # Numeric results by name
+        "texts": "map<str,str>",  # Non-numeric results by name
+        "block_rows": "int",  # Number of block data rows (block data itself goes only to the CSV results)
+    }
+
+    # Command arg names treated as test limits, e.g. "val_min", "max", "lsl"
+    LIMIT_ARG_RE = re.compile(r"(^|_)(min|max|lo|hi|low|high|limit|lsl|usl)(_|$)", re.IGNORECASE)
+
+    def __init__(self, file_path: str, loggr: Optional[logging.Logger] = None) -> None:
+        """Constructor.
+
+        Args:
+            file_path: Output file path, records are appended to it
+            loggr    : Logger. Defaults to None.
+        """
+        self.file_path = file_path
+        self.loggr = loggr
+        self.pending: list[dict[str, Any]] = []
+        self.written = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def make_record(
+        cls,
+        run_id: str,
+        lot: Optional[str],
+        dut_id: Optional[str],
+        file_name: str,
+        lineno: int,
+        command: str,
+        arg_names: list[str],
+        arg_values: list[str],
+        result_names: list[str],
+        result_values: list[Any],
+        returncode: TestError,
+        checks: Optional[int],
+        elapsed_time: Optional[float],
+        block_rows: int = 0,
+    ) -> dict[str, Any]:
+        """Build a typed step record (see `FIELDS`).
+
+        Args:
+            run_id       : Run identifier
+            lot          : Lot number
+            dut_id       : DUT identifier
+            file_name    : Script file name
+            lineno       : Line number in the script
+            command      : Command name
+            arg_names    : Command args names
+            arg_values   : Command args values from the script
+            result_names : Command results names
+            result_values: Command results values
+            returncode   : Command returncode
+            checks       : Number of checks
+            elapsed_time : Command elapsed time in seconds
+            block_rows   : Number of block data rows. Defaults to 0.
+
+        Returns:
+            Record dict
+        """
+        args = {name: str(value) for name, value in zip(arg_names, arg_values)}
+        limits = {}
+        for name, value in args.items():
+            if cls.LIMIT_ARG_RE.search(name) and (num := _to_float(value)) is not None:
+                limits[name] = num
+        values, texts = {}, {}
+        for name, value in zip(result_names, result_values):
+            num = _to_float(value)
+            if num is not None:
+                values[name] = num
+            elif value is not None:
+                texts[name] = str(value)
+        return {
+            "run_id": run_id,
+            "lot": "" if lot is None else str(lot),
+            "dut_id": "" if dut_id is None else str(dut_id),
+            "file": file_name,
+            "lineno": lineno,
+            "command": command,
+            "returncode": returncode.name,
+            "error_code": returncode.id,
+            "checks": checks or 0,
+            "elapsed_s": elapsed_time or 0.0,
+            "timestamp": time.time(),
+            "args": args,
+            "limits": limits,
+            "values": values,
+            "texts": texts,
+            "block_rows": block_rows,
+        }
+
+    def add(self, record: dict[str, Any]) -> None:
+        """Add step record, written out by the next `flush()`."""
+        with self._lock:
+            self.pending.append(record)
+
+    def flush(self) -> None:
+        """Write out pending records (if writing fails, they are kept pending and written by the next flush)."""
+        with self._lock:
+            if self.pending:
+                self._write(self.pending)
+                self.written += len(self.pending)
+                self.pending = []
+
+    def close(self) -> None:
+        """Write out pending records and close the output."""
+        self.flush()
+
+    @abc.abstractmethod
+    def _write(self, records: list[dict[str, Any]]) -> None:
+        """Write records to the output."""
+
+
+class JsonlResultsSink(ResultsSink):
+    """JSON Lines results sink (one record per line), does not need any additional packages.
+
+    NaN / Infinity values are written as null, so each line is valid JSON.
+    """
+
+    def _write(self, records: list[dict[str, Any]]) -> None:
+        with open(self.file_path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(_finite_or_none(record), separators=(",", ":"), allow_nan=False) + "\n" for record in records)
+
+
+class ParquetResultsSink(ResultsSink):
+    """Parquet results sink (needs `pyarrow`), each `flush()` writes one row group.
+
+    The file is valid only after `close()`. Parquet files cannot be appended to, so if the file already exists
+    (e.g. from an earlier session), records go to a new part file next to it, named "<name>-<YYYYmmdd-HHMMSS>.parquet"
+    (see `part_file_path()`), and the existing file is kept.
+    """
+
+    def __init__(self, file_path: str, loggr: Optional[logging.Logger] = None) -> None:
+        part_path = self.part_file_path(file_path)
+        if part_path != file_path and loggr:
+            loggr.info(f'Structured results file "{file_path}" exists, writing to "{part_path}".')
+        super().__init__(part_path, loggr)
+        self.pa = importlib.import_module("pyarrow")
+        self.pq = importlib.import_module("pyarrow.parquet")
+        pa = self.pa
+        types = {
+            "str": pa.string(),
+            "int": pa.int64(),
+            "float": pa.float64(),
+            "map<str,str>": pa.map_(pa.string(), pa.string()),
+            "map<str,float>": pa.map_(pa.string(), pa.float64()),
+        }
+        self.schema = pa.schema([(name, types[type_name]) for name, type_name in self.FIELDS.items()])
+        self.writer = None
+
+    @staticmethod
+    def part_file_path(file_path: str) -> str:
+        """File path to write to - `file_path` if it does not exist, otherwise a new timestamped part file path next to it."""
+        if not Path(file_path).exists():
+            return file_path
+        name, ext = os.path.splitext(file_path)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        part_path, i = f"{name}-{stamp}{ext}", 1
+        while Path(part_path).exists():
+            i += 1
+            part_path = f"{name}-{stamp}-{i}{ext}"
+        return part_path
+
+    def _write(self, records: list[dict[str, Any]]) -> None:
+        maps = [name for name, type_name in self.FIELDS.items() if type_name.startswith("map")]
+        rows = [{**record, **{name: list(record[name].items()) for name in maps}} for record in records]
+        table = self.pa.Table.from_pylist(rows, schema=self.schema)
+        if not self.writer:
+            self.writer = self.pq.ParquetWriter(self.file_path, self.schema)
+        self.writer.write_table(table)
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            if self.writer:
+                self.writer.close()
+                self.writer = None
+
+
+def open_results_sink(file_path: str, loggr: Optional[logging.Logger] = None) -> ResultsSink:
+    """Create results sink by the file extension: ".parquet" for Parquet (if `pyarrow` is installed), JSON Lines otherwise.
+
+    If `pyarrow` is not installed, Parquet file path is changed to ".jsonl" extension.
+
+    Args:
+        file_path: Output file path
+        loggr    : Logger. Defaults to None.
+
+    Returns:
+        Results sink
+    """
+    name, ext = os.path.splitext(file_path)
+    if ext.lower() == ".parquet":
+        try:
+            return ParquetResultsSink(file_path, loggr)
+        except ImportError:
+            file_path = name + ".jsonl"
+            if loggr:
+                loggr.warning(f'Package "pyarrow" is not installed, writing structured results to "{file_path}" instead.')
+    return JsonlResultsSink(file_path, loggr)
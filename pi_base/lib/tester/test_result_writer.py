@@ -1,4 +1,13 @@
-from typing import Optional, Union
+from concurrent.futures import Future
+import io
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Optional, Union
 
 # "modpath" must be first of our modules
 # pylint: disable=wrong-import-position
@@ -9,11 +18,422 @@ from .tester_common import TestError
 from .test_commit_callbacks import ResultCommitCallback
 from .test_script_defines import RESULT_BLOCK_BEGIN, RESULT_BLOCK_END
 
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from pi_base.lib.loggr import Loggr
+
+
+class ResultLines:
+    """Append-only results lines stored in a spooled temporary file - in memory up to `max_memory` bytes, then rolled over to disk.
+
+    Iterating yields the text lines (entries with embedded newlines come out as separate lines, same as when written to a file),
+    and `len()` counts those lines. `open()` gives a binary stream of the whole content, so consumers never need all lines in memory at once.
+    """
+
+    CHUNK_SIZE = 64 * 1024  # Bytes per read when copying the content
+
+    def __init__(self, max_memory: int = 1024 * 1024, spool_dir: Optional[str] = None, encoding: str = "utf-8") -> None:
+        """Constructor.
+
+        Args:
+            max_memory: Size in bytes to keep in memory before moving the content to a file on disk. Defaults to 1MiB.
+            spool_dir : Directory for the file on disk, None for the default temp directory. Defaults to None.
+            encoding  : Text encoding. Defaults to "utf-8".
+        """
+        self.max_memory = max_memory
+        self.spool_dir = spool_dir
+        self.encoding = encoding
+        self._file = tempfile.SpooledTemporaryFile(max_size=max_memory, mode="w+b", dir=spool_dir)  # pylint: disable=consider-using-with
+        self._lock = threading.Lock()
+        self._count = 0
+        self._size = 0
+
+    def append(self, line: str) -> None:
+        self.append_bytes((line + "\n").encode(self.encoding))
+
+    def append_bytes(self, data: bytes) -> None:
+        """Append encoded content (one or more lines, or a chunk of them), e.g. when copying from another `ResultLines` or a file."""
+        with self._lock:
+            self._file.seek(0, io.SEEK_END)
+            self._file.write(data)
+            self._count += data.count(b"\n")
+            self._size += len(data)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def size(self) -> int:
+        """Size of the content in bytes."""
+        return self._size
+
+    @property
+    def rolled_over(self) -> bool:
+        """True if the content was moved to a file on disk."""
+        return bool(getattr(self._file, "_rolled", False))
+
+    def read_at(self, offset: int, size: int = -1, line: bool = False) -> bytes:
+        """Read content at the offset (does not interfere with appends and other readers).
+
+        Args:
+            offset: Offset in bytes
+            size  : Number of bytes to read, -1 for all. Defaults to -1.
+            line  : True to read up to the end of line. Defaults to False.
+        """
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.readline(size) if line else self._file.read(size)
+
+    def __iter__(self) -> "Iterator[str]":
+        offset = 0
+        while offset < self._size:
+            data = self.read_at(offset, line=True)
+            if not data:
+                break
+            offset += len(data)
+            yield data.decode(self.encoding).rstrip("\n")
+
+    def open(self) -> "ResultLinesReader":
+        """Open a binary stream over the content (a snapshot of the current size)."""
+        return ResultLinesReader(self)
+
+    def copy(self) -> "ResultLines":
+        """Snapshot of the lines, copied in chunks (content stays out of memory if it was rolled over to disk)."""
+        lines = ResultLines(self.max_memory, self.spool_dir, self.encoding)
+        self.copy_to(lines.append_bytes)
+        return lines
+
+    def copy_to(self, write: Callable[[bytes], object]) -> None:
+        """Copy the content (a snapshot of the current size) in chunks of `CHUNK_SIZE` bytes to the write function (e.g. file `write`)."""
+        offset, size = 0, self._size
+        while offset < size:
+            data = self.read_at(offset, min(ResultLines.CHUNK_SIZE, size - offset))
+            if not data:
+                break
+            write(data)
+            offset += len(data)
+
+    @classmethod
+    def from_file(cls, file_path: str, max_memory: int = 1024 * 1024, spool_dir: Optional[str] = None, encoding: str = "utf-8") -> "ResultLines":
+        """Load lines from a file, in chunks (see `ResultLines()` for args)."""
+        lines = cls(max_memory, spool_dir, encoding)
+        with open(file_path, "rb") as f:
+            while data := f.read(cls.CHUNK_SIZE):
+                lines.append_bytes(data)
+        return lines
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class ResultLinesReader(io.RawIOBase):
+    """Seekable binary stream over `ResultLines` content, e.g. for uploading it."""
+
+    def __init__(self, lines: "ResultLines") -> None:
+        super().__init__()
+        self._lines = lines
+        self._size = lines.size
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._size
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+        self._pos = offset
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        count = max(0, min(len(view), self._size - self._pos))
+        if not count:
+            return 0
+        data = self._lines.read_at(self._pos, count)
+        view[: len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+
+class ResultCommitJob:
+    """One pending commit of the results buffer."""
+
+    def __init__(self, job_id: str, file_name: str, lines: "Union[list[str], ResultLines]", pending: "list[str]", future: "Optional[Future]" = None) -> None:
+        """Constructor.
+
+        Args:
+            job_id   : Unique (and sortable by creation time) job id
+            file_name: File name of the results file
+            lines    : Snapshot of the results buffer
+            pending  : Names of the callbacks that did not commit the results yet
+            future   : Future to deliver the commit results to
+        """
+        self.job_id = job_id
+        self.file_name = file_name
+        self.lines = lines
+        self.pending = pending
+        self.future: Future = future or Future()
+
+
+class ResultCommitQueue:
+    """Background queue for committing results, with worker threads, retries and an optional on-disk spool.
+
+    When `spool_dir` is given, each job is saved to the spool directory until all callbacks commit it, so
+    pending commits survive a restart and are picked up again by the next `ResultCommitQueue` using that directory.
+    Each job is saved as "<job_id>.lines" file with the results content (copied in chunks) and "<job_id>.json" file with the job state.
+    """
+
+    RETRY_RETURNCODES = (TestError.ERR_FILE_SAVE,)
+    MAX_JOBS_PER_PASS = 100  # Maximum number of queued jobs a worker starts together
+
+    def __init__(
+        self,
+        get_callbacks: "Callable[[], list[ResultCommitCallback]]",
+        spool_dir: Optional[str] = None,
+        workers: int = 1,
+        max_retries: int = 3,
+        backoff_s: float = 1.0,
+        backoff_max_s: float = 60.0,
+        loggr: "Optional[Loggr]" = None,
+    ) -> None:
+        """Constructor.
+
+        Args:
+            get_callbacks: Function returning the registered commit callbacks
+            spool_dir    : Directory to keep pending jobs in. Defaults to None (jobs are kept in memory only).
+            workers      : Number of worker threads. Defaults to 1.
+            max_retries  : Number of retries for each callback. Defaults to 3.
+            backoff_s    : Delay before the first retry, doubled for each next retry. Defaults to 1.0.
+            backoff_max_s: Maximum delay between retries. Defaults to 60.0.
+            loggr        : Logger. Defaults to None.
+        """
+        self._get_callbacks = get_callbacks
+        self.spool_dir = spool_dir
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.backoff_max_s = backoff_max_s
+        self.loggr = loggr
+        self._queue: "queue.Queue[Optional[ResultCommitJob]]" = queue.Queue()
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._counter = 0
+
+        if self.spool_dir:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            for job in self._load_spool():
+                self._queue.put(job)
+
+        self._threads = [threading.Thread(target=self._worker, name=f"ResultCommitQueue-{i}", daemon=True) for i in range(max(1, workers))]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, lines: "Union[list[str], ResultLines]", file_name: str) -> Future:
+        """Queue the results for commit.
+
+        Args:
+            lines    : Results lines to commit (the list should not be modified after the call)
+            file_name: File name of the results file
+
+        Returns:
+            Future that delivers the list of callbacks and their results (same as `ResultsWriter.commit_results()`).
+        """
+        with self._lock:
+            self._counter += 1
+            job_id = f"{time.time_ns():020d}-{self._counter:06d}"
+        job = ResultCommitJob(job_id, file_name, lines, [c.name for c in self._get_callbacks()])
+        self._save(job, with_lines=True)
+        self._queue.put(job)
+        return job.future
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait for all queued jobs to be processed.
+
+        Args:
+            timeout: Maximum time to wait in seconds, None to wait forever. Defaults to None.
+
+        Returns:
+            True if all jobs were processed.
+        """
+        end_time = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if end_time is None else end_time - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def stop(self, wait: bool = True, timeout: Optional[float] = None) -> None:
+        """Stop the worker threads. Jobs not yet committed remain in the spool directory (if used).
+
+        Args:
+            wait   : True to wait for all queued jobs to be processed first. Defaults to True.
+            timeout: Maximum time to wait in seconds. Defaults to None.
+        """
+        if wait:
+            self.join(timeout)
+        self._stop_event.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout)
+
+    def _worker(self) -> None:
+        while True:
+            # Take all queued jobs, and start them all before waiting for any, so callbacks can commit them together (see `ResultCommitCallback.commit_async()`)
+            jobs = [self._queue.get()]
+            try:
+                while jobs[-1] is not None and len(jobs) < self.MAX_JOBS_PER_PASS:
+                    jobs.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            started = self._start([job for job in jobs if job])
+            for job in jobs:
+                self._finish(job, started)
+            if jobs[-1] is None:
+                break
+
+    def _finish(self, job: "Optional[ResultCommitJob]", started: "dict[tuple[str, str], Future]") -> None:
+        try:
+            if job:
+                self._process(job, started)
+        except Exception as e:
+            if self.loggr:
+                self.loggr.error(f'Error {type(e)} "{e}" committing results file "{job.file_name if job else None}"')
+            if job and not job.future.done():
+                job.future.set_exception(e)
+        finally:
+            self._queue.task_done()
+
+    def _start(self, jobs: "list[ResultCommitJob]") -> "dict[tuple[str, str], Future]":
+        started: dict[tuple[str, str], Future] = {}
+        for job in jobs:
+            for callback in self._get_callbacks():
+                if callback.name not in job.pending:
+                    continue
+                try:
+                    future = callback.commit_async(job.lines, job.file_name)
+                except Exception as e:
+                    future = Future()
+                    future.set_exception(e)
+                started[(job.job_id, callback.name)] = future
+        return started
+
+    def _process(self, job: ResultCommitJob, started: "dict[tuple[str, str], Future]") -> None:
+        callback_results = []
+        for callback in self._get_callbacks():
+            if callback.name not in job.pending:
+                continue
+            err, msg = self._commit_one(callback, job, started.get((job.job_id, callback.name)))
+            callback_results.append((callback, err, msg))
+            if err == TestError.ERR_OK or err not in ResultCommitQueue.RETRY_RETURNCODES:
+                # Done with this callback (non-retriable errors will not get better by retrying after restart)
+                job.pending.remove(callback.name)
+                self._save(job)
+            elif self.loggr:
+                kept = f'Kept in spool directory "{self.spool_dir}" for retry on the next start.' if self.spool_dir else "Giving up."
+                self.loggr.warning(f'Failed committing results file "{job.file_name}" by {callback.name} after {self.max_retries} retries, {msg}. {kept}')
+        if not job.pending:
+            self._remove(job)
+        job.future.set_result(callback_results)
+
+    def _commit_one(self, callback: ResultCommitCallback, job: ResultCommitJob, first: "Optional[Future]" = None) -> "tuple[TestError, Optional[str]]":
+        delay = self.backoff_s
+        attempt = 0
+        while True:
+            try:
+                # First attempt may be already started by `_start()`
+                err, msg = first.result() if first else callback.commit(job.lines, job.file_name)
+            except Exception as e:
+                err, msg = TestError.ERR_FILE_SAVE, f'Error: "{e}"'
+            first = None
+            if err not in ResultCommitQueue.RETRY_RETURNCODES or attempt >= self.max_retries:
+                return err, msg
+            attempt += 1
+            if self._stop_event.wait(delay):
+                return err, msg
+            delay = min(delay * 2, self.backoff_max_s)
+
+    def _spool_path(self, job_id: str, ext: str = ".json") -> Optional[str]:
+        return os.path.join(self.spool_dir, f"{job_id}{ext}") if self.spool_dir else None
+
+    def _save(self, job: ResultCommitJob, with_lines: bool = False) -> None:
+        path, lines_path = self._spool_path(job.job_id), self._spool_path(job.job_id, ".lines")
+        if not path or not lines_path:
+            return
+        if with_lines:
+            # Content is saved once (before the job state), copied in chunks so streamed results (`ResultLines`) stay out of memory
+            path_tmp = lines_path + ".tmp"
+            with open(path_tmp, "wb") as f:
+                if isinstance(job.lines, ResultLines):
+                    job.lines.copy_to(f.write)
+                else:
+                    f.writelines((line + "\n").encode("utf-8") for line in job.lines)
+            Path(path_tmp).replace(lines_path)
+        path_tmp = path + ".tmp"
+        with open(path_tmp, "w", encoding="utf-8") as f:
+            json.dump({"file_name": job.file_name, "pending": job.pending}, f)
+        Path(path_tmp).replace(path)
+
+    def _remove(self, job: ResultCommitJob) -> None:
+        for ext in (".json", ".lines"):
+            path = self._spool_path(job.job_id, ext)
+            if path and os.path.isfile(path):
+                Path(path).unlink()
+
+    def _load_spool(self) -> "list[ResultCommitJob]":
+        jobs = []
+        if not self.spool_dir:
+            return jobs
+        for filename in sorted(os.listdir(self.spool_dir)):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(self.spool_dir, filename)
+            job_id = os.path.splitext(filename)[0]
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                lines = ResultLines.from_file(os.path.join(self.spool_dir, f"{job_id}.lines"))
+                jobs.append(ResultCommitJob(job_id, data["file_name"], lines, data["pending"]))
+            except Exception as e:
+                if self.loggr:
+                    self.loggr.error(f'Error {type(e)} "{e}" loading pending results commit "{path}", skipped.')
+        if jobs and self.loggr:
+            self.loggr.info(f'Resuming {len(jobs)} pending results commit(s) from "{self.spool_dir}".')
+        return jobs
+
 
 class ResultsWriter:
-    def __init__(self) -> None:
-        self.results_buffer: list[str] = []
+    def __init__(self, stream: bool = False, max_memory: int = 1024 * 1024, spool_dir: Optional[str] = None) -> None:
+        """Constructor.
+
+        Args:
+            stream    : True to keep results in a spooled temporary file (see `ResultLines`) instead of a list in memory,
+                        so memory use stays flat for long scripts. Defaults to False.
+            max_memory: In stream mode, size in bytes to keep in memory before moving results to a file on disk. Defaults to 1MiB.
+            spool_dir : In stream mode, directory for the file on disk, None for the default temp directory. Defaults to None.
+        """
+        self.stream = stream
+        self.max_memory = max_memory
+        self.spool_dir = spool_dir
+        self.results_buffer: "Union[list[str], ResultLines]" = self._new_buffer()
         self.callbacks: list[ResultCommitCallback] = []
+        self.commit_queue: Optional[ResultCommitQueue] = None
+
+    def _new_buffer(self) -> "Union[list[str], ResultLines]":
+        return ResultLines(self.max_memory, self.spool_dir) if self.stream else []
 
     def register_commit_callback(self, callback: ResultCommitCallback) -> None:
         """Register a callback."""
@@ -101,6 +521,62 @@ class ResultsWriter:
                 callback_results.append((callback, TestError.ERR_FILE_SAVE, f'Error: "{e}"'))
         return callback_results
 
+    def start_commit_queue(
+        self,
+        spool_dir: Optional[str] = None,
+        workers: int = 1,
+        max_retries: int = 3,
+        backoff_s: float = 1.0,
+        loggr: "Optional[Loggr]" = None,
+    ) -> ResultCommitQueue:
+        """Start background commit queue for `commit_results_async()`.
+
+        Should be called after all callbacks are registered, so pending commits from the spool directory are delivered to them.
+
+        Args:
+            spool_dir  : Directory to keep pending commits in, so they survive a restart. Defaults to None (in memory only).
+            workers    : Number of worker threads. Defaults to 1.
+            max_retries: Number of retries for each callback. Defaults to 3.
+            backoff_s  : Delay before the first retry, doubled for each next retry. Defaults to 1.0.
+            loggr      : Logger. Defaults to None.
+
+        Returns:
+            Commit queue
+        """
+        if self.commit_queue:
+            self.commit_queue.stop(wait=False)
+        self.commit_queue = ResultCommitQueue(lambda: self.callbacks, spool_dir, workers, max_retries, backoff_s, loggr=loggr)
+        return self.commit_queue
+
+    def commit_results_async(self, file_name: str) -> Future:
+        """Queue the result buffer for commit to all registered save locations, without waiting.
+
+        This does *not* clear the results buffer (but it is safe to clear it right after the call).
+
+        Args:
+            file_name : File name of the results file
+
+        Returns:
+            Future that delivers the list of callbacks and their results (same as `commit_results()`).
+        """
+        if not self.commit_queue:
+            self.start_commit_queue()
+        if not self.commit_queue:
+            raise ValueError("Expected non-empty self.commit_queue.")
+        lines = self.results_buffer.copy() if isinstance(self.results_buffer, ResultLines) else list(self.results_buffer)
+        return self.commit_queue.submit(lines, file_name)
+
+    def wait_for_commits(self, timeout: Optional[float] = None) -> bool:
+        """Wait for all queued commits to be processed.
+
+        Args:
+            timeout: Maximum time to wait in seconds, None to wait forever. Defaults to None.
+
+        Returns:
+            True if all commits were processed.
+        """
+        return self.commit_queue.join(timeout) if self.commit_queue else True
+
     def clear_results(self) -> None:
         """Clear the results buffer."""
-        self.results_buffer = []
+        self.results_buffer = self._new_buffer()  # In stream mode the old spool file is closed when no longer referenced (e.g. by pending commits)
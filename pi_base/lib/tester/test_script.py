@@ -6,44 +6,55 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import csv
 from enum import Enum
 import fnmatch
+import functools
+import hashlib
 import importlib
 import inspect
+import json
 import logging
 import os
 import signal
 import sys
+import threading
 import time
 import traceback
+import uuid
 from datetime import datetime
+from pathlib import Path
 from timeit import default_timer as timer
 from types import ModuleType, SimpleNamespace
-from typing import Any, Callable, Optional, TYPE_CHECKING
+from typing import Any, Callable, NamedTuple, Optional, TYPE_CHECKING
 
 # "modpath" must be first of our modules
 # pylint: disable=wrong-import-position
 # ruff: noqa: E402
 from pi_base.modpath import app_dir
-from pi_base.lib.loggr import ColorCodes, Loggr
+from pi_base.lib.loggr import ColorCodes, LazyFormat, Loggr
 from pi_base.lib.app_utils import AtDict, Flag, run_maybe_async
 from pi_base.lib.os_utils import walklevel
 
 from .tester_common import TestError
 from .dut_api import DutControlType, DutControlInterface
-from .test_script_defines import RESULT_BLOCK_BEGIN, RESULT_BLOCK_END
+from .test_script_defines import PARALLEL_MARK, RESULT_BLOCK_BEGIN, RESULT_BLOCK_END
 from .test_commit_callbacks import ResultCommitToFileCallback, ResultCommitToGoogleDriveCallback
 from .test_result_writer import ResultsWriter
+from .test_profiler import StepProfiler
+from .test_result_sink import ResultsSink, open_results_sink
+from .test_lot_stats import LotStatsEngine
 
 # from my_coolname import generate as coolname_generate
 
 
 if TYPE_CHECKING:
-    from collections.abc import Awaitable
+    from collections.abc import Awaitable, Iterable
     from io import TextIOWrapper
     from .data_entry import DataEntryInterface
     from .tester_api import TesterControlInterface
+    from .test_limits import LimitsTable
 
 MAX_LINES_IN_SHORT_INFO = 2
 
@@ -136,6 +147,27 @@ class TestScriptCommand:
         self.description = description
         self.module: Optional[ModuleType] = None
         self.obj: Optional[type[TestScriptCommandPluginInterface]] = None
+        self.source: Optional[str] = None  # "module:class" of the plugin that implements the command
+        self.loader: Optional[Callable[[], TestScriptCommand]] = None  # Creates the implementation for a lazily loaded plugin command
+
+    def resolve(self) -> bool:
+        """Load the implementation of the lazily loaded plugin command (see `PluginManifest`).
+
+        Imports the plugin module and instantiates the plugin class, so plugin `__init__()` side effects happen here, on first use
+        of the command. If loading raises, the loader is kept and the next call tries again.
+
+        Returns:
+            True if the command method is available
+        """
+        if not self.method and self.loader:
+            command = self.loader()
+            self.method, self.module, self.obj = command.method, command.module, command.obj
+            self.loader = None
+        return self.method is not None
+
+    def _check_method(self) -> None:
+        if not self.method and not self.loader:
+            raise ValueError(f"Expected method to be defined in {self.__class__.__name__}.")
 
     @classmethod
     def is_num_tokens_ok(cls, num_tokens: int, num_expected_tokens: range | int) -> bool:
@@ -159,36 +191,92 @@ class TestScriptCommand:
             result = False
         return result
 
-    def run(self, cmd: str, tokens: list[str], input_row_num: int, loggr: Loggr) -> CommandResult:
-        if not self.method:
-            raise ValueError(f"Expected method to be defined in {self.__class__.__name__}.")
+    def expected_args(self) -> tuple[range | int, int]:
+        """Determine expected number of args for the command.
+
+        Returns:
+            Tuple of expected number (or a range) of args, and max number of args.
+        """
         args_cnt_max = len(self.args) if self.args else 0
         args_cnt_min = len([c for c in self.args if not c.endswith("?")]) if self.args else 0  # Non-optional args
         if args_cnt_min != args_cnt_max:
-            args_cnt = range(args_cnt_min, args_cnt_max + 1)
-        else:
-            args_cnt = args_cnt_max
+            return range(args_cnt_min, args_cnt_max + 1), args_cnt_max
+        return args_cnt_max, args_cnt_max
+
+    def run(self, cmd: str, tokens: list[str], input_row_num: int, loggr: Loggr) -> CommandResult:
+        self._check_method()
+        args_cnt, args_cnt_max = self.expected_args()
 
-        command_result = CommandResult(TestError.ERR_TEST_INCOMPLETE)
         if TestScriptCommand.is_num_tokens_ok(len(tokens) - 1, args_cnt):
-            start_time = timer()
             # Note that tokens[0] (the command name) is always passed in so methods can be overloaded
-            try:
-                command_result = run_maybe_async(self.method(self, tokens[0], tokens[1 : args_cnt_max + 1]))
-                if not isinstance(command_result, CommandResult):
-                    raise TypeError('Expected command "{tokens[0]}" to produce type "CommandResult", got "{type(command_result)}"')
-
-            except:  # Script failure
-                command_result.returncode = TestError.ERR_SCRIPT_FAILURE
-                command_result.test_info = traceback.format_exc()
-
-            command_result.command_name = tokens[0]
-            command_result.checks = self.checks
-            command_result.lineno = input_row_num
-            command_result.elapsed_time = timer() - start_time
-        else:
-            loggr.error(f"Number of tokens ({len(tokens) - 1}) on script line {input_row_num} for command " + f'"{tokens[0]}" does not match the expected number of tokens ({args_cnt})).')
-            command_result.returncode = TestError.ERR_INVALID_COMMAND_ARGUMENT
+            return self.run_args(tokens[0], tokens[1 : args_cnt_max + 1], input_row_num, loggr)
+
+        loggr.error(f"Number of tokens ({len(tokens) - 1}) on script line {input_row_num} for command " + f'"{tokens[0]}" does not match the expected number of tokens ({args_cnt})).')
+        command_result = CommandResult(TestError.ERR_INVALID_COMMAND_ARGUMENT)
+        return self._fixup_test_info(cmd, command_result, loggr)
+
+    def run_args(self, cmd: str, args: list[str], input_row_num: int, loggr: Loggr) -> CommandResult:
+        """Run the command with already validated args (see `TestScriptPlan`).
+
+        Args:
+            cmd          : Command name as given in the script
+            args         : Command args, already validated for count and clipped to max number of args
+            input_row_num: Line in the script this command is from
+            loggr        : Logger
+
+        Returns:
+            Command result
+        """
+        self._check_method()
+        command_result = CommandResult(TestError.ERR_TEST_INCOMPLETE)
+        start_time = timer()
+        try:
+            self.resolve()  # Lazily loaded plugin import / instantiation errors are script failures
+            command_result = run_maybe_async(self.method(self, cmd, args))
+            if not isinstance(command_result, CommandResult):
+                raise TypeError(f'Expected command "{cmd}" to produce type "CommandResult", got "{type(command_result)}"')
+
+        except:  # Script failure
+            command_result.returncode = TestError.ERR_SCRIPT_FAILURE
+            command_result.test_info = traceback.format_exc()
+
+        return self._complete_result(cmd, command_result, input_row_num, start_time, loggr)
+
+    async def run_async(self, cmd: str, tokens: list[str], input_row_num: int, loggr: Loggr) -> CommandResult:
+        """Same as `run()`, but awaits async command methods on the running loop."""
+        self._check_method()
+        args_cnt, args_cnt_max = self.expected_args()
+        if TestScriptCommand.is_num_tokens_ok(len(tokens) - 1, args_cnt):
+            return await self.run_args_async(tokens[0], tokens[1 : args_cnt_max + 1], input_row_num, loggr)
+        return self.run(cmd, tokens, input_row_num, loggr)  # Reports the invalid number of tokens
+
+    async def run_args_async(self, cmd: str, args: list[str], input_row_num: int, loggr: Loggr) -> CommandResult:
+        """Same as `run_args()`, but awaits async command methods on the running loop (sync methods are called directly)."""
+        self._check_method()
+        command_result = CommandResult(TestError.ERR_TEST_INCOMPLETE)
+        start_time = timer()
+        try:
+            self.resolve()  # Lazily loaded plugin import / instantiation errors are script failures
+            command_result = self.method(self, cmd, args)
+            if inspect.isawaitable(command_result):
+                command_result = await command_result
+            if not isinstance(command_result, CommandResult):
+                raise TypeError(f'Expected command "{cmd}" to produce type "CommandResult", got "{type(command_result)}"')
+
+        except:  # Script failure
+            command_result.returncode = TestError.ERR_SCRIPT_FAILURE
+            command_result.test_info = traceback.format_exc()
+
+        return self._complete_result(cmd, command_result, input_row_num, start_time, loggr)
+
+    def _complete_result(self, cmd: str, command_result: CommandResult, input_row_num: int, start_time: float, loggr: Loggr) -> CommandResult:
+        command_result.command_name = cmd
+        command_result.checks = self.checks
+        command_result.lineno = input_row_num
+        command_result.elapsed_time = timer() - start_time
+        return self._fixup_test_info(cmd, command_result, loggr)
+
+    def _fixup_test_info(self, cmd: str, command_result: CommandResult, loggr: Loggr) -> CommandResult:
         if not command_result.test_info and self.checks:
             loggr.warning(f'Command "{cmd}" is declared as making {self.checks} checks, but did not provide test_info for result={command_result.returncode.name}.')
             command_result.test_info = "(N/A)"  # Fixup missing test_info to be non-empty, which many functions rely upon.
@@ -253,6 +341,41 @@ class TestScriptCommandPluginInterface:
             message = f'Row {self.test.input_row_num} column {i+1} ({excel_col_name(i+1)}): Fail using arg "{param}" value "{tokens[i]}", expected float.'
             return TestError.ERR_INVALID_COMMAND_ARGUMENT, 0, message
 
+    def check_limits_per_channel(self, samples: Iterable[Any], limits: LimitsTable) -> list[CommandResult]:
+        """Helper method to check a batch of measured samples against per-channel test limits.
+
+        Args:
+            samples: One value per channel, or rows of such (e.g. sweep points), see `LimitsTable.check()`
+            limits : Limits table
+
+        Returns:
+            CommandResult for each channel, with results [channel, worst value, min, max, "PASS" | "FAIL"]
+        """
+        checked = limits.check(samples)
+        return [
+            CommandResult(TestError.ERR_OK if fails == 0 else TestError.ERR_TEST_FAIL, row[:4] + [row[-1]], checked.describe(i), command_name=self.COMMAND)
+            for i, (fails, row) in enumerate(zip(checked.fails, checked.rows(header=False)))
+        ]
+
+    def check_limits(self, samples: Iterable[Any], limits: LimitsTable) -> CommandResult:
+        """Helper method to check a batch of measured samples against per-channel test limits in one call.
+
+        Args:
+            samples: One value per channel, or rows of such (e.g. sweep points), see `LimitsTable.check()`
+            limits : Limits table
+
+        Returns:
+            CommandResult with results ["PASS" | "FAIL", number of failed channels], and per-channel rows as block data
+        """
+        checked = limits.check(samples)
+        failed = checked.failed_channels
+        if failed:
+            shown = "; ".join(checked.describe(i) for i, fails in enumerate(checked.fails) if fails)
+            msg = f"{len(failed)} of {len(checked)} channels out of limits: {shown}"
+        else:
+            msg = f"All {len(checked)} channels in limits"
+        return CommandResult(TestError.ERR_TEST_FAIL if failed else TestError.ERR_OK, ["FAIL" if failed else "PASS", len(failed)], msg, block_data=checked.rows())
+
     def define_command(self):
         raise NotImplementedError("Please implement `.define_command()` method")
 
@@ -370,11 +493,9 @@ def get_longest_common_path(path1: str, path2: str) -> tuple[str, str, str, str,
     return common_prefix, path1_remainder, path2_remainder, path1_relative, path2_relative
 
 
-def get_command_plugins(
-    directory: Optional[str], level: int = 1, file_filter: Optional[list[str]] = None, loggr: Optional[Loggr] = None
-) -> list[tuple[ModuleType, type[TestScriptCommandPluginInterface]]]:
-    plugins: list[tuple[ModuleType, type[TestScriptCommandPluginInterface]]] = []
-    SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+def get_plugin_files(directory: Optional[str], level: int = 1, file_filter: Optional[list[str]] = None) -> list[str]:
+    """List plugin module files in the directory (and subdirectories up to the level), filtered by file name patterns (without extension)."""
+    files = []
     # Same as `for root, dirs, filenames in os.walk(directory):`, but with limited depth
     for root, _dirs, filenames in walklevel(directory, level):
         for filename in filenames:
@@ -385,64 +506,225 @@ def get_command_plugins(
                 filter_res = filter_strings([file_basename], file_filter, return_matched=True)
                 if not filter_res:
                     continue
+            files.append(os.path.join(root, filename))
+    return files
 
-            module_imported: Optional[ModuleType] = None
-            module_path = os.path.join(root, filename)
-            prefix, _path1_rem, _path2_rel, _path1_from2, module_path_from_root = get_longest_common_path(SCRIPT_DIR, module_path)
-            m1 = os.path.splitext(module_path_from_root)[0]
-            is_rel = os.path.sep not in m1 or m1.startswith((os.path.curdir + os.path.sep, os.path.pardir + os.path.sep))
-            # is_outside = m1.startswith(os.path.pardir + os.path.sep)
-            m2 = m1.replace(os.path.pardir + os.path.sep, ".")
-            m3 = "." + m2 if is_rel else m2
-            module_pypath = m3.replace(os.path.sep, ".")
-            package = os.path.basename(SCRIPT_DIR)
-            if loggr:
-                loggr.debug(f'Checking file "{module_path}" for command plugins, module_pypath={module_pypath}, package={package}, __package__={__package__}')
-
-            modules: list[tuple[str | None, str]] = [
-                (None, module_pypath.lstrip(".")),  # Try absolute path, without package
-                (None, module_pypath.split(".")[-1]),  # Try bare module name, without package
-            ]
-            if __package__ and is_rel:
-                modules.insert(0, (__package__, module_pypath))
-            else:
-                modules.append((package, "." + module_pypath if not is_rel else module_pypath))
-
-            err = None
-            i = -1
-            for i, module in enumerate(modules):
-                pkg, pypath = module
-                try:
-                    module_imported = importlib.import_module(pypath, pkg)
-                except Exception as e:
-                    err = e
-                    continue
-                # Successful import
-                if loggr:
-                    loggr.debug(f'Imported module "{module_path}" using package={pkg}, path={pypath} ({i + 1} of {len(modules)})')
-                break
 
-            # module = __import__(module_name)
-            # module = importlib.import_module(module_name)
-            if module_imported:
-                for _filename, obj in inspect.getmembers(module_imported):
-                    if inspect.isclass(obj) and obj != TestScriptCommandPluginInterface and issubclass(obj, TestScriptCommandPluginInterface):
-                        plugins.append((module_imported, obj))
-            elif loggr:
-                loggr.error(f"Failed to import {module_path}: {err}")
+def import_plugin_module(module_path: str, loggr: Optional[Loggr] = None) -> tuple[Optional[ModuleType], Optional[str], Optional[str]]:
+    """Import plugin module file, trying import paths relative to this package and absolute.
+
+    Args:
+        module_path: Plugin module file path
+        loggr      : Logger. Defaults to None.
+
+    Returns:
+        Tuple of imported module (None if failed), package and import path that worked
+    """
+    SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+    prefix, _path1_rem, _path2_rel, _path1_from2, module_path_from_root = get_longest_common_path(SCRIPT_DIR, module_path)
+    m1 = os.path.splitext(module_path_from_root)[0]
+    is_rel = os.path.sep not in m1 or m1.startswith((os.path.curdir + os.path.sep, os.path.pardir + os.path.sep))
+    # is_outside = m1.startswith(os.path.pardir + os.path.sep)
+    m2 = m1.replace(os.path.pardir + os.path.sep, ".")
+    m3 = "." + m2 if is_rel else m2
+    module_pypath = m3.replace(os.path.sep, ".")
+    package = os.path.basename(SCRIPT_DIR)
+    if loggr:
+        loggr.debug(LazyFormat('Checking file "%s" for command plugins, module_pypath=%s, package=%s, __package__=%s', module_path, module_pypath, package, __package__))
+
+    modules: list[tuple[str | None, str]] = [
+        (None, module_pypath.lstrip(".")),  # Try absolute path, without package
+        (None, module_pypath.split(".")[-1]),  # Try bare module name, without package
+    ]
+    if __package__ and is_rel:
+        modules.insert(0, (__package__, module_pypath))
+    else:
+        modules.append((package, "." + module_pypath if not is_rel else module_pypath))
+
+    err = None
+    for i, module in enumerate(modules):
+        pkg, pypath = module
+        try:
+            module_imported = importlib.import_module(pypath, pkg)
+        except Exception as e:
+            err = e
+            continue
+        # Successful import
+        if loggr:
+            loggr.debug(LazyFormat('Imported module "%s" using package=%s, path=%s (%s of %s)', module_path, pkg, pypath, i + 1, len(modules)))
+        return module_imported, pkg, pypath
+
+    # module = __import__(module_name)
+    # module = importlib.import_module(module_name)
+    if loggr:
+        loggr.error(f"Failed to import {module_path}: {err}")
+    return None, None, None
+
+
+def get_module_plugins(module: ModuleType) -> list[type[TestScriptCommandPluginInterface]]:
+    return [obj for _name, obj in inspect.getmembers(module) if inspect.isclass(obj) and obj != TestScriptCommandPluginInterface and issubclass(obj, TestScriptCommandPluginInterface)]
+
+
+def get_command_plugins(
+    directory: Optional[str], level: int = 1, file_filter: Optional[list[str]] = None, loggr: Optional[Loggr] = None
+) -> list[tuple[ModuleType, type[TestScriptCommandPluginInterface]]]:
+    plugins: list[tuple[ModuleType, type[TestScriptCommandPluginInterface]]] = []
+    for module_path in get_plugin_files(directory, level, file_filter):
+        module_imported, _pkg, _pypath = import_plugin_module(module_path, loggr)
+        if module_imported:
+            plugins += [(module_imported, obj) for obj in get_module_plugins(module_imported)]
     return plugins
 
 
+class PluginManifest:
+    """Cache of discovered command plugins, so plugin modules are imported lazily, on first use of their commands.
+
+    For each plugin module file (keyed by path and validated by mtime and size) it records the import path that worked
+    and the commands its classes implement. Can be shared by several `TestScript` instances, and saved to a file to
+    speed up the next start. Note that with lazy loading, plugin classes are instantiated on first use of their command.
+    """
+
+    VERSION = 1
+
+    def __init__(self, file_path: Optional[str] = None) -> None:
+        """Constructor.
+
+        Args:
+            file_path: Manifest file to load and save, None to keep it in memory only. Defaults to None.
+        """
+        self.file_path = file_path
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.changed = False
+        self._lock = threading.Lock()
+        if file_path:
+            self.load()
+
+    def load(self) -> None:
+        if not self.file_path:
+            return
+        try:
+            with open(self.file_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == PluginManifest.VERSION:
+            self.entries = data.get("entries", {})
+
+    def save(self) -> None:
+        """Save manifest file if changed (removing entries for deleted files)."""
+        with self._lock:
+            if not self.file_path or not self.changed:
+                return
+            self.entries = {path: entry for path, entry in self.entries.items() if os.path.isfile(path)}
+            tmp_path = self.file_path + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"version": PluginManifest.VERSION, "entries": self.entries}, f, indent=1)
+                Path(tmp_path).replace(self.file_path)
+                self.changed = False
+            except OSError:
+                pass  # Manifest is optional (e.g. read-only location)
+
+    def get(self, module_path: str) -> Optional[dict[str, Any]]:
+        """Get manifest entry for the plugin module file, None if not known or the file changed."""
+        try:
+            stat = Path(module_path).stat()
+        except OSError:
+            return None
+        with self._lock:
+            entry = self.entries.get(os.path.realpath(module_path))
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry
+        return None
+
+    def put(self, module_path: str, package: Optional[str], path: str, classes: list[dict[str, Any]]) -> None:
+        """Record plugin module file.
+
+        Args:
+            module_path: Plugin module file path
+            package    : Package for the import path that worked
+            path       : Import path that worked
+            classes    : Descriptions of the plugin classes in the module, with "class" name and TestScriptCommand args
+        """
+        stat = Path(module_path).stat()
+        with self._lock:
+            self.entries[os.path.realpath(module_path)] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "package": package, "path": path, "classes": classes}
+            self.changed = True
+
+
+class TestScriptStep(NamedTuple):
+    """One compiled line of the test script."""
+
+    lineno: int
+    raw_line: str  # Raw line from the script file, passed through to the results
+    tokens: tuple[str, ...]  # Stripped tokens, with end-of-line comments clipped
+    command: Optional[TestScriptCommand]  # Bound command, None for empty, comment and unknown command lines
+    args: Optional[tuple[str, ...]]  # Validated args clipped to the max number of args, None if number of args is invalid
+    parallel: bool = False  # Command name was marked with PARALLEL_MARK
+
+
+class TestScriptPlan:
+    """Compiled test script - parsed and validated once, executed as many times as needed (e.g. once per DUT)."""
+
+    def __init__(self, file_name: str, steps: tuple[TestScriptStep, ...], digest: str, mtime_ns: Optional[int] = None, size: Optional[int] = None) -> None:
+        """Constructor.
+
+        Args:
+            file_name : Script file name
+            steps     : Compiled steps
+            digest    : Hash of the script file contents
+            mtime_ns  : Script file modification time (None if not known)
+            size      : Script file size (None if not known)
+        """
+        self.file_name = file_name
+        self.steps = steps
+        self.digest = digest
+        self.mtime_ns = mtime_ns
+        self.size = size
+
+
+class TranscriptRecord:
+    """Compact transcript entry - `CommandResult` fields used by the transcript, without results and block data."""
+
+    __slots__ = ("lineno", "command_name", "returncode", "checks", "elapsed_time", "test_info")
+
+    def __init__(self, lineno: Optional[int], command_name: Optional[str], returncode: TestError, checks: Optional[int], elapsed_time: Optional[float], test_info: str) -> None:
+        self.lineno = lineno
+        self.command_name = command_name
+        self.returncode = returncode
+        self.checks = checks
+        self.elapsed_time = elapsed_time
+        self.test_info = test_info
+
+    @classmethod
+    def from_result(cls, result: CommandResult) -> TranscriptRecord:
+        command_name = sys.intern(result.command_name) if result.command_name else result.command_name  # Same names repeat in every run
+        return cls(result.lineno, command_name, result.returncode, result.checks, result.elapsed_time, result.test_info)
+
+
 class TestTranscript:
-    def __init__(self) -> None:
-        self.all: list[CommandResult] = []
-        self.passed: list[CommandResult] = []
-        self.failed: list[CommandResult] = []
+    def __init__(self, compact: bool = False) -> None:
+        """Constructor.
+
+        Args:
+            compact: True to store compact `TranscriptRecord` entries instead of full `CommandResult` objects (for long scripts). Defaults to False.
+        """
+        self.compact = compact
+        self.all: list[CommandResult | TranscriptRecord] = []
+        self.passed: list[CommandResult | TranscriptRecord] = []
+        self.failed: list[CommandResult | TranscriptRecord] = []
+        # Counters are maintained incrementally by add()
+        self._pass_cnt = 0
+        self._fail_cnt = 0
+        self._test_cnt = 0
 
     def reset(self) -> None:
         self.all = []
         self.passed = []
         self.failed = []
+        self._pass_cnt = 0
+        self._fail_cnt = 0
+        self._test_cnt = 0
 
     def add(self, test_result: CommandResult) -> None:
         """Add command / test result to the transcipt and to the pass/fail dictionary of all tests.
@@ -450,23 +732,28 @@ class TestTranscript:
         Args:
             test_result : CommandResult of the completed command / test
         """
-        self.all.append(test_result)
+        entry = TranscriptRecord.from_result(test_result) if self.compact else test_result
+        is_check = (test_result.checks or 0) > 0
+        self.all.append(entry)
         if test_result.returncode == TestError.ERR_OK:
-            self.passed.append(test_result)
+            self.passed.append(entry)
+            self._pass_cnt += is_check
         else:
-            self.failed.append(test_result)
+            self.failed.append(entry)
+            self._fail_cnt += is_check
+        self._test_cnt += is_check
 
     @property
     def pass_cnt(self):
-        return len([c for c in self.passed if (c.checks or 0) > 0])
+        return self._pass_cnt
 
     @property
     def fail_cnt(self):
-        return len([c for c in self.failed if (c.checks or 0) > 0])
+        return self._fail_cnt
 
     @property
     def test_cnt(self):
-        return len([c for c in self.all if (c.checks or 0) > 0])
+        return self._test_cnt
 
 
 class TestScript:
@@ -486,7 +773,36 @@ class TestScript:
         plugins_dir: Optional[str] = None,
         tester_control: Optional[TesterControlInterface] = None,
         dut_control: Optional[DutControlInterface] = None,
+        use_plan_cache: bool = True,
+        plugin_registry: Optional[dict[str, list[tuple[ModuleType, type[TestScriptCommandPluginInterface]]]]] = None,
+        profiler: Optional[StepProfiler] = None,
+        plugin_manifest: Optional[PluginManifest] = None,
+        compact_transcript: bool = False,
+        results_sink: Optional[ResultsSink] = None,
+        lot_stats: Optional[LotStatsEngine] = None,
     ) -> None:
+        """Constructor.
+
+        Args:
+            results_writer : Results writer
+            loggr          : Logger
+            verbose        : True to include raw data in the output. Defaults to False.
+            debug          : True to enable debugging. Defaults to False.
+            data_entry     : Data entry. Defaults to None.
+            ignore_ble     : Not used. Defaults to False.
+            plugins_dir    : Directory to scan for command plugins. Defaults to None (this file directory).
+            tester_control : Tester control. Defaults to None.
+            dut_control    : DUT control. Defaults to None.
+            use_plan_cache : True to cache compiled scripts. Defaults to True.
+            plugin_registry: Discovered command plugin classes, keyed by the scan parameters. Pass the same dict to several
+                             instances (e.g. slots of `MultiDutRunner`) to scan and import plugins only once. Defaults to None.
+            profiler       : Step profiler to record per-step timings to, None to disable profiling. Defaults to None.
+            plugin_manifest: Plugin manifest cache, to import plugin modules lazily on first use of their commands. Defaults to None.
+                             Note that plugin classes are then instantiated on first use too, so their `__init__()` side effects move there.
+            compact_transcript: True to keep compact transcript entries (see `TranscriptRecord`) for long scripts. Defaults to False.
+            results_sink   : Structured results output to write a typed record of each step to, None to disable. Defaults to None.
+            lot_stats      : Lot statistics engine to count each run into, None to disable. Defaults to None.
+        """
         if not loggr:
             raise ValueError("Please provide loggr argument")
         if not hasattr(loggr, "color_print"):
@@ -508,12 +824,24 @@ class TestScript:
         # Dictionary of commands, extended by plugins:
         self.commands: list[TestScriptCommand] = []
 
+        self.plugin_registry = plugin_registry if plugin_registry is not None else {}
+        self.plugin_manifest = plugin_manifest
         self.plugins = AtDict()
         self.plugins.cnt_embedded = self.add_commands_from_plugins(SCRIPT_DIR, 1, file_filter=[self.__class__.__module__.rsplit(".", maxsplit=1)[-1]])
         self.plugins.cnt_extensions = self.add_commands_from_plugins(self.plugins_dir, 1, file_filter=["*plugin*"])
 
         self.commands_map = {cmd.command: cmd for cmd in self.commands}
 
+        # Compiled scripts, keyed by script file name. Plans are bound to this instance commands, so are not shared between instances.
+        self.use_plan_cache = use_plan_cache
+        self._plans: dict[str, TestScriptPlan] = {}
+
+        self.profiler = profiler
+        self._profile_file = ""  # Script file name for profiler records
+        self.results_sink = results_sink
+        self.lot_stats = lot_stats
+        self._run_id = ""  # Run identifier for results sink records
+
         # Unfortunately, we have to list all properties here, duplicating code in self.dut_restart(), as
         # pylint is dumb and throws W0201 if we don't.
         # ATTENTION: When adding new properties, also add them to self.reset()
@@ -522,11 +850,12 @@ class TestScript:
 
         self.start_time = time.time()
 
-        self.dut_transcript = TestTranscript()
-        self.tester_transcript = TestTranscript()
+        self.dut_transcript = TestTranscript(compact=compact_transcript)
+        self.tester_transcript = TestTranscript(compact=compact_transcript)
         self.measured: dict[
             str, list
         ] = {}  # Storage for all plugin commands measurements. Each measurement command is allowed to add it's name to the dict, and store any data as needed in the object under that key.
+        self.soak_telemetry: dict[str, dict[str, Any]] = {}  # Per-device results of the last soak, see `_soak()`
         self.plugin_config: dict[str, Any] = {}  # Storage for all plugin config settings. TODO: (when needed) Naming TBD.
         # Example of properties to store in self.measured
         # self.access_point_id = None
@@ -576,34 +905,90 @@ class TestScript:
         return self.dut_transcript.test_cnt
 
     def add_commands_from_plugins(self, directory: Optional[str], level: int = 1, file_filter: Optional[list[str]] = None) -> int:
-        # Discover plugins with addditional commands:
-        plugins = get_command_plugins(directory, level, file_filter, self.loggr)  # TODO: (now) Implement plugins directory (especially mechanism to transfer them to RPi)
+        if self.plugin_manifest:
+            return self._add_commands_from_manifest(directory, level, file_filter)
+        # Discover plugins with addditional commands (once per registry, command instances are per TestScript as they are bound to it):
+        registry_key = f"{directory}|{level}|{file_filter}"
+        plugins = self.plugin_registry.get(registry_key)
+        if plugins is None:
+            plugins = get_command_plugins(directory, level, file_filter, self.loggr)  # TODO: (now) Implement plugins directory (especially mechanism to transfer them to RPi)
+            self.plugin_registry[registry_key] = plugins
         count = 0
         for plugin in plugins:
             module, obj = plugin
-            try:
-                instance = obj(self)
-                command: TestScriptCommand = instance.implements()
-                command.module = module
-                command.obj = obj
-            except Exception as e:
-                self.loggr.warning(f'Error "{e}" importing plugin from {module.__name__}:{obj.__name__}, skipped.')
+            command = self._instantiate_plugin(module, obj)
+            if command:
+                self._add_command(command)
+                count += 1
+        return count
+
+    def _instantiate_plugin(self, module: ModuleType, obj: type[TestScriptCommandPluginInterface]) -> Optional[TestScriptCommand]:
+        try:
+            instance = obj(self)
+            command: TestScriptCommand = instance.implements()
+            command.module = module
+            command.obj = obj
+            command.source = f"{module.__name__}:{obj.__name__}"
+        except Exception as e:
+            self.loggr.warning(f'Error "{e}" importing plugin from {module.__name__}:{obj.__name__}, skipped.')
+            return None
+        return command
+
+    def _add_command(self, command: TestScriptCommand) -> None:
+        cmds = [cmd for cmd in self.commands if cmd.command == command.command]
+        if cmds:
+            prev_str = " The previous command is not from a plugin"
+            if cmds[-1].source:
+                prev_str = f" The previous command is defined in {cmds[-1].source}"
+            msg = f'Duplicate command "{command.command}" in {command.source}.{prev_str}'
+            self.loggr.error(msg)
+            raise ValueError(msg)
+        self.commands.append(command)
+        self.loggr.info(f'Added command "{command.command}" from {command.source}.')
+
+    def _add_commands_from_manifest(self, directory: Optional[str], level: int = 1, file_filter: Optional[list[str]] = None) -> int:
+        """Add commands from plugins listed in the manifest (lazily loaded), discovering and recording new / changed plugin files."""
+        manifest = self.plugin_manifest
+        if not manifest:
+            return 0
+        count = 0
+        for module_path in get_plugin_files(directory, level, file_filter):
+            entry = manifest.get(module_path)
+            if entry:
+                for class_info in entry["classes"]:
+                    command = TestScriptCommand(**class_info["command"])
+                    command.source = class_info["source"]
+                    command.loader = functools.partial(self._load_plugin_command, entry["package"], entry["path"], class_info["class"])
+                    self._add_command(command)
+                    count += 1
                 continue
-            cmds = [cmd for cmd in self.commands if cmd.command == command.command]
-            if cmds:
-                prev_str = " The previous command is not from a plugin"
-                if cmds[-1].module and cmds[-1].obj:
-                    prev_module = cmds[-1].module.__name__
-                    prev_obj = cmds[-1].obj.__name__
-                    prev_str = f" The previous command is defined in {prev_module}:{prev_obj}"
-                msg = f'Duplicate command "{command.command}" in {module.__name__}:{obj.__name__}.{prev_str}'
-                self.loggr.error(msg)
-                raise ValueError(msg)
-            self.commands.append(command)
-            self.loggr.info(f'Added command "{command.command}" from {module.__name__}:{obj.__name__}.')
-            count += 1
+
+            module, pkg, pypath = import_plugin_module(module_path, self.loggr)
+            if not module or not pypath:
+                continue
+            classes = []
+            for obj in get_module_plugins(module):
+                command = self._instantiate_plugin(module, obj)
+                if not command:
+                    continue
+                self._add_command(command)
+                count += 1
+                command_info = {"command": command.command, "args": command.args, "results": command.results, "checks": command.checks, "a_class": command.a_class, "description": command.description}
+                classes.append({"class": obj.__name__, "source": command.source, "command": command_info})
+            manifest.put(module_path, pkg, pypath, classes)
+        manifest.save()
         return count
 
+    def _load_plugin_command(self, package: Optional[str], path: str, class_name: str) -> TestScriptCommand:
+        """Import plugin module and instantiate the plugin class (lazy loading from `PluginManifest`)."""
+        module = importlib.import_module(path, package)
+        obj = getattr(module, class_name)
+        instance = obj(self)
+        command: TestScriptCommand = instance.implements()
+        command.module = module
+        command.obj = obj
+        return command
+
     # region - SCRIPT HELPERS
     def show_script_documentation(self) -> None:
         """Prints out the script documentation for commands."""
@@ -682,23 +1067,45 @@ class TestScript:
         if self.dut_control:
             self.dut_control.reset_info()
 
+    def _soak_device(self, name: str, control: TesterControlInterface | DutControlInterface, delay_s) -> None:
+        """Soak one device, recording its telemetry in `self.soak_telemetry`."""
+        telemetry: dict[str, Any] = {"delay_s": delay_s, "elapsed_s": None, "error": None, "aborted": False}
+        self.soak_telemetry[name] = telemetry
+        start_time = timer()
+        try:
+            control.soak(delay_s)
+        except Exception as err:
+            telemetry["error"] = err
+        telemetry["elapsed_s"] = timer() - start_time
+        telemetry["aborted"] = bool(self._stop.value)
+        self.loggr.debug(LazyFormat("Soak %s: %.3fs%s%s", name, telemetry["elapsed_s"], " (aborted)" if telemetry["aborted"] else "", f' error "{telemetry["error"]}"' if telemetry["error"] else ""))
+
     def _soak(self, delay_s):
-        # TODO: (when needed when both self.tester_control and self.dut_control are set) Implement threading and parallel soak(), or better use periodic tasks to pump data.
-        if self.tester_control:
-            if self.dut_control:
-                raise NotImplementedError("Cannot soak both tester_control and dut_control. Implement threading.")
-            self.tester_control.soak(delay_s)
-        elif self.dut_control:
-            self.dut_control.soak(delay_s)
+        """Soak tester and DUT controls (in parallel, one thread per device), or just wait if there are none.
+
+        Per-device results are in `self.soak_telemetry`. Device soak errors are raised after all devices complete.
+        """
+        self.soak_telemetry = {}
+        devices: list[tuple[str, TesterControlInterface | DutControlInterface]] = [(name, control) for name, control in (("tester", self.tester_control), ("dut", self.dut_control)) if control]
+        if len(devices) == 1:
+            self._soak_device(*devices[0], delay_s)
+        elif devices:
+            threads = [threading.Thread(target=self._soak_device, args=(name, control, delay_s), name=f"Soak-{name}", daemon=True) for name, control in devices]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()  # abort() aborts each device, which should end its soak() early
         elif delay_s is not None:
             self.loggr.info(f"Soaking for {delay_s} seconds.")
-            end_time = timer() + delay_s
-            while True:
-                if self._stop.value:  # Check abort
-                    return TestError.ERR_ABORT
-                if timer() > end_time:
-                    break
-                time.sleep(0.1)
+            start_time = timer()
+            aborted = self._stop.wait(delay_s)  # Wakes up on abort
+            self.soak_telemetry["none"] = {"delay_s": delay_s, "elapsed_s": timer() - start_time, "error": None, "aborted": aborted}
+
+        for telemetry in self.soak_telemetry.values():
+            if telemetry["error"]:
+                raise telemetry["error"]
+        if self._stop.value:  # Check abort
+            return TestError.ERR_ABORT
         return TestError.ERR_OK
 
     def get_tester_versions(self):
@@ -849,6 +1256,139 @@ class TestScript:
 
     # endregion
 
+    def _compile_step(self, lineno: int, raw_line: str, tokens: list[str]) -> TestScriptStep:
+        """Bind the command and validate its args for one script line.
+
+        Args:
+            lineno   : Line number in the script file
+            raw_line : Raw line from the script file
+            tokens   : List of parsed line tokens
+
+        Returns:
+            Compiled step
+        """
+        cmd = None
+        args = None
+        parallel = False
+        if len(tokens) and tokens[0].startswith(PARALLEL_MARK):
+            parallel = True
+            tokens = [tokens[0][len(PARALLEL_MARK) :].strip(), *tokens[1:]]
+        if len(tokens) and not tokens[0].startswith("#"):
+            cmd = self.commands_map.get(tokens[0])
+            if cmd:
+                args_cnt, args_cnt_max = cmd.expected_args()
+                if TestScriptCommand.is_num_tokens_ok(len(tokens) - 1, args_cnt):
+                    args = tuple(tokens[1 : args_cnt_max + 1])
+        return TestScriptStep(lineno, raw_line, tuple(tokens), cmd, args, parallel)
+
+    def compile_lines(self, raw_lines: list[str], file_name: str = "") -> tuple[TestScriptStep, ...]:
+        """Parse the raw script lines into a list of steps.
+
+        Result lines ('##') and result blocks are removed, all other lines are kept for passing through to the results.
+
+        Args:
+            raw_lines : Raw lines of the script file
+            file_name : Script file name (for profiler records). Defaults to "".
+
+        Returns:
+            Compiled steps
+        """
+        csvreader = csv.reader(raw_lines, dialect="excel", delimiter=",", quotechar='"', skipinitialspace=True)
+
+        steps: list[TestScriptStep] = []
+        skipping_block = False
+        row_start = timer()
+        for line_number, row in enumerate(csvreader, 1):
+            # Tokenize (strip and clip all after end-of line comments))
+            tokens = []
+            for i, c_in in enumerate(row):
+                c = c_in.strip()  # Strip comments in cells except first:
+                if i > 0 and len(c) > 0 and c[0] == "#":
+                    # Remove all cells past the comment '#'
+                    break
+                tokens.append(c)
+
+            if skipping_block:
+                # If we are in the middle of a previous Result block response,
+                # Result blocks: keep skipping until the end of the response is reached
+                if tokens and RESULT_BLOCK_END in tokens[0]:
+                    # Result block end - skip
+                    skipping_block = False
+                continue
+
+            if len(tokens) == 0 or not tokens[0]:
+                # Empty line: Keep it for output, it will not be executed.
+                tokens = []
+            elif RESULT_BLOCK_BEGIN in tokens[0]:
+                # Result blocks: Skip and don't pass to output self.results_write
+                skipping_block = True
+                continue
+            elif tokens[0].startswith("##"):
+                # Result line: Skip and don't pass to output self.results_write
+                continue
+
+            step = self._compile_step(line_number, raw_lines[line_number - 1], tokens)
+            steps.append(step)
+            if self.profiler:
+                self.profiler.add(file_name, line_number, step.tokens[0] if step.tokens else "", "tokenize", timer() - row_start)
+                row_start = timer()
+        return tuple(steps)
+
+    def _get_plan_for_lines(self, in_file_name: str, raw_lines: list[str], mtime_ns: Optional[int] = None, size: Optional[int] = None) -> TestScriptPlan:
+        digest = hashlib.sha256("".join(raw_lines).encode("utf-8")).hexdigest()
+        plan = self._plans.get(in_file_name)
+        if plan and plan.digest == digest:
+            plan.mtime_ns, plan.size = mtime_ns, size
+        else:
+            plan = TestScriptPlan(in_file_name, self.compile_lines(raw_lines, in_file_name), digest, mtime_ns, size)
+            self.loggr.debug(LazyFormat('Compiled %s lines from "%s" file.', len(plan.steps), in_file_name))
+        if self.use_plan_cache:
+            self._plans[in_file_name] = plan
+        return plan
+
+    def get_plan(self, in_file_name: str) -> TestScriptPlan:
+        """Get compiled plan for the script file, re-using the cached plan if the file has not changed.
+
+        Args:
+            in_file_name : Script file name
+
+        Returns:
+            Compiled plan
+        """
+        stat = Path(in_file_name).stat()
+        plan = self._plans.get(in_file_name)
+        if plan and plan.mtime_ns == stat.st_mtime_ns and plan.size == stat.st_size:
+            return plan
+
+        self.loggr.info(f'Reading commands from "{in_file_name}" file.')
+        with open(in_file_name, newline="", encoding="utf-8") as in_file_fd:
+            raw_lines = in_file_fd.readlines()
+        return self._get_plan_for_lines(in_file_name, raw_lines, stat.st_mtime_ns, stat.st_size)
+
+    def bind_plan(self, plan: TestScriptPlan) -> TestScriptPlan:
+        """Get the plan bound to this instance commands, e.g. for a plan compiled by another slot of `MultiDutRunner`.
+
+        Args:
+            plan : Compiled plan
+
+        Returns:
+            Compiled plan with steps bound to this instance commands
+        """
+        if all(step.command is None or self.commands_map.get(step.command.command) is step.command for step in plan.steps):
+            return plan
+        bound = self._plans.get(plan.file_name)
+        if bound and bound.digest == plan.digest:
+            return bound
+        steps = tuple(step._replace(command=self.commands_map.get(step.command.command)) if step.command else step for step in plan.steps)
+        bound = TestScriptPlan(plan.file_name, steps, plan.digest, plan.mtime_ns, plan.size)
+        if self.use_plan_cache:
+            self._plans[plan.file_name] = bound
+        return bound
+
+    def clear_plans(self) -> None:
+        """Drop all cached compiled plans."""
+        self._plans = {}
+
     def _run_one_line(self, tokens: list[str]) -> tuple[TestError, list[str], str]:
         """Parse the CSV line and takes the appropriate action.
 
@@ -858,25 +1398,85 @@ class TestScript:
         Returns:
             Tuple of error code, list of results, test info
         """
-        returncode = TestError.ERR_OK
-        results = []  # results = ['some result 1', 'some result 2']
-        test_info = ""
+        return self._run_step(self._compile_step(self.input_row_num, "", tokens))
+
+    def _run_step(self, step: TestScriptStep) -> tuple[TestError, list[str], str]:
+        """Take the appropriate action for the compiled script line.
 
+        Args:
+            step : Compiled script line
+
+        Returns:
+            Tuple of error code, list of results, test info
+        """
         if self._stop.value:  # Check abort
             return TestError.ERR_ABORT, [], ""
+        return self._complete_step(step, self._exec_step(step))
 
-        if len(tokens) and not tokens[0].startswith("#"):
-            cmd = self.commands_map.get(tokens[0])
-            if cmd:
-                # Use Optional args 'somearg?'
-                command_result = cmd.run(tokens[0], tokens, self.input_row_num, self.loggr)
+    def _exec_step(self, step: TestScriptStep) -> Optional[CommandResult]:
+        """Run the command of the compiled script line, None if the line has no command."""
+        cmd = step.command
+        if not cmd:
+            return None
+        start_time = timer()
+        # Use Optional args 'somearg?'
+        if step.args is not None:
+            command_result = cmd.run_args(step.tokens[0], list(step.args), step.lineno, self.loggr)
+        else:
+            command_result = cmd.run(step.tokens[0], list(step.tokens), step.lineno, self.loggr)
+        if self.profiler:
+            self._profile_exec(step, command_result, start_time)
+        return command_result
 
+    async def _exec_step_async(self, step: TestScriptStep) -> Optional[CommandResult]:
+        """Same as `_exec_step()`, but awaits async command methods on the running loop."""
+        cmd = step.command
+        if not cmd:
+            return None
+        start_time = timer()
+        if step.args is not None:
+            command_result = await cmd.run_args_async(step.tokens[0], list(step.args), step.lineno, self.loggr)
+        else:
+            command_result = await cmd.run_async(step.tokens[0], list(step.tokens), step.lineno, self.loggr)
+        if self.profiler:
+            self._profile_exec(step, command_result, start_time)
+        return command_result
+
+    def _profile_exec(self, step: TestScriptStep, command_result: CommandResult, start_time: float) -> None:
+        """Record dispatch and execute timings of the step (execute is measured by the command wrapper as `elapsed_time`)."""
+        if not self.profiler:
+            return
+        total = timer() - start_time
+        execute = command_result.elapsed_time or 0.0
+        self.profiler.add(self._profile_file, step.lineno, step.tokens[0], "dispatch", max(total - execute, 0.0))
+        self.profiler.add(self._profile_file, step.lineno, step.tokens[0], "execute", execute)
+
+    def _complete_step(self, step: TestScriptStep, command_result: Optional[CommandResult]) -> tuple[TestError, list[str], str]:
+        """Record the command result of the compiled script line in the transcript and results.
+
+        Args:
+            step           : Compiled script line
+            command_result : Result of the line command, None if the line has no command
+
+        Returns:
+            Tuple of error code, list of results, test info
+        """
+        returncode = TestError.ERR_OK
+        results = []  # results = ['some result 1', 'some result 2']
+        test_info = ""
+        tokens = step.tokens
+
+        if len(tokens) and not tokens[0].startswith("#"):
+            cmd = step.command
+            if cmd and command_result:
                 returncode, results, test_info, block_data = command_result.full()
                 # Should not count commands that don't check (i.e. "test") something. Some commands are not test cases.
                 # TODO: (soon) Decide if makes sense to exclude non-checks: if cmd.checks: #?? or returncode != TestError.ERR_OK:
                 # Failing non-checks should abort??
+                start_time = timer()
                 self.dut_transcript.add(command_result)
                 self._log_test_result(cmd, command_result)
+                log_time = timer()
 
                 if block_data is not None:
                     # ? cleaned_output = [[str(result).strip() for result in line] for line in block_data]
@@ -884,9 +1484,33 @@ class TestScript:
                     # For commands with block results, do not write results out.
                 elif cmd.results:
                     self.results_writer.add_result(result_header=", ".join(cmd.results), result_line=", ".join([str(c) for c in results]), returncode=returncode)
+                if self.results_sink or self.lot_stats:
+                    record = ResultsSink.make_record(
+                        self._run_id,
+                        self.lot_num,
+                        self.dut_id,
+                        self._profile_file,
+                        step.lineno,
+                        tokens[0],
+                        cmd.args or [],
+                        list(step.args if step.args is not None else tokens[1:]),
+                        cmd.results or [],
+                        results if block_data is None else [],
+                        returncode,
+                        command_result.checks,
+                        command_result.elapsed_time,
+                        len(block_data) if isinstance(block_data, list) else 0,
+                    )
+                    if self.results_sink:
+                        self.results_sink.add(record)
+                    if self.lot_stats:
+                        self.lot_stats.add_step(record)
+                if self.profiler:
+                    self.profiler.add(self._profile_file, step.lineno, tokens[0], "log", log_time - start_time)
+                    self.profiler.add(self._profile_file, step.lineno, tokens[0], "write", timer() - log_time)
 
             else:
-                self.loggr.error(f'Row {self.input_row_num}: Unknown command "{tokens[0]}", stopping.')
+                self.loggr.error(f'Row {step.lineno}: Unknown command "{tokens[0]}", stopping.')
                 returncode = TestError.ERR_INVALID_COMMAND
                 results = ["UNKNOWN COMMAND"]
 
@@ -926,107 +1550,184 @@ class TestScript:
         return self.run_result_code
 
     def exec_csv_fd(self, lot_num: str, in_file_fd: TextIOWrapper, in_file_name: str) -> tuple[TestError, None | str, None | str]:
+        # Read raw lines for passing through to results file
+        self.loggr.info(f'Reading commands from "{in_file_name}" file.')
+        in_file_fd.seek(0)
+        raw_lines = in_file_fd.readlines()
+        plan = self._get_plan_for_lines(in_file_name, raw_lines)
+        return self.exec_plan(lot_num, plan)
+
+    def _exec_plan_start(self, lot_num: str, plan: TestScriptPlan) -> Optional[TestError]:
+        """Start running the plan on DUT, returns run result if failed to start, None otherwise."""
         # Acquire control over DUT
         self.loggr.info("Connecting to device...")
         self.run_result = RunResult.NONE
         self.last_returncode: Optional[TestError] = None
         returncode, dut_id = self.dut_start()
         if returncode != TestError.ERR_OK:
-            res = self.determine_run_result(returncode)
-            return res, None, None
+            return self.determine_run_result(returncode)
 
         # self.loggr.info(f'\nTesting {dut_info}')
         self.lot_num = lot_num
-        self.loggr.info(f'Reading commands from "{in_file_name}" file.')
-
-        # Read raw lines for passing through to results file
-        in_file_fd.seek(0)
-        raw_lines = in_file_fd.readlines()
-        csvreader = csv.reader(raw_lines, dialect="excel", delimiter=",", quotechar='"', skipinitialspace=True)
+        self._profile_file = plan.file_name
+        self._run_id = uuid.uuid4().hex
+        self.loggr.info(f'Running commands from "{plan.file_name}" file.')
+        return None
 
-        returncode = TestError.ERR_OK
-        skipping_block = False
-        for line_number, row in enumerate(csvreader, 1):
-            # Tokenize (strip and clip all after end-of line comments))
-            tokens = []
-            for i, c_in in enumerate(row):
-                c = c_in.strip()  # Strip comments in cells except first:
-                if i > 0 and len(c) > 0 and c[0] == "#":
-                    # Remove all cells past the comment '#'
-                    break
-                tokens.append(c)
+    def _exec_plan_end(self, returncode: TestError) -> tuple[TestError, None | str, None | str]:
+        tester_info = self.get_tester_info()
+        dut_info = self.get_dut_info()
+        self.dut_end()
+        self.loggr.flush()  # Test boundary - let async log output catch up
+        if self.results_sink:
+            try:
+                self.results_sink.flush()
+            except OSError as err:
+                self.loggr.error(f'Error "{err}" writing structured results file "{self.results_sink.file_path}", records kept for the next run')
+        if self.profiler:
+            self.profiler.add_run(time.time() - self.start_time)
 
-            if skipping_block:
-                # If we are in the middle of a previous Result block response,
-                # Result blocks: keep skipping until the end of the response is reached
-                if RESULT_BLOCK_END in tokens[0]:
-                    # Result block end - skip
-                    skipping_block = False
-                continue
+        res = self.determine_run_result(returncode)
+        if self.lot_stats:
+            try:
+                self.lot_stats.end_run(self._run_id, self.lot_num, str(self.run_result))
+            except OSError as err:
+                self.loggr.error(f'Error "{err}" saving lot statistics file "{self.lot_stats.file_path}"')
+        # if self.test_cnt > 0:
+        #     if self.fail_cnt == 0:
+        #         self.loggr.print(f'PASS {self.test_cnt} tests.')
+        #     else:
+        #         self.loggr.print(f'FAIL {self.fail_cnt} of {self.test_cnt} tests.')
+        return res, tester_info, dut_info
 
-            if len(tokens) == 0 or not tokens[0]:
-                # Empty line: Prevent tripping in the following checks. Will re-check below.
-                pass
-            elif RESULT_BLOCK_BEGIN in tokens[0]:
-                # Result blocks: Skip and don't pass to output self.results_write
-                skipping_block = True
-                continue
-            elif tokens[0].startswith("##"):
-                # Result line: Skip and don't pass to output self.results_write
-                continue
+    def exec_plan(self, lot_num: str, plan: TestScriptPlan) -> tuple[TestError, None | str, None | str]:
+        res = self._exec_plan_start(lot_num, plan)
+        if res is not None:
+            return res, None, None
 
+        returncode = TestError.ERR_OK
+        for step in plan.steps:
             # Output the raw line to preserve spacing (cleaner diff between output and input files)
-            self.input_row_num = line_number
-            self.results_writer.add_script_line(raw_lines[line_number - 1])
+            self.input_row_num = step.lineno
+            self.results_writer.add_script_line(step.raw_line)
 
-            if len(tokens) == 0 or not tokens[0]:
+            if len(step.tokens) == 0:
                 # Empty line: Skip
                 continue
 
             # We don't skip Comment lines here as they take time to write out, so we let self.run() process them to detect Abort in self._stop.value:
-            returncode, results, test_info = self._run_one_line(tokens)
+            returncode, results, test_info = self._run_step(step)
 
             if returncode not in TestScript.VALID_RETURN_CODES:
                 # Any error besides pass/fail is considered abnormal, terminates the test sequence, and returned to caller
-                self.fail_line = line_number
-                self.fail_cmd = tokens[0]
+                self.fail_line = step.lineno
+                self.fail_cmd = step.tokens[0]
                 self.results_writer.add_script_line(test_info)  # Write the stack trace to the output result
                 break
 
-        tester_info = self.get_tester_info()
-        dut_info = self.get_dut_info()
-        self.dut_end()
+        return self._exec_plan_end(returncode)
 
-        res = self.determine_run_result(returncode)
-        # if self.test_cnt > 0:
-        #     if self.fail_cnt == 0:
-        #         self.loggr.print(f'PASS {self.test_cnt} tests.')
-        #     else:
-        #         self.loggr.print(f'FAIL {self.fail_cnt} of {self.test_cnt} tests.')
-        return res, tester_info, dut_info
+    @staticmethod
+    def _step_group(steps: tuple[TestScriptStep, ...], i: int) -> tuple[TestScriptStep, ...]:
+        """Get the group of adjacent parallel-marked steps starting at index i (or just the step if it is not marked)."""
+        end = i + 1
+        if steps[i].parallel and steps[i].command:
+            while end < len(steps) and steps[end].parallel and steps[end].command:
+                end += 1
+        return steps[i:end]
+
+    async def exec_plan_async(self, lot_num: str, plan: TestScriptPlan) -> tuple[TestError, None | str, None | str]:
+        """Same as `exec_plan()`, but runs on the running event loop, awaiting async command methods directly.
+
+        Adjacent steps marked with PARALLEL_MARK (e.g. `&read_meter, 1`) run concurrently, and their results are recorded in script order.
+        All steps of a parallel group run even if one of them fails, and the group lines are written to the results after the group completes.
+        Sync command methods block the loop, so only async ones overlap.
+        """
+        res = self._exec_plan_start(lot_num, plan)
+        if res is not None:
+            return res, None, None
+
+        returncode = TestError.ERR_OK
+        steps = plan.steps
+        i = 0
+        while i < len(steps):
+            group = self._step_group(steps, i)
+            i += len(group)
+            aborted = self._stop.value  # Check abort
+            command_results: list[Optional[CommandResult]] = [None] * len(group)
+            if len(group) > 1 and not aborted:
+                command_results = list(await asyncio.gather(*[self._exec_step_async(step) for step in group]))
+
+            failed = False
+            for step, group_result in zip(group, command_results):
+                self.input_row_num = step.lineno
+                self.results_writer.add_script_line(step.raw_line)
+                if len(step.tokens) == 0:
+                    # Empty line: Skip
+                    continue
+
+                if aborted:
+                    returncode, results, test_info = TestError.ERR_ABORT, [], ""
+                else:
+                    # Single step runs after its line is written, same as in `exec_plan()`, as commands can write to the results
+                    command_result = await self._exec_step_async(step) if len(group) == 1 else group_result
+                    returncode, results, test_info = self._complete_step(step, command_result)
+                if returncode not in TestScript.VALID_RETURN_CODES:
+                    # Any error besides pass/fail is considered abnormal, terminates the test sequence, and returned to caller
+                    self.fail_line = step.lineno
+                    self.fail_cmd = step.tokens[0]
+                    self.results_writer.add_script_line(test_info)  # Write the stack trace to the output result
+                    failed = True
+                    break
+            if failed:
+                break
+
+        return self._exec_plan_end(returncode)
 
     def exec_csv(self, lot_num: str, in_file_name: str) -> tuple[TestError, None | str, None | str]:
         returncode = TestError.ERR_OK
         tester_info = None
         dut_info = None
         try:
-            with open(in_file_name, newline="", encoding="utf-8") as in_file_fd:
-                try:
-                    returncode, tester_info, dut_info = self.exec_csv_fd(lot_num, in_file_fd, in_file_name)
-                # except OSError as err: # TODO: (soon) Implement detecting serial port disconnect or other similar IO failures. Will need to remove "catch"es in many places.
-                #     self.loggr.error(f'Error {err}. Looks like tester was disconnected.')
-                #     return TestError.ERR_PORT_CLOSED
-                # except SerialCantControlDevice as err:
-                #     self.loggr.error(f'Error "{err}" when executing test script file "{in_file_name}"')
-                #     return TestError.ERR_DUT_DISCONNECTED, dut_info
-                except Exception as err:
-                    self.loggr.error(f'Error "{err}" when executing test script file "{in_file_name}"')
-                    return TestError.ERR_FAIL, tester_info, dut_info
+            plan = self.get_plan(in_file_name)
         except OSError as err:
             self.loggr.error(f'Error "{err}" when opening file "{in_file_name}"')
             return TestError.ERR_FILE_OPEN, tester_info, dut_info
+        except Exception as err:
+            self.loggr.error(f'Error "{err}" when reading test script file "{in_file_name}"')
+            return TestError.ERR_FAIL, tester_info, dut_info
+        try:
+            returncode, tester_info, dut_info = self.exec_plan(lot_num, plan)
+        # except OSError as err: # TODO: (soon) Implement detecting serial port disconnect or other similar IO failures. Will need to remove "catch"es in many places.
+        #     self.loggr.error(f'Error {err}. Looks like tester was disconnected.')
+        #     return TestError.ERR_PORT_CLOSED
+        # except SerialCantControlDevice as err:
+        #     self.loggr.error(f'Error "{err}" when executing test script file "{in_file_name}"')
+        #     return TestError.ERR_DUT_DISCONNECTED, dut_info
+        except Exception as err:
+            self.loggr.error(f'Error "{err}" when executing test script file "{in_file_name}"')
+            return TestError.ERR_FAIL, tester_info, dut_info
         return returncode, tester_info, dut_info
 
+    async def exec_csv_async(self, lot_num: str, in_file_name: str) -> tuple[TestError, None | str, None | str]:
+        """Same as `exec_csv()`, but runs the whole script on the running event loop (see `exec_plan_async()`).
+
+        From sync code use `run_async(test.exec_csv_async(...))`, which keeps one persistent loop per thread for all DUTs.
+        """
+        try:
+            plan = self.get_plan(in_file_name)
+        except OSError as err:
+            self.loggr.error(f'Error "{err}" when opening file "{in_file_name}"')
+            return TestError.ERR_FILE_OPEN, None, None
+        except Exception as err:
+            self.loggr.error(f'Error "{err}" when reading test script file "{in_file_name}"')
+            return TestError.ERR_FAIL, None, None
+        try:
+            return await self.exec_plan_async(lot_num, plan)
+        except Exception as err:
+            self.loggr.error(f'Error "{err}" when executing test script file "{in_file_name}"')
+            return TestError.ERR_FAIL, None, None
+
     def describe_error(self, returncode: TestError) -> str:
         if returncode == TestError.ERR_OK:
             return "PASS"
@@ -1227,6 +1928,10 @@ def cli(args) -> int:
             loggr.error(f'File "{args.gd_secrets}" not found.')
             raise FileNotFoundError(f'File "{args.gd_secrets}" not found.')
 
+    profiler = StepProfiler() if args.profile else None
+    results_sink = open_results_sink(args.records, loggr) if args.records else None
+    lot_stats = LotStatsEngine(args.lot_stats) if args.lot_stats else None
+
     test = TestScript(
         results_writer=results_writer,
         loggr=loggr,
@@ -1236,6 +1941,9 @@ def cli(args) -> int:
         plugins_dir=args.plugins_dir,
         tester_control=tester_control,
         dut_control=dut_control,
+        profiler=profiler,
+        results_sink=results_sink,
+        lot_stats=lot_stats,
     )
 
     # Set up signals to handle Ctrl-C signal.SIGINT
@@ -1257,6 +1965,7 @@ def cli(args) -> int:
     #     loggr.error(f'Failed opening log file {log_filename}.')
     if returncode != TestError.ERR_OK:
         loggr.error("Exiting.")
+        loggr.close()
         return -returncode.id if returncode.id > 0 else returncode.id
 
     if args.csv:
@@ -1266,6 +1975,12 @@ def cli(args) -> int:
 
     test.post()
     test.print_summary(output_mode="all")
+    if profiler:
+        profile_files = profiler.export(args.profile)
+        loggr.info(f'Wrote profile reports {", ".join(profile_files)}.')
+    if results_sink:
+        results_sink.close()
+        loggr.info(f'Wrote {results_sink.written} structured results records to "{results_sink.file_path}".')
 
     # test.print_summary(loggr)
 
@@ -1277,6 +1992,7 @@ def cli(args) -> int:
     else:
         loggr.print(f"Terminated due to unexpected error, {test.describe_error(returncode)}. Elapsed time {time_str}.")
 
+    loggr.close()
     return 0 if test_success else (test.fail_cnt or 1)
 
 
@@ -1305,6 +2021,9 @@ def _parse_args() -> argparse.Namespace:
 
     parser.add_argument("-c", "--csv", help="CSV file with steps to do", dest="csv")
     parser.add_argument("-o", "--output", help="CSV output file to write results to", dest="out_file")
+    parser.add_argument("-R", "--records", help="Structured per-step results file to write to (.jsonl, or .parquet if pyarrow is installed)", dest="records")
+    parser.add_argument("-S", "--stats", help="Lot statistics store file to count the run into (query with `python -m pi_base.lib.tester.test_lot_stats`)", dest="lot_stats")
+    parser.add_argument("-P", "--profile", help="Profile script steps and write reports to files with this path prefix", dest="profile")
     return parser.parse_args()
 
 
@@ -1,3 +1,4 @@
 RESULT_BLOCK_BEGIN = "[DEV RSP BEGIN]"
 RESULT_BLOCK_END = "[DEV RSP END]"
+PARALLEL_MARK = "&"  # Command name prefix marking steps that `TestScript.exec_csv_async()` can run concurrently with adjacent marked steps
 TEST_SCRIPT_PLUGINS = "plugins"
@@ -3,11 +3,16 @@ from __future__ import annotations
 
 from collections.abc import Iterable
 from enum import IntEnum, unique
+import importlib
 import os
+import re
+import sys
 
 # from subprocess import check_output
 from subprocess import run
-from typing import Optional
+import threading
+from types import ModuleType
+from typing import Any, Optional
 
 
 ## Experimental: hacks to use relative import not in module (e.g. CLI)
@@ -29,6 +34,22 @@ __package__ = ".".join([os.path.basename(os.path.dirname(SCRIPT_DIR)), os.path.b
 from ..lib.os_utils import which
 
 tput_term = "linux"  # Global default term for tput()
+tput_use_terminfo = True  # Global switch: True to use in-process terminfo (curses), False to always run `tput` command
+
+# Memo cache of tput() results: { (term, code, args): result }
+_tput_cache: dict[tuple[str, str, tuple[str, ...]], str] = {}
+_tput_lock = threading.Lock()
+_tput_cmd: Optional[str] = None
+_terminfo: Any = None  # curses module, False if not available
+_terminfo_term: Optional[str] = None  # TERM that curses.setupterm() was called with (Python curses allows only one per process)
+# tput commands that are not plain terminfo capabilities, run them with `tput` command ("clear" adds E3 extension).
+TPUT_COMMANDS = ["init", "reset", "longname", "clear"]
+# Terminal size capabilities change when the window is resized (SIGWINCH), read them in-process on every call (not cached), see `_tput_size()`.
+TPUT_SIZE_CODES = ["cols", "lines"]
+# curses.tigetnum() result for a capability that is not numeric
+_TIGETNUM_NOT_NUMERIC = -2
+# Padding / delay specs in terminfo strings, e.g. "$<200/>" (`tput` applies them, we drop them)
+_PADDING_RE = re.compile(rb"\$<[0-9.]+[*/]*>")
 
 
 @unique
@@ -62,13 +83,119 @@ def tput_color(args: Iterable[str] = ()) -> tuple[str, ...]:
 #  TNORM="${TNORM%$}" ;# Trim '$' at the end
 # https://www.gnu.org/software/termutils/manual/termutils-2.0/html_chapter/tput_1.html
 def tput(code: str, args: Iterable[str] = (), term: Optional[str] = None) -> str:
-    # if os.name == "nt":
-    #     return ""
+    """Get terminal capability string (same as output of `tput` command, with newlines removed).
+
+    Results are cached per (term, code, args), and resolved in-process from the terminfo database (curses) when available,
+    falling back to running `tput` command. Python curses can load only one terminal type per process - the first term
+    used here is resolved in-process, other terms (rarely used) fall back to `tput` command.
+    Terminal size ("cols", "lines") is not cached, it is read in-process on each call (see `_tput_size()`).
+
+    Args:
+        code: Capability name (e.g. "cup", "setaf", "cols") or `tput` command
+        args: Capability parameters. Defaults to ().
+        term: Terminal type. Defaults to None (use global `tput_term`).
+
+    Returns:
+        Capability string, or "" if not available.
+    """
     if term is None:
         term = tput_term
     if code in ["setaf", "setab"]:
         args = tput_color(args)
-    tput_cmd = which("tput")
+    args = tuple(map(str, args))
+    if code in TPUT_SIZE_CODES:
+        return _tput_size(code, term)
+    key = (term, code, args)
+    result = _tput_cache.get(key)
+    if result is None:
+        result = _tput_terminfo(code, args, term) if tput_use_terminfo and code not in TPUT_COMMANDS else None
+        if result is None:
+            result = _tput_run(code, args, term)
+        _tput_cache[key] = result
+    return result
+
+
+def tput_cache_clear() -> None:
+    _tput_cache.clear()
+
+
+def _get_terminfo() -> Optional[ModuleType]:
+    global _terminfo  # noqa: PLW0603  # pylint: disable=global-statement
+    if _terminfo is None:
+        try:
+            _terminfo = importlib.import_module("curses")
+        except ImportError:
+            _terminfo = False
+    return _terminfo or None
+
+
+def _tput_terminfo(code: str, args: tuple[str, ...], term: str) -> Optional[str]:
+    """Resolve capability from terminfo database in-process. Returns None if it cannot be resolved this way."""
+    global _terminfo, _terminfo_term  # noqa: PLW0603  # pylint: disable=global-statement
+    curses = _get_terminfo()
+    if not curses:
+        return None
+    try:
+        int_args = [int(a) for a in args]
+    except ValueError:
+        return None
+    with _tput_lock:
+        try:
+            if _terminfo_term is None:
+                # Not a tty, same as output captured from `tput` command
+                fd = os.open(os.devnull, os.O_WRONLY)
+                try:
+                    curses.setupterm(term, fd)
+                finally:
+                    os.close(fd)
+                _terminfo_term = term
+            if _terminfo_term != term:
+                return None
+            cap = curses.tigetstr(code)
+            if cap is not None:
+                if int_args:
+                    cap = curses.tparm(cap, *int_args)
+                return _PADDING_RE.sub(b"", cap).decode("latin-1").replace("\n", "").replace("\r", "")
+            num = curses.tigetnum(code)
+            if num != _TIGETNUM_NOT_NUMERIC:
+                return str(num)  # Numeric capability (-1 if absent, same as `tput`)
+            return ""  # Boolean, absent or unknown capability (`tput` prints nothing for these)
+        except curses.error:
+            _terminfo = False  # Unknown term or no terminfo database, don't try again
+            return None
+
+
+def _terminal_size() -> Optional[os.terminal_size]:
+    """Size of the terminal on stdout / stderr / stdin, None if none of them is a terminal."""
+    for stream in (sys.__stdout__, sys.__stderr__, sys.__stdin__):
+        try:
+            return os.get_terminal_size(stream.fileno())  # pyright: ignore[reportOptionalMemberAccess]
+        except (AttributeError, OSError, ValueError):  # noqa: PERF203
+            continue  # Not a terminal, closed or missing
+    return None
+
+
+def _tput_size(code: str, term: str) -> str:
+    """Get terminal size ("cols" or "lines") like `tput` does, without running it.
+
+    Uses COLUMNS / LINES environment variable if set, then the size of the terminal on stdout / stderr / stdin,
+    then the terminfo default size of `term` (and `tput` command as the last resort).
+    """
+    value = os.environ.get("COLUMNS" if code == "cols" else "LINES", "")
+    if value.isdigit() and int(value) > 0:
+        return value
+    size = _terminal_size()
+    if size:
+        return str(size.columns if code == "cols" else size.lines)
+    result = _tput_terminfo(code, (), term) if tput_use_terminfo else None
+    return result if result is not None else _tput_run(code, (), term)
+
+
+def _tput_run(code: str, args: tuple[str, ...], term: str) -> str:
+    global _tput_cmd  # noqa: PLW0603  # pylint: disable=global-statement
+    if not _tput_cmd:
+        _tput_cmd = which("tput")
+    tput_cmd = _tput_cmd
     if not tput_cmd:
         raise FileNotFoundError("tput command not found")
     # cmd = f'{tput_cmd} {code} {" ".join(map(str, args))} 2>/dev/null'
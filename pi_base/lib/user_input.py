@@ -8,7 +8,8 @@ from __future__ import annotations
 import logging
 import os
 import re
-from typing import TYPE_CHECKING
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Optional
 
 if os.name == "nt":
     import msvcrt
@@ -25,6 +26,8 @@ else:
 # from .defs import Color, keys
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from pi_base.lib.loggr import Loggr
 
 logging.basicConfig(level=logging.INFO)
@@ -198,12 +201,35 @@ class keys:
 class _Screen:
     """Represents screen on ANSI terminal with stdin and stdout."""
 
+    frame: Optional[list[bytes]] = None  # Pending output in `batched()` block
+
     @staticmethod
     def wr(s) -> None:
-        """Write string to screen."""
+        """Write string to screen (or to the pending frame)."""
         if isinstance(s, str):
             s = bytes(s, "utf-8")
-        os.write(1, s)
+        if _Screen.frame is not None:
+            _Screen.frame.append(s)
+        else:
+            os.write(1, s)
+
+    @staticmethod
+    @contextmanager
+    def batched() -> Iterator[None]:
+        """Collect screen output in the block, and write it with one write at the end (also on errors).
+
+        Nested blocks are written by the outermost one.
+        """
+        if _Screen.frame is not None:
+            yield
+            return
+        _Screen.frame = []
+        try:
+            yield
+        finally:
+            frame, _Screen.frame = _Screen.frame, None
+            if frame:
+                os.write(1, b"".join(frame))
 
     @staticmethod
     def wr_fixedw(s, width) -> None:
@@ -394,23 +420,25 @@ class UserInput:
             return False
 
     def redraw(self):
-        self.cursor(onoff=False)
-        i = self.top_line
-        for c in range(self.height):
-            self.goto(self.x, self.y + c)
-            if i >= self.total_lines:
-                self.show_line("", -1)
-            else:
-                self.show_line(self.content[i], i)
-                # self.show_line(self.t if i == 0 else "", i)
-                i += 1
-        self.set_cursor()
+        with _Screen.batched():
+            self.cursor(onoff=False)
+            i = self.top_line
+            for c in range(self.height):
+                self.goto(self.x, self.y + c)
+                if i >= self.total_lines:
+                    self.show_line("", -1)
+                else:
+                    self.show_line(self.content[i], i)
+                    # self.show_line(self.t if i == 0 else "", i)
+                    i += 1
+            self.set_cursor()
 
     def update_line(self):
-        self.cursor(onoff=False)
-        self.goto(self.x, self.row + self.y)
-        self.show_line(self.content[self.cur_line], self.cur_line)
-        self.set_cursor()
+        with _Screen.batched():
+            self.cursor(onoff=False)
+            self.goto(self.x, self.row + self.y)
+            self.show_line(self.content[self.cur_line], self.cur_line)
+            self.set_cursor()
 
     def next_line(self):
         if self.row + 1 == self.height:
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+import pytest
+
+from pi_base.lib.loggr import Loggr
+from pi_base.lib.tester.test_result_writer import ResultsWriter
+from pi_base.lib.tester.test_script import TestScript
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+PLUGINS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plugins")
+
+
+@pytest.fixture()
+def loggr() -> Iterator[Loggr]:
+    loggr = Loggr(level=logging.WARNING)
+    yield loggr
+    loggr.close()
+
+
+@pytest.fixture()
+def make_test(loggr: Loggr) -> Callable[..., TestScript]:
+    """Factory of TestScript instances with the sample command plugins (see `plugins/sample_plugin.py`)."""
+
+    def _make_test(results_writer: ResultsWriter | None = None, **kwargs: object) -> TestScript:
+        return TestScript(results_writer=results_writer or ResultsWriter(), loggr=loggr, plugins_dir=PLUGINS_DIR, **kwargs)
+
+    return _make_test
+
+
+@pytest.fixture()
+def write_script(tmp_path: Path) -> Callable[..., str]:
+    """Factory of script files in the test temporary directory."""
+
+    def _write_script(text: str, name: str = "script.csv") -> str:
+        path = tmp_path / name
+        path.write_text(text, encoding="utf-8")
+        return str(path)
+
+    return _write_script
@@ -0,0 +1,52 @@
+"""Command plugins for TestScript tests."""
+
+import asyncio
+
+from pi_base.lib.app_utils import run_async
+from pi_base.lib.tester.test_script import CommandResult, TestScriptCommand, TestScriptCommandPluginInterface
+from pi_base.lib.tester.tester_common import TestError
+
+
+class TestScriptCommandCheckVal(TestScriptCommandPluginInterface):
+    """Check the value given in the script against the limits."""
+
+    def define_command(self) -> TestScriptCommand:
+        return TestScriptCommand(command="check_val", args=["target", "val", "val_min", "val_max"], results=["test_result", "val"], checks=1)
+
+    def execute(self, command: TestScriptCommand, cmd: str, tokens: list[str]) -> CommandResult:
+        val, val_min, val_max = float(tokens[1]), float(tokens[2]), float(tokens[3])
+        passed = val_min <= val <= val_max
+        msg = f"Value for target {tokens[0]} is {val}, expected in range [{val_min}:{val_max}]"
+        return CommandResult(TestError.ERR_OK if passed else TestError.ERR_TEST_FAIL, ["PASS" if passed else "FAIL", val], msg)
+
+
+class TestScriptCommandSleep(TestScriptCommandPluginInterface):
+    """Sleep asynchronously."""
+
+    def define_command(self) -> TestScriptCommand:
+        return TestScriptCommand(command="asleep", args=["sec"], results=["sec"], checks=1)
+
+    async def execute_async(self, command: TestScriptCommand, cmd: str, tokens: list[str]) -> CommandResult:
+        await asyncio.sleep(float(tokens[0]))
+        return CommandResult(TestError.ERR_OK, [tokens[0]], "slept")
+
+
+class TestScriptCommandSyncSleep(TestScriptCommandPluginInterface):
+    """Sleep by running async code from a sync command."""
+
+    def define_command(self) -> TestScriptCommand:
+        return TestScriptCommand(command="sleep", args=["sec"], results=["sec"], checks=1)
+
+    def execute(self, command: TestScriptCommand, cmd: str, tokens: list[str]) -> CommandResult:
+        run_async(asyncio.sleep(float(tokens[0])))
+        return CommandResult(TestError.ERR_OK, [tokens[0]], "slept")
+
+
+class TestScriptCommandBlock(TestScriptCommandPluginInterface):
+    """Return block data rows."""
+
+    def define_command(self) -> TestScriptCommand:
+        return TestScriptCommand(command="block", args=["rows"], results=[], checks=0)
+
+    def execute(self, command: TestScriptCommand, cmd: str, tokens: list[str]) -> CommandResult:
+        return CommandResult(TestError.ERR_OK, block_data=[[f"row {i}", i] for i in range(int(tokens[0]))])
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pi_base.lib import remoteiot
+from pi_base.lib.app_utils import GetConf, load_records
+from pi_base.lib.db_file import DbFile, DbFileSchema, cmd_add_bulk, cmd_delete_bulk, create_dynamic_model
+from pi_base.lib.loggr import LazyFormat
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+SCHEMA = {
+    "items_name": "devices",
+    "item_name": "device",
+    "col_id": "id",
+    "cols": {"id": "str", "name": "str"},
+    "cols_optional": {"site": "str", "notes": "str"},
+    "indexes": ["site"],
+    "id_template": {"id": "D{sn:03d}", "_iterator": {"key": "sn", "fr": 1, "to": 100, "step": 1}},
+}
+
+
+def make_db(db_path: Path, schema_conf: dict | None = None, **local: object) -> DbFile:
+    config = GetConf()
+    config.conf = {"Local": {"db_file": str(db_path), **local}}
+    schema = DbFileSchema(json.loads(json.dumps(schema_conf or SCHEMA)))
+    model = create_dynamic_model(schema)
+    return DbFile(config, schema, model, loggr=logging.getLogger("test_db_file"))  # pyright: ignore[reportArgumentType]
+
+
+def add(db: DbFile, item_id: str, site: str = "s1") -> int:
+    return db.db_add_item(db.model_type(id=item_id, name=f"Device {item_id}", site=site))
+
+
+def test_find_by_id_and_index(tmp_path: Path) -> None:
+    db = make_db(tmp_path / "devices.csv")
+    add(db, "D001", "s1")
+    add(db, "D002", "s2")
+    add(db, "D003", "s1")
+    assert db.find_item_by_id("D002").name == "Device D002"  # pyright: ignore[reportOptionalMemberAccess]
+    assert [i.id for i in db.find_items_by("site", "s1")] == ["D001", "D003"]
+    db.db_delete_item("D001")
+    assert db.find_item_by_id("D001") is None
+    assert [i.id for i in db.find_items_by("site", "s1")] == ["D003"]
+    assert [i.id for i in db.find_items_by("name", "Device D002")] == ["D002"]  # Not indexed
+
+
+def test_index_survives_reload(tmp_path: Path) -> None:
+    db = make_db(tmp_path / "devices.csv")
+    add(db, "D001", "s1")
+    add(db, "D002", "s2")
+    db2 = make_db(tmp_path / "devices.csv")
+    assert db2.find_item_by_id("D002") is not None
+    assert [i.id for i in db2.find_items_by("site", "s2")] == ["D002"]
+
+
+def test_unique_item_id_reuses_freed_serial(tmp_path: Path) -> None:
+    db = make_db(tmp_path / "devices.csv")
+    for _ in range(3):
+        (item_id,) = db.unique_item_id()
+        add(db, item_id)
+    assert [i.id for i in db.items] == ["D001", "D002", "D003"]
+    db.db_delete_item("D002")
+    assert db.unique_item_id() == ("D002",)
+    add(db, "D002")
+    assert db.unique_item_id() == ("D004",)
+
+
+def test_journal_mode_appends_and_replays(tmp_path: Path) -> None:
+    db_path = tmp_path / "devices.csv"
+    db = make_db(db_path, journal=True, journal_compact_every=10)
+    add(db, "D001")
+    add(db, "D002")
+    db.db_delete_item("D001")
+    journal = tmp_path / ("devices.csv" + DbFile.JOURNAL_EXT)
+    assert len(journal.read_text(encoding="utf-8").splitlines()) == 3  # add, add, del
+    assert not db_path.exists() or "D002" not in db_path.read_text(encoding="utf-8")
+
+    db2 = make_db(db_path, journal=True)
+    assert [i.id for i in db2.items] == ["D002"]
+
+
+def test_journal_mode_compacts(tmp_path: Path) -> None:
+    db_path = tmp_path / "devices.csv"
+    db = make_db(db_path, journal=True, journal_compact_every=2)
+    add(db, "D001")
+    add(db, "D002")
+    assert not (tmp_path / ("devices.csv" + DbFile.JOURNAL_EXT)).exists()
+    assert "D002" in db_path.read_text(encoding="utf-8")
+    assert [i.id for i in make_db(db_path).items] == ["D001", "D002"]
+
+
+def test_journal_skips_torn_record(tmp_path: Path) -> None:
+    db_path = tmp_path / "devices.csv"
+    db = make_db(db_path, journal=True)
+    add(db, "D001")
+    with (tmp_path / ("devices.csv" + DbFile.JOURNAL_EXT)).open("a", encoding="utf-8") as f:
+        f.write('{"op": "add", "item": {"device_')
+    assert [i.id for i in make_db(db_path, journal=True).items] == ["D001"]
+
+
+class FakeGdFile(dict):
+    def __init__(self) -> None:
+        super().__init__(title="devices")
+        self.uploads: list[str] = []
+        self.content = ""
+
+    def SetContentString(self, content: str) -> None:
+        self.content = content
+
+    def Upload(self) -> None:
+        self.uploads.append(self.content)
+
+
+def test_gd_save_back_skips_unchanged(tmp_path: Path) -> None:
+    db = make_db(tmp_path / "devices.csv")
+    gd_file = FakeGdFile()
+    db.gd_file, db.gds, db.gd_cache = gd_file, object(), None  # pyright: ignore[reportAttributeAccessIssue]
+    add(db, "D001")
+    assert db.db_file_save_back() == 0
+    assert len(gd_file.uploads) == 1
+    add(db, "D002")
+    assert len(gd_file.uploads) == 2
+    assert "D002" in gd_file.uploads[-1]
+
+
+def test_gd_save_back_skip_is_logged_lazily(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    db = make_db(tmp_path / "devices.csv")
+    db.gd_file, db.gds, db.gd_cache = FakeGdFile(), object(), None  # pyright: ignore[reportAttributeAccessIssue]
+    add(db, "D001")
+    caplog.set_level(logging.DEBUG, logger="test_db_file")
+    db.db_file_save_back()
+    [record] = [r for r in caplog.records if "No changes" in r.getMessage()]
+    assert isinstance(record.msg, LazyFormat)
+    assert record.getMessage() == 'No changes to devices database, skipped writing to GoogleDrive "devices" file.'
+
+
+@pytest.mark.parametrize("bad_id", ["D001", "D009"])
+def test_bulk_add_and_delete_are_all_or_nothing(tmp_path: Path, bad_id: str) -> None:
+    db = make_db(tmp_path / "devices.csv")
+    add(db, "D001")
+    with pytest.raises(ValueError, match="already exist"):
+        db.db_add_items([db.model_type(id="D002", name="x"), db.model_type(id="D001", name="y")])
+    assert db.find_item_by_id("D002") is None
+    if bad_id == "D009":
+        with pytest.raises(ValueError, match="not found"):
+            db.db_delete_items(["D001", bad_id])
+        assert db.find_item_by_id("D001") is not None
+    else:
+        assert db.db_delete_items([bad_id]) == 0
+        assert db.find_item_by_id(bad_id) is None
+
+
+def test_load_records_normalizes_column_names(tmp_path: Path) -> None:
+    csv_file = tmp_path / "devices.csv"
+    csv_file.write_text("# ID, Name, Site\nD001, One, s1\nD002, Two,\n", encoding="utf-8")
+    jsonl_file = tmp_path / "devices.jsonl"
+    jsonl_file.write_text('{"ID": "D001", "Name": "One", "Site": "s1"}\n\n{"ID": "D002", "Name": "Two"}\n', encoding="utf-8")
+    expected = [{"id": "D001", "name": "One", "site": "s1"}, {"id": "D002", "name": "Two"}]
+    assert load_records(str(csv_file)) == expected
+    assert load_records(str(jsonl_file)) == expected
+
+
+def test_bulk_commands_match_col_id_by_normalized_name(tmp_path: Path) -> None:
+    # Schema column names are not normalized, records columns are
+    db = make_db(tmp_path / "devices.csv", schema_conf={**SCHEMA, "col_id": "Serial", "cols": {"Serial": "str", "name": "str"}, "indexes": []}, journal=True)
+    records_file = tmp_path / "bulk.csv"
+    records_file.write_text("# Serial, Name\nD001, One\nD002, Two\n", encoding="utf-8")
+    assert cmd_add_bulk(db, argparse.Namespace(file=str(records_file))) == 0
+    assert db.find_item_by_id("D002") is not None
+    assert cmd_delete_bulk(db, argparse.Namespace(file=str(records_file))) == 0
+    assert not db.items
+
+
+@pytest.mark.parametrize("content", [None, '{"id": "D001"\n', '["D001"]\n'])
+def test_bulk_commands_report_load_errors(tmp_path: Path, content: str | None) -> None:
+    db = make_db(tmp_path / "devices.csv")
+    records_file = tmp_path / "bulk.jsonl"
+    if content is not None:
+        records_file.write_text(content, encoding="utf-8")
+    args = argparse.Namespace(file=str(records_file))
+    assert cmd_add_bulk(db, args) == 1
+    assert cmd_delete_bulk(db, args) == 1
+    assert remoteiot.cmd_add_bulk(None, args) == 1  # pyright: ignore[reportArgumentType]
+    assert remoteiot.cmd_delete_bulk(None, args) == 1  # pyright: ignore[reportArgumentType]
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import gc
+import io
+import json
+import logging
+import stat
+import os
+import threading
+import weakref
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpMockSequence, MediaIoBaseUpload
+import pytest
+
+from pi_base.lib.app_utils import GetConf
+from pi_base.lib.gd_service import GoogleDriveFileCache, GoogleDriveService, GoogleDriveSessionPool, LinesReader
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@pytest.fixture
+def secrets_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[str]:
+    """Secrets file for GoogleDriveSessionPool, with authentication stubbed out."""
+    authenticated: list[str] = []
+
+    def authenticate_sa(self: GoogleDriveService, secrets_file: str) -> object:
+        authenticated.append(secrets_file)
+        self.credentials = object()
+        return self.credentials
+
+    monkeypatch.setattr(GoogleDriveService, "authenticate_sa", authenticate_sa)
+    path = tmp_path / "gd_secrets.json"
+    path.write_text(json.dumps({"folder_id": "abc"}), encoding="utf-8")
+    GoogleDriveSessionPool.clear()
+    yield str(path)
+    GoogleDriveSessionPool.clear()
+
+
+def test_session_pool_reuses_session(secrets_file: str) -> None:
+    gds1 = GoogleDriveSessionPool.get(secrets_file)
+    gds2 = GoogleDriveSessionPool.get(secrets_file)
+    assert gds1 is gds2
+    assert GoogleDriveSessionPool.get_conf(secrets_file).get("folder_id") == "abc"
+
+
+def test_session_pool_uses_loggr_of_each_call(secrets_file: str) -> None:
+    loggr1, loggr2 = logging.getLogger("gd1"), logging.getLogger("gd2")
+    assert GoogleDriveSessionPool.get(secrets_file, loggr1).loggr is loggr1
+    assert GoogleDriveSessionPool.get(secrets_file, loggr2).loggr is loggr2
+
+
+def test_session_pool_reloads_changed_secrets(secrets_file: str) -> None:
+    gds1 = GoogleDriveSessionPool.get(secrets_file)
+    with open(secrets_file, "w", encoding="utf-8") as f:
+        json.dump({"folder_id": "changed_id"}, f)
+    stat = Path(secrets_file).stat()
+    os.utime(secrets_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    gds2 = GoogleDriveSessionPool.get(secrets_file)
+    assert gds2 is not gds1
+    assert GoogleDriveSessionPool.get_conf(secrets_file).get("folder_id") == "changed_id"
+
+
+def test_session_pool_invalidate(secrets_file: str) -> None:
+    gds1 = GoogleDriveSessionPool.get(secrets_file)
+    GoogleDriveSessionPool.invalidate(secrets_file)
+    assert GoogleDriveSessionPool.get(secrets_file) is not gds1
+
+
+def get_in_thread(secrets_file: str) -> GoogleDriveService:
+    sessions = []
+    thread = threading.Thread(target=lambda: sessions.append(GoogleDriveSessionPool.get(secrets_file)))
+    thread.start()
+    thread.join()
+    return sessions[0]
+
+
+def test_session_pool_sessions_are_per_thread(secrets_file: str) -> None:
+    gds = GoogleDriveSessionPool.get(secrets_file)
+    thread_gds = get_in_thread(secrets_file)
+    assert thread_gds is not gds
+    session_ref = weakref.ref(thread_gds)
+    del thread_gds
+    gc.collect()
+    assert session_ref() is None  # Released with the finished thread
+    assert get_in_thread(secrets_file) is not gds
+    assert GoogleDriveSessionPool.get(secrets_file) is gds
+
+
+def test_session_pool_invalidate_applies_to_all_threads(secrets_file: str) -> None:
+    sessions: list[GoogleDriveService] = []
+    got_session = threading.Event()
+    invalidated = threading.Event()
+
+    def worker() -> None:
+        sessions.append(GoogleDriveSessionPool.get(secrets_file))
+        got_session.set()
+        invalidated.wait(timeout=5)
+        sessions.append(GoogleDriveSessionPool.get(secrets_file))
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    got_session.wait(timeout=5)
+    GoogleDriveSessionPool.invalidate(secrets_file)
+    invalidated.set()
+    thread.join()
+    assert sessions[1] is not sessions[0]
+
+
+def test_session_pool_clear_closes_sessions(secrets_file: str) -> None:
+    class FakeService:
+        closed = False
+
+        def close(self) -> None:
+            self.closed = True
+
+    gds = GoogleDriveSessionPool.get(secrets_file)
+    service = FakeService()
+    gds.service = service  # type: ignore[assignment]
+    GoogleDriveSessionPool.clear()
+    assert service.closed
+    assert gds.service is None
+    assert GoogleDriveSessionPool.get(secrets_file) is not gds
+
+
+LINES = ["a,b,c", "1,2,3", "µV,°C,", ""]
+
+
+def test_lines_reader_reads_joined_lines() -> None:
+    expected = "".join(line + "\n" for line in LINES).encode("utf-8")
+    reader = LinesReader(LINES)
+    assert reader.read() == expected
+    reader.seek(0)
+    chunks = []
+    while chunk := reader.read(3):
+        chunks.append(chunk)
+    assert b"".join(chunks) == expected
+
+
+def test_lines_reader_seek() -> None:
+    expected = "".join(line + "\r\n" for line in LINES).encode("utf-8")
+    reader = LinesReader(LINES, line_end="\r\n")
+    assert reader.seek(0, io.SEEK_END) == len(expected)
+    reader.seek(7)
+    assert reader.read(5) == expected[7:12]
+    reader.seek(-4, io.SEEK_CUR)
+    assert reader.read() == expected[8:]
+
+
+def test_make_media_from_lines() -> None:
+    media = GoogleDriveService.make_media("results.csv", "text/csv", resumable=False, source=LINES)
+    assert isinstance(media, MediaIoBaseUpload)
+    assert media.size() == len("".join(line + "\n" for line in LINES).encode("utf-8"))
+
+
+BATCH_BOUNDARY = "batch_boundary"
+
+
+def batch_response(*parts: tuple[int, dict[str, str]]) -> tuple[dict[str, str], str]:
+    """Response of a batch request with a (status, json body) part for each request id 0, 1, ..."""
+    body = "".join(
+        f"--{BATCH_BOUNDARY}\r\nContent-Type: application/http\r\nContent-ID: <response-base + {i}>\r\n\r\n" f"HTTP/1.1 {status} OK\r\nContent-Type: application/json\r\n\r\n{json.dumps(data)}\r\n"
+        for i, (status, data) in enumerate(parts)
+    )
+    return {"status": "200", "content-type": f'multipart/mixed; boundary="{BATCH_BOUNDARY}"'}, body + f"--{BATCH_BOUNDARY}--\r\n"
+
+
+class RecordingHttp(HttpMockSequence):
+    """Replays the responses in order and records the (method, uri, body) of each request."""
+
+    def __init__(self, iterable: list[tuple[dict[str, str], str]]) -> None:
+        super().__init__(iterable)
+        self.sent: list[tuple[str, str, bytes]] = []
+
+    def request(self, uri: str, method: str = "GET", body: object = None, headers: object = None, redirections: int = 1, connection_type: object = None) -> tuple[object, bytes]:
+        self.sent.append((method, uri, body if isinstance(body, bytes) else str(body or "").encode()))
+        return super().request(uri, method, body, headers, redirections, connection_type)
+
+
+def test_upload_files_batch_sends_only_metadata_in_batch(tmp_path: Path) -> None:
+    http = RecordingHttp(
+        [
+            batch_response((200, {"id": "f0"}), (200, {"id": "f1"})),
+            ({"status": "200"}, json.dumps({"id": "f0"})),  # Content upload of f0
+            ({"status": "500"}, json.dumps({"error": {"code": 500, "message": "backend error"}})),  # Content upload of f1
+            ({"status": "204"}, ""),  # Delete of empty f1
+        ]
+    )
+    gds = GoogleDriveService()
+    gds.service = build("drive", "v3", http=http, static_discovery=True)
+    batches = []
+    new_batch = gds.service.new_batch_http_request
+
+    def new_batch_http_request(**kwargs: object) -> object:
+        batches.append(new_batch(**kwargs))
+        return batches[-1]
+
+    gds.service.new_batch_http_request = new_batch_http_request  # type: ignore[method-assign]
+    results = gds.upload_files_batch(
+        [
+            {"dir_id": "folder", "file_path": "a.csv", "mimetype": "text/csv", "source": LINES},
+            {"dir_id": "folder", "file_path": "b.csv", "mimetype": "text/csv", "source": b"b"},
+            {"dir_id": "folder", "file_path": str(tmp_path / "missing.csv"), "mimetype": "text/csv"},
+        ]
+    )
+
+    [batch] = batches
+    requests = batch._requests  # noqa: SLF001
+    assert sorted(requests) == ["0", "1"]  # File that cannot be read is not created
+    for request_id, name in [("0", "a.csv"), ("1", "b.csv")]:
+        request = requests[request_id]
+        assert request.resumable is None
+        assert "/upload/" not in request.uri
+        assert request.headers["content-type"] == "application/json"
+        assert json.loads(request.body) == {"name": name, "mimeType": "text/csv", "parents": ["folder"]}
+
+    [(_, batch_uri, batch_body), (update_method, update_uri, update_body), (_, failed_uri, _), (delete_method, delete_uri, _)] = http.sent
+    assert "/batch/" in batch_uri
+    assert b"uploadType" not in batch_body
+    assert (update_method, "/upload/drive/v3/files/f0" in update_uri) == ("PATCH", True)
+    assert "".join(line + "\n" for line in LINES).encode() in update_body
+    assert "/upload/drive/v3/files/f1" in failed_uri
+    assert (delete_method, "/drive/v3/files/f1" in delete_uri) == ("DELETE", True)
+
+    assert results[0] == ({"id": "f0"}, None)
+    assert results[1][0] is None
+    assert "backend error" in str(results[1][1])
+    assert isinstance(results[2][1], FileNotFoundError)
+
+
+class FakeGdFile(dict):
+    """Stands in for pydrive2 GoogleDriveFile, `remote` holds the current Drive metadata and content."""
+
+    def __init__(self, remote: dict[str, str], **metadata: str) -> None:
+        super().__init__(**metadata)
+        self.remote = remote
+        self.downloads = 0
+
+    def GetContentString(self) -> str:
+        self.downloads += 1
+        return self.remote["content"]
+
+    def FetchMetadata(self, fields: str | None = None) -> None:
+        self.update({k: v for k, v in self.remote.items() if k != "content" and (not fields or k in fields)})
+
+
+class FakeDrive:
+    def __init__(self, remote: dict[str, str]) -> None:
+        self.remote = remote
+        self.lookups = 0
+
+    def get_drive(self) -> FakeDrive:
+        return self
+
+    def CreateFile(self, metadata: dict[str, str]) -> FakeGdFile:
+        return FakeGdFile(self.remote, **metadata)
+
+    def maybe_create_file_by_title(self, title: str, _parent_directory_id: str) -> tuple[FakeGdFile, bool]:
+        self.lookups += 1
+        return FakeGdFile(self.remote, id="f1", title=title, md5Checksum=self.remote["md5Checksum"]), False
+
+
+def make_conf(**gd: object) -> GetConf:
+    conf = GetConf()
+    conf.conf = {"GoogleDrive": gd}
+    return conf
+
+
+def test_file_cache_is_opt_in(tmp_path: Path) -> None:
+    assert GoogleDriveFileCache.from_conf(make_conf()) is None
+    assert GoogleDriveFileCache.from_conf(make_conf(cache=True, cache_dir=str(tmp_path))) is not None
+    assert GoogleDriveFileCache.from_conf(make_conf(cache=True, cache_dir=str(tmp_path)), cols_secret=["key"]) is None
+
+
+def test_file_cache_files_are_private(tmp_path: Path) -> None:
+    cache = GoogleDriveFileCache(str(tmp_path / "gd"))
+    cache.put(FakeGdFile({}, id="f1", title="db", md5Checksum="1"), "a,b\n")  # pyright: ignore[reportArgumentType]
+    files = list((tmp_path / "gd").iterdir())
+    assert sorted(f.name for f in files) == ["f1.data", "f1.json"]
+    assert all(stat.S_IMODE(f.stat().st_mode) == 0o600 for f in files)
+    assert stat.S_IMODE((tmp_path / "gd").stat().st_mode) == 0o700
+
+
+def test_file_cache_downloads_only_changed(tmp_path: Path) -> None:
+    remote = {"md5Checksum": "1", "content": "v1"}
+    cache = GoogleDriveFileCache(str(tmp_path))
+    drive = FakeDrive(remote)
+
+    def load() -> tuple[str, int]:
+        file, _ = cache.find_file_by_title(drive, "db", "folder")  # pyright: ignore[reportArgumentType]
+        return cache.get_content(file), file.downloads  # pyright: ignore[reportArgumentType, reportOptionalMemberAccess, reportAttributeAccessIssue]
+
+    assert load() == ("v1", 1)
+    assert load() == ("v1", 0)
+    remote.update(md5Checksum="2", content="v2")
+    assert load() == ("v2", 1)
+    assert drive.lookups == 3  # No TTL - always checks Drive
+
+
+def test_file_cache_refuses_write_over_remote_changes(tmp_path: Path) -> None:
+    remote = {"md5Checksum": "1", "content": "v1"}
+    cache = GoogleDriveFileCache(str(tmp_path), ttl_s=3600)
+    drive = FakeDrive(remote)
+    file, _ = cache.find_file_by_title(drive, "db", "folder")  # pyright: ignore[reportArgumentType]
+    cache.get_content(file)  # pyright: ignore[reportArgumentType]
+    cache.check_unchanged(file)  # pyright: ignore[reportArgumentType]
+
+    remote.update(md5Checksum="2", content="v2")  # Changed by someone else
+    file, _ = cache.find_file_by_title(drive, "db", "folder")  # pyright: ignore[reportArgumentType]
+    assert drive.lookups == 1  # Fresh by TTL
+    assert cache.get_content(file) == "v1"  # pyright: ignore[reportArgumentType]
+    with pytest.raises(ValueError, match="was changed"):
+        cache.check_unchanged(file)  # pyright: ignore[reportArgumentType]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pi_base.lib import tput
+from pi_base.lib.large import Large
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+MESSAGES = "MM  MM\nMMMMMM\n# pass GREEN BLACK PASS\nM\n# fail RED BLACK FAIL\n"
+
+
+@pytest.fixture
+def messages_file(tmp_path: Path) -> str:
+    file_path = tmp_path / "messages" / "large.txt"
+    file_path.parent.mkdir()
+    file_path.write_text(MESSAGES, encoding="utf-8")
+    return str(file_path)
+
+
+def test_cache_is_written_to_cache_dir(messages_file: str, tmp_path: Path) -> None:
+    cache_dir = tmp_path / "cache"
+    large = Large(messages_file, cache_dir=str(cache_dir))
+    assert large.cache_path
+    assert os.path.dirname(large.cache_path) == str(cache_dir)
+    assert os.path.isfile(large.cache_path)
+    assert os.listdir(os.path.dirname(messages_file)) == ["large.txt"]
+
+
+def test_cache_is_reused_until_source_changes(messages_file: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache_dir = str(tmp_path / "cache")
+    first = Large(messages_file, cache_dir=cache_dir)
+
+    def fail_parse(_filepath: str) -> dict:
+        raise AssertionError
+
+    monkeypatch.setattr(Large, "parse", staticmethod(fail_parse))
+    assert Large(messages_file, cache_dir=cache_dir).pf == first.pf
+
+    with open(messages_file, "a", encoding="utf-8") as f:
+        f.write("MM\n# busy YELLOW BLACK BUSY\n")
+    monkeypatch.undo()
+    assert "busy" in Large(messages_file, cache_dir=cache_dir).pf
+
+
+def test_frames_are_keyed_by_tput_terminal(messages_file: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("TERM", "dumb")
+    large = Large(messages_file, cache_dir=str(tmp_path / "cache"))
+    assert large.term_key() == tput.tput_term
+    assert large.cache["frames"].keys() == {tput.tput_term}
+
+
+def test_cached_output_matches_uncached(messages_file: str, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    cache_dir = str(tmp_path / "cache")
+    Large(messages_file, cache_dir=cache_dir)
+    outputs = []
+    for large in [Large(messages_file, cache_dir=cache_dir), Large(messages_file, use_cache=False)]:
+        assert large.print("pass") == "PASS"
+        outputs.append(capsys.readouterr().out)
+    assert outputs[0] == outputs[1]
+    assert "██  ██\n██████" in outputs[0]
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import io
+import logging
+import threading
+
+import pytest
+
+from pi_base.lib import loggr as loggr_module
+from pi_base.lib.loggr import LazyFormat, LogDispatcher, Loggr, Vt
+
+
+class FakeProc:
+    """Stands in for `sudo tee` Popen, collecting the written text."""
+
+    def __init__(self, cmd: list[str], **_kwargs: object) -> None:
+        self.cmd = cmd
+        self.stdin = io.StringIO()
+        self.returncode: int | None = None
+
+    def poll(self) -> int | None:
+        return self.returncode
+
+    def wait(self, timeout: float | None = None) -> int:
+        return self.returncode or 0
+
+    def kill(self) -> None:
+        self.returncode = -9
+
+
+@pytest.fixture
+def procs(monkeypatch: pytest.MonkeyPatch) -> list[FakeProc]:
+    started: list[FakeProc] = []
+
+    def popen(cmd: list[str], **kwargs: object) -> FakeProc:
+        proc = FakeProc(cmd, **kwargs)
+        started.append(proc)
+        return proc
+
+    monkeypatch.setattr(loggr_module, "Popen", popen)
+    return started
+
+
+def test_vt_sudo_writer_is_kept_open(procs: list[FakeProc]) -> None:
+    vt = Vt(3, use_sudo=True)
+    vt.print("one", 1)
+    vt.print("two", end="")
+    assert len(procs) == 1
+    assert procs[0].cmd == ["sudo", "tee", "/dev/tty3"]
+    assert procs[0].stdin.getvalue() == "one 1\ntwo"
+
+
+def test_vt_sudo_writer_restarts_after_exit(procs: list[FakeProc]) -> None:
+    vt = Vt(3, use_sudo=True)
+    vt.print("one")
+    procs[0].returncode = 1  # Writer process died
+    vt.print("two")
+    assert len(procs) == 2
+    assert procs[1].stdin.getvalue() == "two\n"
+
+
+def test_vt_sudo_writer_restarts_after_write_error(procs: list[FakeProc]) -> None:
+    vt = Vt(3, use_sudo=True)
+    vt.print("one")
+    procs[0].stdin.close()  # Broken pipe
+    vt.print("lost")
+    vt.print("two")
+    assert len(procs) == 2
+    assert procs[1].stdin.getvalue() == "two\n"
+
+
+def test_vt_sudo_writer_closed_on_delete(procs: list[FakeProc]) -> None:
+    vt = Vt(3, use_sudo=True)
+    vt.print("one")
+    vt.close_sudo_writer()
+    assert procs[0].stdin.closed
+    assert vt.proc is None
+
+
+def test_async_output_is_formatted_at_call_time(capsys: pytest.CaptureFixture[str]) -> None:
+    loggr = Loggr(level=logging.INFO, use_async=True)
+    values = [1]
+    loggr.info(values)
+    loggr.print("print", values)
+    values.append(2)  # Changed before the queued output is written
+    assert loggr.flush(timeout=5)
+    out = capsys.readouterr().out
+    assert ": [1]\x1b" in out
+    assert "print [1]\n" in out
+    assert "[1, 2]" not in out
+    loggr.close()
+
+
+def test_async_output_keeps_order(capsys: pytest.CaptureFixture[str]) -> None:
+    loggr = Loggr(level=logging.INFO, use_async=True)
+    for i in range(50):
+        loggr.print(f"line {i}")
+    assert loggr.flush(timeout=5)
+    assert capsys.readouterr().out.splitlines() == [f"line {i}" for i in range(50)]
+    loggr.close()
+
+
+def test_log_dispatcher_drop_policy() -> None:
+    dispatcher = LogDispatcher(["out"], queue_size=1, policy="drop")
+    release = threading.Event()
+    written: list[str] = []
+    dispatcher.submit("out", release.wait, 5)
+    dispatcher.submit("out", written.append, "queued")
+    dispatcher.submit("out", written.append, "dropped")
+    release.set()
+    assert dispatcher.flush(timeout=5)
+    assert dispatcher.dropped["out"] >= 1
+    assert "dropped" not in written
+    dispatcher.close(timeout=5)
+
+
+def test_close_stops_async_workers(capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch) -> None:
+    registered: list[object] = []
+    monkeypatch.setattr(loggr_module.atexit, "register", registered.append)
+    monkeypatch.setattr(loggr_module.atexit, "unregister", registered.remove)
+    loggr = Loggr(level=logging.INFO, use_async=True)
+    assert registered == [loggr.flush]
+    dispatcher = loggr.dispatcher
+    assert dispatcher
+    loggr.print("queued")
+    assert loggr.close(timeout=5)
+    assert registered == []
+    assert not any(t.is_alive() for t in dispatcher._threads)  # noqa: SLF001
+    with pytest.raises(RuntimeError, match="closed"):
+        dispatcher.submit("stdout", print, "late")
+    loggr.print("direct")  # Written directly after close
+    assert capsys.readouterr().out.splitlines() == ["queued", "direct"]
+    assert loggr.close()
+
+
+def test_extra_items_are_not_percent_formatted(capsys: pytest.CaptureFixture[str]) -> None:
+    loggr = Loggr(level=logging.INFO)
+    loggr.info("50% done", "x")
+    assert "50% done x" in capsys.readouterr().out
+
+
+def test_lazy_format_is_formatted_only_when_output(capsys: pytest.CaptureFixture[str]) -> None:
+    class Costly:
+        calls = 0
+
+        def __str__(self) -> str:
+            Costly.calls += 1
+            return "costly"
+
+    loggr = Loggr(level=logging.INFO)
+    loggr.debug(LazyFormat("x=%s", Costly()))
+    loggr.debug(lambda: f"x={Costly()}")
+    assert Costly.calls == 0
+    loggr.info(LazyFormat("x=%s", Costly()))
+    assert Costly.calls == 1
+    assert "x=costly" in capsys.readouterr().out
+
+
+def test_screen_invalidate_redraws_whole_block(monkeypatch: pytest.MonkeyPatch) -> None:
+    loggr = Loggr()
+    frames: list[str] = []
+    monkeypatch.setattr(loggr, "tput", lambda _code, args, _term=None: f"<{args[0]},{args[1]}>")
+    monkeypatch.setattr(loggr_module, "print", lambda frame, **_kwargs: frames.append(frame), raising=False)
+    loggr.screen(0, 0, "count 1", force=True)
+    loggr.screen(0, 0, "count 2", force=True)
+    loggr.screen_invalidate()  # E.g. other output scrolled the screen
+    loggr.screen(0, 0, "count 3", force=True)
+    assert frames == ["<0,0>count 1", "<0,6>2", "<0,0>count 3"]
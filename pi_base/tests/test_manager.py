@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pi_base.lib import loggr as loggr_module
+from pi_base.lib import manager as manager_module
+from pi_base.lib.loggr import Loggr, ScreenBuffer
+from pi_base.lib.manager import SCREEN_REPAIR_FRAMES, Manager
+
+if TYPE_CHECKING:
+    import pytest
+
+CONNECTED_AT = 25  # Ping attempt that succeeds
+
+
+def test_wait_for_network_redraws_only_changes(monkeypatch: pytest.MonkeyPatch) -> None:
+    pings: list[float] = []
+
+    def ping_test(f_timeout_seconds: float) -> bool:
+        pings.append(f_timeout_seconds)
+        return len(pings) > CONNECTED_AT
+
+    frames: list[str] = []
+    monkeypatch.setattr(manager_module, "SIMULATE_NETWORK_DELAY", 0)
+    monkeypatch.setattr(manager_module, "get_iface", lambda: ("eth0", {"ipaddress": "10.0.0.2", "mac": "aa:bb"}))
+    monkeypatch.setattr(manager_module, "ping_test", ping_test)
+    monkeypatch.setattr(manager_module.time, "sleep", lambda _s: None)
+    monkeypatch.setattr(loggr_module, "print", lambda frame, **_kwargs: frames.append(frame), raising=False)
+    manager = Manager.__new__(Manager)
+    manager.loggr = Loggr()
+    manager.loggr.screen_buffer = ScreenBuffer(max_fps=0)  # No frame rate cap
+    monkeypatch.setattr(manager.loggr, "tput", lambda _code, args, _term=None: f"<{args[0]},{args[1]}>")
+
+    assert manager.wait_for_network(row=5, timeout=60) == 10
+    assert manager.internet_connected
+    full_frames = [i for i, frame in enumerate(frames) if "Hardware MAC" in frame]
+    assert full_frames == list(range(0, CONNECTED_AT, SCREEN_REPAIR_FRAMES))
+    assert frames[1] == "<5,44>1"  # Only the changed counter digit
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from concurrent.futures import Future
+import json
+import threading
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from pi_base.lib.gd_service import GoogleDriveSessionPool
+from pi_base.lib.tester import test_commit_callbacks
+from pi_base.lib.tester.test_commit_callbacks import ResultCommitCallback, ResultCommitToGoogleDriveCallback
+from pi_base.lib.tester.test_result_writer import ResultCommitQueue, ResultLines
+from pi_base.lib.tester.tester_common import TestError as Err
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+NUM_FILES = 3
+
+
+class FakeDriveSession:
+    """Stands in for pooled GoogleDriveService, records batches sent."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+        self.uploads: dict[str, object] = {}
+        self.credentials = object()
+
+    def upload_file(self, _dir_id: str, file_path: str, _mimetype: str, source: object = None) -> dict[str, str]:
+        self.uploads[file_path] = source if isinstance(source, list) else source.read()  # pyright: ignore[reportAttributeAccessIssue]
+        return {"id": file_path}
+
+    def upload_files_batch(self, uploads: list[dict[str, Any]]) -> list[tuple[dict[str, str], None]]:
+        self.batches.append([upload["file_path"] for upload in uploads])
+        return [({"id": upload["file_path"]}, None) for upload in uploads]
+
+
+class CoalescingCallback(ResultCommitCallback):
+    """Completes commits only when `size` of them are started, like a batched upload."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.started: list[tuple[str, Future]] = []
+        self.batches: list[list[str]] = []
+
+    def commit(self, results_buffer: Iterable[str], file_path: str) -> tuple[Err, str | None]:
+        return self.commit_async(results_buffer, file_path).result(timeout=5)
+
+    def commit_async(self, results_buffer: Iterable[str], file_path: str) -> Future:
+        future: Future = Future()
+        self.started.append((file_path, future))
+        if len(self.started) >= self.size:
+            self.batches.append([name for name, _ in self.started])
+            for _, f in self.started:
+                f.set_result((Err.ERR_OK, None))
+            self.started = []
+        return future
+
+
+def test_default_commit_async_commits_synchronously() -> None:
+    class Callback(ResultCommitCallback):
+        def commit(self, results_buffer: Iterable[str], file_path: str) -> tuple[Err, str | None]:
+            return Err.ERR_OK, f"{file_path}: {len(list(results_buffer))}"
+
+    future = Callback().commit_async(["a", "b"], "out.csv")
+    assert future.done()
+    assert future.result() == (Err.ERR_OK, "out.csv: 2")
+
+
+def test_commit_queue_starts_queued_jobs_together(tmp_path: Path) -> None:
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    callback = CoalescingCallback(NUM_FILES)
+    for i in range(NUM_FILES):
+        job_id = f"{i:020d}-000000"
+        (spool_dir / f"{job_id}.lines").write_text(f"line {i}\n", encoding="utf-8")
+        (spool_dir / f"{job_id}.json").write_text(json.dumps({"file_name": f"out_{i}.csv", "pending": [callback.name]}), encoding="utf-8")
+    commit_queue = ResultCommitQueue(lambda: [callback], spool_dir=str(spool_dir))
+    assert commit_queue.join(timeout=5)
+    commit_queue.stop()
+    assert callback.batches == [[f"out_{i}.csv" for i in range(NUM_FILES)]]
+    assert not list(spool_dir.iterdir())
+
+
+def test_google_drive_callback_does_not_block_batch(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    session = FakeDriveSession()
+    monkeypatch.setattr(test_commit_callbacks, "gd_connect", lambda *_args, **_kwargs: (session, {"gd_results_folder_id": "folder_id"}))
+    monkeypatch.setattr(GoogleDriveSessionPool, "get", lambda *_args, **_kwargs: session)
+    secrets_file = str(tmp_path / "gd_secrets.json")
+    callback = ResultCommitToGoogleDriveCallback(None, secrets_file, batch_size=NUM_FILES, batch_window_s=60.0)  # pyright: ignore[reportArgumentType]
+
+    futures = [callback.commit_async([f"line {i}"], f"out_{i}.csv") for i in range(NUM_FILES)]
+    assert [future.result(timeout=5) for future in futures] == [(Err.ERR_OK, None)] * NUM_FILES
+    assert session.batches == [[f"out_{i}.csv" for i in range(NUM_FILES)]]
+
+
+def test_google_drive_callback_commit_coalesces_threads(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    session = FakeDriveSession()
+    monkeypatch.setattr(test_commit_callbacks, "gd_connect", lambda *_args, **_kwargs: (session, {"gd_results_folder_id": "folder_id"}))
+    monkeypatch.setattr(GoogleDriveSessionPool, "get", lambda *_args, **_kwargs: session)
+    secrets_file = str(tmp_path / "gd_secrets.json")
+    callback = ResultCommitToGoogleDriveCallback(None, secrets_file, batch_size=NUM_FILES, batch_window_s=60.0)  # pyright: ignore[reportArgumentType]
+
+    results: list[tuple[Err, str | None]] = []
+    threads = [threading.Thread(target=lambda i=i: results.append(callback.commit([f"line {i}"], f"out_{i}.csv"))) for i in range(NUM_FILES)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    assert results == [(Err.ERR_OK, None)] * NUM_FILES
+    assert len(session.batches) == 1
+
+
+def test_google_drive_callback_uploads_any_iterable(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    session = FakeDriveSession()
+    monkeypatch.setattr(test_commit_callbacks, "gd_connect", lambda *_args, **_kwargs: (session, {"gd_results_folder_id": "folder_id"}))
+    callback = ResultCommitToGoogleDriveCallback(None, str(tmp_path / "gd_secrets.json"))  # pyright: ignore[reportArgumentType]
+    lines = ResultLines()
+    lines.append("a")
+    lines.append("b")
+    assert callback.commit(("a", "b"), "tuple.csv") == (Err.ERR_OK, None)
+    assert callback.commit((line for line in ["a", "b"]), "generator.csv") == (Err.ERR_OK, None)
+    assert callback.commit(lines, "stream.csv") == (Err.ERR_OK, None)
+    assert session.uploads == {"tuple.csv": ["a", "b"], "generator.csv": ["a", "b"], "stream.csv": b"a\nb\n"}
+
+
+class FakeBatcher:
+    """Stands in for GoogleDriveUploadBatcher, keeps the upload Futures pending."""
+
+    def __init__(self) -> None:
+        self.uploads: list[Future] = []
+
+    def submit(self, *_args: object, **_kwargs: object) -> Future:
+        self.uploads.append(Future())
+        return self.uploads[-1]
+
+
+def make_batched_callback(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, batcher: FakeBatcher) -> ResultCommitToGoogleDriveCallback:
+    monkeypatch.setattr(test_commit_callbacks, "gd_connect", lambda *_args, **_kwargs: (FakeDriveSession(), {"gd_results_folder_id": "folder_id"}))
+    monkeypatch.setattr(test_commit_callbacks.GoogleDriveUploadBatcher, "shared", lambda *_args, **_kwargs: batcher)
+    return ResultCommitToGoogleDriveCallback(None, str(tmp_path / "gd_secrets.json"), batch_size=NUM_FILES)  # pyright: ignore[reportArgumentType]
+
+
+def test_google_drive_callback_cancelled_upload_fails_commit(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    batcher = FakeBatcher()
+    callback = make_batched_callback(tmp_path, monkeypatch, batcher)
+    future = callback.commit_async(["line"], "out.csv")
+    batcher.uploads[0].cancel()
+    returncode, reason = future.result(timeout=5)
+    assert returncode == Err.ERR_FILE_SAVE
+    assert "cancelled" in str(reason)
+
+
+def test_google_drive_callback_error_in_done_callback_fails_commit(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    batcher = FakeBatcher()
+    callback = make_batched_callback(tmp_path, monkeypatch, batcher)
+
+    def upload_result(*_args: object) -> None:
+        raise RuntimeError("no session")
+
+    monkeypatch.setattr(callback, "_upload_result", upload_result)
+    future = callback.commit_async(["line"], "out.csv")
+    batcher.uploads[0].set_result({"id": "out.csv"})
+    with pytest.raises(RuntimeError, match="no session"):
+        future.result(timeout=5)
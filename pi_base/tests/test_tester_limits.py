@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from pi_base.lib.tester import test_limits
+from pi_base.lib.tester.test_limits import ChannelLimit, LimitCheckResult, LimitsTable
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+LIMITS = LimitsTable.from_rows(
+    [
+        ["v12", 11.5, 12.5, "", ""],
+        ["v5", "", "", 5.0, 0.25],
+        {"channel": "i_idle", "max": "0.1"},
+    ]
+)
+
+SAMPLES = [
+    pytest.param([12.0, 5.1, 0.05], id="one-point-pass"),
+    pytest.param([13.0, 5.1, 0.05], id="one-point-fail"),
+    pytest.param([[12.0, 5.0, 0.05], [11.0, 5.3, 0.02], [12.6, 4.9, 0.2]], id="points"),
+    pytest.param([[12.0, None, 0.05], [12.1, 5.0, math.nan]], id="none-and-nan"),
+    pytest.param([(12.0, 5.0, -1.0), (12.0, 5.0, -2.0)], id="tuples-no-lower-limit"),
+    pytest.param([[12.5, 4.75, 0.1], [11.5, 5.25, 0.1]], id="on-the-limits"),
+]
+
+
+def _outcome(checked: LimitCheckResult) -> tuple[list[Any], list[int], int]:
+    worst = ["nan" if math.isnan(value) else value for value in checked.worst]
+    return worst, checked.fails, checked.samples
+
+
+def test_limits_from_rows() -> None:
+    assert LIMITS.channels == ["v12", "v5", "i_idle"]
+    assert (LIMITS.lo, LIMITS.hi) == ([11.5, 4.75, -math.inf], [12.5, 5.25, 0.1])
+
+
+def test_limits_from_csv(tmp_path: Path) -> None:
+    file_path = tmp_path / "limits.csv"
+    file_path.write_text("channel, min, max, nominal, tolerance\nv12, 11.5, 12.5, ,\n# comment,,,,\nv5, , , 5.0, 0.25\n", encoding="utf-8")
+    limits = LimitsTable.from_csv(str(file_path))
+    assert limits.channels == ["v12", "v5"]
+    assert (limits.lo, limits.hi) == ([11.5, 4.75], [12.5, 5.25])
+
+
+def test_channel_limit_rejects_inverted_range() -> None:
+    with pytest.raises(ValueError, match="above max limit"):
+        ChannelLimit("v12", val_min=12.5, val_max=11.5)
+
+
+@pytest.mark.parametrize("samples", SAMPLES)
+def test_numpy_and_python_checks_agree(samples: list[Any]) -> None:
+    np = pytest.importorskip("numpy")
+    expected = _outcome(LIMITS._check_python(samples))  # noqa: SLF001
+    assert _outcome(LIMITS._check_numpy(np, samples)) == expected  # noqa: SLF001
+    assert _outcome(LIMITS._check_numpy(np, np.array(samples, dtype=float))) == expected  # noqa: SLF001
+
+
+def test_check_without_numpy(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(test_limits, "_numpy", False)
+    checked = LIMITS.check([[12.0, 5.0, 0.05], [12.6, None, 0.02]])
+    assert checked.fails == [1, 1, 0]
+    assert checked.failed_channels == ["v12", "v5"]
+    assert checked.worst[0] == pytest.approx(12.6)
+    assert math.isnan(checked.worst[1])
+    assert checked.rows()[1] == ["v12", 12.6, 11.5, 12.5, 2, 1, "FAIL"]
+    assert checked.describe(2) == "Channel i_idle value 0.05 in range [:0.1]"
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_check_rejects_wrong_channel_count(monkeypatch: pytest.MonkeyPatch, use_numpy: bool) -> None:
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(test_limits, "_numpy", False)
+    with pytest.raises(ValueError, match="Expected samples with 3 channels"):
+        LIMITS.check([[12.0, 5.0]])
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import math
+import statistics
+from typing import TYPE_CHECKING, Any, Callable
+
+import pytest
+
+from pi_base.lib.tester.test_lot_stats import LotStatsEngine, RunningStats
+from pi_base.lib.tester.test_result_sink import ResultsSink
+from pi_base.lib.tester.tester_common import TestError as Err
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pi_base.lib.tester.test_script import TestScript
+
+VALUES = [12.1, 11.9, 12.0, 12.3, 11.8]
+
+
+def make_record(run_id: str, lineno: int, value: object, returncode: Err = Err.ERR_OK) -> dict[str, Any]:
+    return ResultsSink.make_record(run_id, "LOT1", "DUT1", "script.csv", lineno, "check_val", ["val_min", "val_max"], ["11.5", "12.5"], ["val"], [value], returncode, 1, 0.1)
+
+
+def run(engine: LotStatsEngine, run_id: str, values: list[object], run_result: str = "pass") -> None:
+    for lineno, value in enumerate(values, 1):
+        engine.add_step(make_record(run_id, lineno, value))
+    engine.end_run(run_id, "LOT1", run_result)
+
+
+def test_running_stats_match_statistics() -> None:
+    stats = RunningStats()
+    for value in VALUES:
+        stats.add(value)
+    assert stats.n == len(VALUES)
+    assert stats.mean == pytest.approx(statistics.mean(VALUES))
+    assert stats.stdev == pytest.approx(statistics.stdev(VALUES))
+    assert (stats.min, stats.max) == (min(VALUES), max(VALUES))
+    sd = statistics.stdev(VALUES)
+    assert stats.cpk(11.5, 12.5) == pytest.approx((12.5 - statistics.mean(VALUES)) / (3 * sd))
+    assert stats.cpk(11.5, None) == pytest.approx((statistics.mean(VALUES) - 11.5) / (3 * sd))
+    assert stats.cpk(None, None) is None
+
+
+def test_cpk_needs_variation() -> None:
+    stats = RunningStats()
+    stats.add(12.0)
+    assert stats.cpk(11.5, 12.5) is None
+    stats.add(12.0)
+    assert stats.cpk(11.5, 12.5) is None
+
+
+def test_non_finite_values_are_not_counted() -> None:
+    engine = LotStatsEngine()
+    run(engine, "r1", [12.0])
+    run(engine, "r2", [math.nan])
+    run(engine, "r3", ["inf"])
+    run(engine, "r4", [12.2])
+    [row] = engine.cpk("LOT1")
+    assert row["n"] == 2  # r1, r4
+    assert row["mean"] == pytest.approx(12.1)
+    assert (row["lo"], row["hi"]) == (11.5, 12.5)
+    assert math.isfinite(row["cpk"])
+
+
+def test_yield_and_pareto() -> None:
+    engine = LotStatsEngine()
+    run(engine, "r1", [12.0, 12.0])
+    engine.add_step(make_record("r2", 1, 13.0, Err.ERR_TEST_FAIL))
+    engine.add_step(make_record("r2", 2, 13.0, Err.ERR_TEST_FAIL))
+    engine.end_run("r2", "LOT1", "fail")
+    engine.add_step(make_record("r3", 2, 13.0, Err.ERR_TEST_FAIL))
+    engine.end_run("r3", "LOT1", "fail")
+    summary = engine.summary("LOT1")
+    assert summary is not None
+    assert (summary["runs"], summary["pass"], summary["fail"]) == (3, 1, 2)
+    assert summary["yield_pct"] == pytest.approx(100.0 / 3)
+    assert [(row["step"], row["fails"]) for row in engine.pareto("LOT1")] == [("L002 check_val", 2), ("L001 check_val", 1)]
+    assert engine.pareto("LOT1")[0]["cumulative_pct"] == pytest.approx(200.0 / 3)
+    assert engine.summary("LOT2") is None
+
+
+def test_store_is_saved_and_loaded(tmp_path: Path) -> None:
+    file_path = str(tmp_path / "lot_stats.json")
+    engine = LotStatsEngine(file_path)
+    for i, value in enumerate(VALUES):
+        run(engine, f"r{i}", [value])
+    assert not (tmp_path / "lot_stats.json.tmp").exists()
+    loaded = LotStatsEngine(file_path)
+    assert loaded.summary("LOT1") == engine.summary("LOT1")
+    assert loaded.cpk("LOT1") == engine.cpk("LOT1")
+
+
+def test_script_runs_are_counted(make_test: Callable[..., TestScript], write_script: Callable[..., str]) -> None:
+    engine = LotStatsEngine()
+    test = make_test(lot_stats=engine)
+    test.exec_csv("LOT1", write_script("check_val, v12, 12.0, 11.5, 12.5\n"))
+    test.exec_csv("LOT1", write_script("check_val, v12, 13.0, 11.5, 12.5\n"))
+    summary = engine.summary("LOT1")
+    assert summary is not None
+    assert (summary["pass"], summary["fail"]) == (1, 1)
+    [row] = engine.cpk("LOT1")
+    assert row["n"] == 2
+    assert (row["lo"], row["hi"]) == (11.5, 12.5)
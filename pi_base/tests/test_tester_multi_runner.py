@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable
+
+from pi_base.lib.tester.test_multi_runner import MultiDutRunner
+from pi_base.lib.tester.tester_common import TestError as Err
+
+from .conftest import PLUGINS_DIR
+
+if TYPE_CHECKING:
+    from pi_base.lib.loggr import Loggr
+
+SCRIPT = """check_val, v12, 12.0, 11.5, 12.5
+test_summary
+"""
+
+
+def test_runs_all_or_selected_slots(loggr: Loggr, write_script: Callable[..., str]) -> None:
+    runner = MultiDutRunner.create(3, loggr, plugins_dir=PLUGINS_DIR)
+    script = write_script(SCRIPT)
+    assert [returncode for returncode, _tester_info, _dut_info in runner.exec_csv("LOT1", script)] == [Err.ERR_OK] * len(runner.slots)
+    assert [returncode for returncode, _tester_info, _dut_info in runner.exec_csv("LOT1", script, slots=[2])] == [Err.ERR_OK]
+
+
+def test_invalid_slots_return_error(loggr: Loggr, write_script: Callable[..., str]) -> None:
+    runner = MultiDutRunner.create(2, loggr, plugins_dir=PLUGINS_DIR)
+    script = write_script(SCRIPT)
+    assert runner.exec_csv("LOT1", script, slots=[]) == [(Err.ERR_INVALID_COMMAND_ARGUMENT, None, None)]
+    assert runner.exec_csv("LOT1", script, slots=[0, 2]) == [(Err.ERR_INVALID_COMMAND_ARGUMENT, None, None)] * 2
+    assert all(slot.returncode is None for slot in runner.slots)  # Nothing was run
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable
+
+from pi_base.lib.tester.test_script import CommandResult, PluginManifest
+from pi_base.lib.tester.test_script import TestScriptCommand as Command
+from pi_base.lib.tester.tester_common import TestError as Err
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pi_base.lib.loggr import Loggr
+    from pi_base.lib.tester.test_script import TestScript
+
+
+def test_manifest_plugins_are_loaded_on_first_use(make_test: Callable[..., TestScript], write_script: Callable[..., str], tmp_path: Path) -> None:
+    manifest_path = str(tmp_path / "manifest.json")
+    make_test(plugin_manifest=PluginManifest(manifest_path))  # Discovers plugins and saves the manifest
+    test = make_test(plugin_manifest=PluginManifest(manifest_path))
+    command = test.commands_map["check_val"]
+    assert command.method is None
+    assert command.loader
+    assert test.exec_csv("LOT1", write_script("check_val, v12, 12.0, 11.5, 12.5\n"))[0] == Err.ERR_OK
+    assert command.method
+    assert command.loader is None
+
+
+def test_plugin_load_error_is_script_failure_and_retried(loggr: Loggr) -> None:
+    calls: list[int] = []
+
+    def loader() -> Command:
+        calls.append(1)
+        if len(calls) == 1:
+            raise ImportError("plugin import failed")
+        return Command("lazy", method=lambda _command, _cmd, _args: CommandResult(Err.ERR_OK))
+
+    command = Command("lazy")
+    command.loader = loader
+    result = command.run_args("lazy", [], 1, loggr)
+    assert result.returncode == Err.ERR_SCRIPT_FAILURE
+    assert "plugin import failed" in result.test_info
+    assert command.loader is loader
+    assert command.run_args("lazy", [], 2, loggr).returncode == Err.ERR_OK
+    assert command.loader is None
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable
+
+import pytest
+
+from pi_base.lib.tester.test_profiler import StepProfiler, percentile
+
+if TYPE_CHECKING:
+    from pi_base.lib.tester.test_script import TestScript
+
+
+def test_percentile_interpolates() -> None:
+    assert percentile([1.0], 90) == pytest.approx(1.0)
+    assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 50) == pytest.approx(3.0)
+    assert percentile([1.0, 2.0], 90) == pytest.approx(1.9)
+
+
+def test_summary_rows_are_in_script_and_phase_order() -> None:
+    profiler = StepProfiler()
+    profiler.add("a.csv", 2, "cmd2", "execute", 0.2)
+    profiler.add("a.csv", 1, "cmd1", "execute", 0.3)
+    profiler.add("a.csv", 1, "cmd1", "dispatch", 0.1)
+    profiler.add("a.csv", 1, "cmd1", "execute", 0.1)
+    rows = profiler.summary()
+    assert [(row["lineno"], row["phase"]) for row in rows] == [(1, "dispatch"), (1, "execute"), (2, "execute")]
+    assert rows[1]["count"] == 2
+    assert rows[1]["total_s"] == pytest.approx(0.4)
+    assert rows[1]["max_s"] == pytest.approx(0.3)
+
+
+def test_script_steps_are_profiled(make_test: Callable[..., TestScript], write_script: Callable[..., str]) -> None:
+    profiler = StepProfiler()
+    test = make_test(profiler=profiler)
+    test.exec_csv("LOT1", write_script("check_val, v12, 12.0, 11.5, 12.5\n"))
+    phases = {row["phase"] for row in profiler.summary() if row["command"] == "check_val"}
+    assert {"tokenize", "dispatch", "execute"} <= phases
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import math
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+import pytest
+
+from pi_base.lib.tester.test_result_sink import JsonlResultsSink, ParquetResultsSink, ResultsSink
+from pi_base.lib.tester.tester_common import TestError as Err
+
+if TYPE_CHECKING:
+    from pi_base.lib.tester.test_script import TestScript
+
+
+class FailingSink(ResultsSink):
+    """Results sink whose output cannot be written."""
+
+    def _write(self, records: list[dict[str, Any]]) -> None:
+        raise OSError("disk full")
+
+
+def make_record(values: list[object]) -> dict[str, Any]:
+    names = [f"v{i}" for i in range(len(values))]
+    return ResultsSink.make_record("run", "LOT1", "DUT1", "script.csv", 1, "measure", ["val_min"], ["-inf"], names, values, Err.ERR_OK, 1, 0.1)
+
+
+def reject_constant(name: str) -> None:
+    raise ValueError(name)
+
+
+def test_results_sink_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        ResultsSink("out.jsonl")  # type: ignore[abstract]
+
+
+def test_jsonl_sink_writes_valid_json(tmp_path: Path) -> None:
+    sink = JsonlResultsSink(str(tmp_path / "out.jsonl"))
+    sink.add(make_record([1.5, math.nan, "inf", "text"]))
+    sink.close()
+    [line] = (tmp_path / "out.jsonl").read_text(encoding="utf-8").splitlines()
+    record = json.loads(line, parse_constant=reject_constant)
+    assert record["values"] == {"v0": 1.5, "v1": None, "v2": None}
+    assert record["texts"] == {"v3": "text"}
+    assert record["limits"] == {"val_min": None}
+
+
+def test_failed_flush_keeps_records(tmp_path: Path) -> None:
+    sink = JsonlResultsSink(str(tmp_path / "missing" / "out.jsonl"))
+    sink.add(make_record([1.0]))
+    with pytest.raises(OSError, match="No such file"):
+        sink.flush()
+    (tmp_path / "missing").mkdir()
+    sink.flush()
+    assert sink.written == 1
+    assert not sink.pending
+
+
+def test_sink_write_error_does_not_fail_run(make_test: Callable[..., TestScript], write_script: Callable[..., str]) -> None:
+    sink = FailingSink("out.jsonl")
+    test = make_test(results_sink=sink)
+    returncode, _tester_info, _dut_info = test.exec_csv("LOT1", write_script("check_val, v12, 12.0, 11.5, 12.5\n"))
+    assert returncode == Err.ERR_OK
+    assert len(sink.pending) == 1
+
+
+def test_parquet_part_file_path(tmp_path: Path) -> None:
+    file_path = tmp_path / "out.parquet"
+    assert ParquetResultsSink.part_file_path(str(file_path)) == str(file_path)
+    file_path.write_bytes(b"")
+    part_path = ParquetResultsSink.part_file_path(str(file_path))
+    assert re.fullmatch(r"out-\d{8}-\d{6}\.parquet", Path(part_path).name)
+    Path(part_path).write_bytes(b"")
+    assert ParquetResultsSink.part_file_path(str(file_path)) not in (str(file_path), part_path)
+
+
+def test_parquet_sink_keeps_earlier_sessions(tmp_path: Path) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    file_path = str(tmp_path / "out.parquet")
+    for value in [1.0, 2.0]:  # Two sessions with the same file path
+        sink = ParquetResultsSink(file_path)
+        sink.add(make_record([value]))
+        sink.close()
+    files = sorted(tmp_path.glob("out*.parquet"))
+    assert len(files) == 2
+    assert pq.read_table(file_path).column("values").to_pylist() == [[("v0", 1.0)]]
+    assert [pq.read_table(f).num_rows for f in files] == [1, 1]
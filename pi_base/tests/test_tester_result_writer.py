@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+from pi_base.lib.tester.test_commit_callbacks import ResultCommitCallback
+from pi_base.lib.tester.test_result_writer import ResultLines, ResultsWriter
+from pi_base.lib.tester.tester_common import TestError as Err
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
+
+class ListCallback(ResultCommitCallback):
+    """Collects committed lines, failing with ERR_FILE_SAVE for the first `failures` attempts."""
+
+    def __init__(self, failures: int = 0, returncode: Err = Err.ERR_FILE_SAVE) -> None:
+        self.failures = failures
+        self.returncode = returncode
+        self.attempts = 0
+        self.committed: dict[str, list[str]] = {}
+
+    def commit(self, results_buffer: Iterable[str], file_path: str) -> tuple[Err, str | None]:
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            return self.returncode, "failed"
+        self.committed[file_path] = list(results_buffer)
+        return Err.ERR_OK, None
+
+
+def fill(results_writer: ResultsWriter, num: int = 3) -> None:
+    for i in range(num):
+        results_writer.add_script_line(f"step_{i}, a, b")
+        results_writer.add_result("x, y", f"{i}, {i * 2}")
+
+
+def test_commit_results_async_delivers_to_callbacks() -> None:
+    results_writer = ResultsWriter()
+    callback = ListCallback()
+    results_writer.register_commit_callback(callback)
+    fill(results_writer)
+    expected = list(results_writer.results_buffer)
+    future = results_writer.commit_results_async("out.csv")
+    results_writer.clear_results()  # Safe to clear right after the call
+    [(cb, err, msg)] = future.result(timeout=5)
+    assert (cb, err, msg) == (callback, Err.ERR_OK, None)
+    assert callback.committed["out.csv"] == expected
+    assert results_writer.wait_for_commits(timeout=5)
+
+
+def test_commit_queue_retries_with_backoff() -> None:
+    results_writer = ResultsWriter()
+    failures = 2
+    callback = ListCallback(failures=failures)
+    results_writer.register_commit_callback(callback)
+    results_writer.start_commit_queue(max_retries=failures + 1, backoff_s=0.01)
+    fill(results_writer)
+    [(_cb, err, _msg)] = results_writer.commit_results_async("out.csv").result(timeout=5)
+    assert err == Err.ERR_OK
+    assert callback.attempts == failures + 1
+
+
+def test_commit_queue_does_not_retry_other_errors() -> None:
+    results_writer = ResultsWriter()
+    callback = ListCallback(failures=5, returncode=Err.ERR_FAIL)
+    results_writer.register_commit_callback(callback)
+    results_writer.start_commit_queue(max_retries=3, backoff_s=0.01)
+    [(_cb, err, _msg)] = results_writer.commit_results_async("out.csv").result(timeout=5)
+    assert err == Err.ERR_FAIL
+    assert callback.attempts == 1
+
+
+def test_commit_queue_spool_survives_restart(tmp_path: Path) -> None:
+    spool_dir = str(tmp_path / "spool")
+    results_writer = ResultsWriter()
+    results_writer.register_commit_callback(ListCallback(failures=100))
+    results_writer.start_commit_queue(spool_dir=spool_dir, max_retries=1, backoff_s=0.01)
+    fill(results_writer)
+    expected = list(results_writer.results_buffer)
+    [(_cb, err, _msg)] = results_writer.commit_results_async("out.csv").result(timeout=5)
+    assert err == Err.ERR_FILE_SAVE
+    assert len(list((tmp_path / "spool").glob("*.json"))) == 1
+    results_writer.commit_queue.stop()
+
+    # Next start picks up the pending commit
+    results_writer2 = ResultsWriter()
+    callback = ListCallback()
+    results_writer2.register_commit_callback(callback)
+    results_writer2.start_commit_queue(spool_dir=spool_dir)
+    assert results_writer2.wait_for_commits(timeout=5)
+    assert callback.committed["out.csv"] == expected
+    assert not list((tmp_path / "spool").glob("*.json"))
+
+
+def test_commit_queue_spools_streamed_lines_to_file(tmp_path: Path) -> None:
+    spool_dir = tmp_path / "spool"
+    results_writer = ResultsWriter(stream=True, max_memory=16, spool_dir=str(tmp_path))
+    results_writer.register_commit_callback(ListCallback(failures=100))
+    results_writer.start_commit_queue(spool_dir=str(spool_dir), max_retries=0)
+    fill(results_writer)
+    expected = list(results_writer.results_buffer)
+    results_writer.commit_results_async("out.csv").result(timeout=5)
+    results_writer.commit_queue.stop()
+    [state_file] = spool_dir.glob("*.json")
+    assert "lines" not in json.loads(state_file.read_text(encoding="utf-8"))
+    assert state_file.with_suffix(".lines").read_text(encoding="utf-8").splitlines() == expected
+
+    results_writer2 = ResultsWriter()
+    callback = ListCallback()
+    results_writer2.register_commit_callback(callback)
+    results_writer2.start_commit_queue(spool_dir=str(spool_dir))
+    assert results_writer2.wait_for_commits(timeout=5)
+    assert callback.committed["out.csv"] == expected
+    assert not list(spool_dir.iterdir())
+
+
+def test_result_lines_len_matches_iteration(tmp_path: Path) -> None:
+    lines = ResultLines(max_memory=8, spool_dir=str(tmp_path))
+    lines.append("one")
+    lines.append("two\nthree")
+    assert list(lines) == ["one", "two", "three"]
+    assert len(lines) == len(list(lines))
+    assert lines.rolled_over
+
+    copy = lines.copy()
+    lines.append("four")
+    assert list(copy) == ["one", "two", "three"]
+    assert len(copy) == len(list(copy))
+    assert (copy.max_memory, copy.spool_dir, copy.encoding) == (lines.max_memory, lines.spool_dir, lines.encoding)
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+import pytest
+
+from pi_base.lib.app_utils import run_async
+from pi_base.lib.tester.test_result_writer import ResultsWriter
+from pi_base.lib.tester.test_script import RunResult, TranscriptRecord
+from pi_base.lib.tester.tester_common import TestError as Err
+
+if TYPE_CHECKING:
+    from pi_base.lib.tester.test_script import TestScript
+
+SCRIPT = """# Sample script
+check_val, v12, 12.0, 11.5, 12.5
+check_val, v5, 5.5, 4.75, 5.25, # Fails
+##, test_result, val
+##, PASS, 12.0
+
+test_summary
+"""
+
+PARALLEL_MAX_TIME_S = 0.45  # Serial run of the parallel steps takes 0.5s
+
+
+def test_plan_is_compiled_once_and_reused(make_test: Callable[..., TestScript], write_script: Callable[..., str]) -> None:
+    test = make_test()
+    script = write_script(SCRIPT)
+    plan = test.get_plan(script)
+    assert test.get_plan(script) is plan
+    assert [step.lineno for step in plan.steps] == [1, 2, 3, 6, 7]  # Result lines are dropped
+    assert plan.steps[1].command is test.commands_map["check_val"]
+    assert plan.steps[1].args == ("v12", "12.0", "11.5", "12.5")
+    assert plan.steps[2].args == ("v5", "5.5", "4.75", "5.25")  # End-of-line comment is clipped
+
+
+def test_plan_is_recompiled_when_file_changes(make_test: Callable[..., TestScript], write_script: Callable[..., str]) -> None:
+    test = make_test()
+    script = write_script(SCRIPT)
+    plan = test.get_plan(script)
+    write_script(SCRIPT + "check_val, v3, 3.3, 3.2, 3.4\n")
+    stat = Path(script).stat()
+    os.utime(script, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    plan2 = test.get_plan(script)
+    assert plan2 is not plan
+    assert len(plan2.steps) == len(plan.steps) + 1
+
+
+def test_plan_cache_can_be_disabled(make_test: Callable[..., TestScript], write_script: Callable[..., str]) -> None:
+    test = make_test(use_plan_cache=False)
+    script = write_script(SCRIPT)
+    assert test.get_plan(script) is not test.get_plan(script)
+
+
+def test_cached_plan_gives_same_results(make_test: Callable[..., TestScript], write_script: Callable[..., str]) -> None:
+    results_writer = ResultsWriter()
+    test = make_test(results_writer)
+    script = write_script(SCRIPT)
+    outputs = []
+    for _ in range(2):
+        returncode, _tester_info, _dut_info = test.exec_csv("LOT1", script)
+        assert returncode == Err.ERR_TEST_FAIL
+        assert test.run_result == RunResult.FAIL
+        assert (test.pass_cnt, test.fail_cnt, test.test_cnt) == (1, 1, 2)
+        outputs.append([line for line in results_writer.results_buffer if not line.startswith("##,lineno")])
+    assert outputs[0][:7] == outputs[1][:7]
+    assert outputs[0][:4] == ["# Sample script", "check_val, v12, 12.0, 11.5, 12.5", "##, test_result, val, error_code", "##, PASS, 12.0, ERR_OK The test passed without issues"]
+
+
+def test_sync_command_can_run_async_code_in_async_script(make_test: Callable[..., TestScript], write_script: Callable[..., str]) -> None:
+    test = make_test()
+    script = write_script("sleep, 0.01\nasleep, 0.01\n")
+    assert test.exec_csv("LOT1", script)[0] == Err.ERR_OK
+    assert run_async(test.exec_csv_async("LOT1", script))[0] == Err.ERR_OK  # "sleep" calls run_async() while the loop is running
+    assert test.pass_cnt == 2
+
+
+def test_parallel_steps_run_concurrently_in_script_order(make_test: Callable[..., TestScript], write_script: Callable[..., str]) -> None:
+    results_writer = ResultsWriter()
+    test = make_test(results_writer)
+    script = write_script("&asleep, 0.3\n&asleep, 0.2\n")
+    start = time.monotonic()
+    assert run_async(test.exec_csv_async("LOT1", script))[0] == Err.ERR_OK
+    assert time.monotonic() - start < PARALLEL_MAX_TIME_S
+    assert [line for line in results_writer.results_buffer if not line.startswith("##, sec")] == [
+        "&asleep, 0.3",
+        "##, 0.3, ERR_OK The test passed without issues",
+        "&asleep, 0.2",
+        "##, 0.2, ERR_OK The test passed without issues",
+    ]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_transcript_counters(make_test: Callable[..., TestScript], write_script: Callable[..., str], compact: bool) -> None:
+    test = make_test(compact_transcript=compact)
+    for _ in range(2):  # Counters are reset for each run
+        test.exec_csv("LOT1", write_script(SCRIPT))
+        assert (test.dut_transcript.pass_cnt, test.dut_transcript.fail_cnt, test.dut_transcript.test_cnt) == (1, 1, 2)
+    entry = test.dut_transcript.failed[0]
+    assert isinstance(entry, TranscriptRecord) == compact
+    assert (entry.lineno, entry.command_name, entry.returncode) == (3, "check_val", Err.ERR_TEST_FAIL)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Callable
+
+import pytest
+
+from pi_base.lib.tester.tester_common import TestError as Err
+
+MAX_ABORT_TIME_S = 5.0
+
+if TYPE_CHECKING:
+    from pi_base.lib.tester.test_script import TestScript
+
+
+class FakeControl:
+    """Stands in for tester / DUT control, soak() waits on the barrier (if any) and then until aborted or timed out."""
+
+    def __init__(self, barrier: threading.Barrier | None = None, error: Exception | None = None) -> None:
+        self.barrier = barrier
+        self.error = error
+        self.aborted = threading.Event()
+
+    def soak(self, delay_s: float) -> None:
+        if self.barrier:
+            self.barrier.wait()  # Breaks (times out) unless the other device soaks at the same time
+        if self.error:
+            raise self.error
+        self.aborted.wait(delay_s)
+
+    def abort(self) -> None:
+        self.aborted.set()
+
+    def reset_info(self) -> None:
+        pass
+
+
+def abort_later(test: TestScript, delay_s: float = 0.05) -> threading.Timer:
+    timer = threading.Timer(delay_s, test.abort)
+    timer.start()
+    return timer
+
+
+def test_tester_and_dut_soak_in_parallel(make_test: Callable[..., TestScript]) -> None:
+    barrier = threading.Barrier(2, timeout=MAX_ABORT_TIME_S)
+    test = make_test(tester_control=FakeControl(barrier), dut_control=FakeControl(barrier))
+    assert test._soak(0.01) == Err.ERR_OK  # noqa: SLF001
+    assert set(test.soak_telemetry) == {"tester", "dut"}
+    assert not any(telemetry["error"] or telemetry["aborted"] for telemetry in test.soak_telemetry.values())
+
+
+def test_soak_error_is_raised_after_all_devices(make_test: Callable[..., TestScript]) -> None:
+    test = make_test(tester_control=FakeControl(error=OSError("tester gone")), dut_control=FakeControl())
+    with pytest.raises(OSError, match="tester gone"):
+        test._soak(0.01)  # noqa: SLF001
+    assert test.soak_telemetry["dut"]["elapsed_s"] is not None
+
+
+@pytest.mark.parametrize("with_devices", [True, False])
+def test_abort_wakes_up_soak(make_test: Callable[..., TestScript], with_devices: bool) -> None:
+    test = make_test(tester_control=FakeControl(), dut_control=FakeControl()) if with_devices else make_test()
+    start_time = time.monotonic()
+    abort_later(test)
+    assert test._soak(30) == Err.ERR_ABORT  # noqa: SLF001
+    assert time.monotonic() - start_time < MAX_ABORT_TIME_S
+    assert all(telemetry["aborted"] for telemetry in test.soak_telemetry.values())
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pi_base.lib import tput
+from pi_base.lib.os_utils import which
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+@pytest.fixture(autouse=True)
+def clear_cache() -> Iterator[None]:
+    tput.tput_cache_clear()
+    yield
+    tput.tput_cache_clear()
+
+
+def test_capabilities_are_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[tuple[str, tuple[str, ...], str]] = []
+
+    def resolve(code: str, args: tuple[str, ...], term: str) -> str:
+        calls.append((code, args, term))
+        return f"<{code}{','.join(args)}>"
+
+    monkeypatch.setattr(tput, "_tput_terminfo", resolve)
+    assert tput.tput("setaf", ("RED",)) == "<setaf1>"
+    assert tput.tput("setaf", ("RED",)) == "<setaf1>"
+    assert tput.tput("cup", (2, 12), term="xterm") == "<cup2,12>"  # pyright: ignore[reportArgumentType]
+    assert calls == [("setaf", ("1",), "linux"), ("cup", ("2", "12"), "xterm")]
+
+
+@pytest.fixture
+def no_tput_run(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("COLUMNS", raising=False)
+    monkeypatch.delenv("LINES", raising=False)
+    monkeypatch.setattr(tput, "_tput_run", lambda *_args: pytest.fail("Terminal size should be read in-process"))
+
+
+@pytest.mark.usefixtures("no_tput_run")
+def test_terminal_size_is_not_cached(monkeypatch: pytest.MonkeyPatch) -> None:
+    sizes = iter([os.terminal_size((80, 24)), os.terminal_size((120, 40))])
+    monkeypatch.setattr(tput, "_terminal_size", lambda: next(sizes))
+    assert tput.tput("cols") == "80"
+    assert tput.tput("lines") == "40"  # Resized
+
+
+@pytest.mark.usefixtures("no_tput_run")
+def test_terminal_size_from_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("COLUMNS", "132")
+    monkeypatch.setattr(tput, "_terminal_size", lambda: os.terminal_size((80, 24)))
+    assert tput.tput("cols") == "132"
+    assert tput.tput("lines") == "24"
+
+
+@pytest.mark.usefixtures("no_tput_run")
+def test_terminal_size_falls_back_to_terminfo(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(tput, "_terminal_size", lambda: None)
+    monkeypatch.setattr(tput, "_tput_terminfo", lambda code, _args, term: f"<{code},{term}>")
+    assert tput.tput("cols", term="vt100") == "<cols,vt100>"
+
+
+@pytest.mark.skipif(not which("tput"), reason="tput command is not installed")
+@pytest.mark.parametrize(("code", "args"), [("setaf", ("RED",)), ("cup", ("2", "12")), ("el", ()), ("civis", ()), ("it", ()), ("xmc", ())])
+def test_terminfo_matches_tput_command(code: str, args: tuple[str, ...]) -> None:
+    args = tput.tput_color(args)
+    result = tput._tput_terminfo(code, args, tput.tput_term)  # noqa: SLF001
+    if result is None:
+        pytest.skip("terminfo is not available in-process")
+    assert result == tput._tput_run(code, args, tput.tput_term)  # noqa: SLF001
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import pytest
+
+from pi_base.lib import user_input as user_input_module
+from pi_base.lib.user_input import _Screen
+
+
+@pytest.fixture
+def writes(monkeypatch: pytest.MonkeyPatch) -> list[bytes]:
+    written: list[bytes] = []
+    monkeypatch.setattr(user_input_module.os, "write", lambda _fd, data: written.append(data))
+    return written
+
+
+def test_batched_output_is_one_write(writes: list[bytes]) -> None:
+    with _Screen.batched():
+        _Screen.wr("a")
+        with _Screen.batched():
+            _Screen.wr(b"b")
+        _Screen.wr("c")
+        assert writes == []
+    assert writes == [b"abc"]
+    _Screen.wr("d")
+    assert writes == [b"abc", b"d"]
+
+
+def test_batched_output_is_written_on_error(writes: list[bytes]) -> None:
+    def draw() -> None:
+        with _Screen.batched():
+            _Screen.wr("a")
+            raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        draw()
+    assert writes == [b"a"]
+    assert _Screen.frame is None